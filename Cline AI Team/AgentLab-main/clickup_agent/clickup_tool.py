@@ -1,11 +1,12 @@
 import os
 import json
-import re
 from typing import Optional, List, Dict, Any, Union, Tuple
 
 from phi.tools import Toolkit
 from phi.utils.log import logger
 
+from name_index import NameIndex
+
 try:
     import requests
 except ImportError:
@@ -69,13 +70,15 @@ class ClickUpTools(Toolkit):
             logger.error(f"Error making request to {url}: {e}")
             return {"error": str(e)}
 
-    def _find_by_name(self, items: List[Dict[str, Any]], name: str, item_type: str) -> Union[Dict[str, Any], None]:
-        """Find an item in a list by name using exact match or regex pattern.
+    def _find_by_name(self, items: List[Dict[str, Any]], name: str, item_type: str,
+                      exact: bool = False) -> Union[Dict[str, Any], None]:
+        """Find an item in a list by name using exact or fuzzy match.
         
         Args:
             items: List of items to search through
             name: Name to search for
             item_type: Type of item (for error message)
+            exact: Only accept an exact match (ignoring case and spacing)
             
         Returns:
             Matching item or None if not found
@@ -83,18 +86,28 @@ class ClickUpTools(Toolkit):
         if not name:
             return items[0] if items else None
 
-        pattern = re.compile(name, re.IGNORECASE)
-        for item in items:
-            # Try exact match first (case-insensitive)
-            if item["name"].lower() == name.lower():
-                return item
-            # Then try regex pattern match
-            if pattern.search(item["name"]):
-                return item
-        return None
-
-    def _get_space(self, space_name: str = None) -> Dict[str, Any]:
-        """Get space information by name."""
+        # Exact match first (ignoring case and spacing), then names that
+        # contain it or are close to it. Items are fetched fresh on every
+        # call, so the index is built for this lookup only
+        index = NameIndex(items)
+        item = index.get(name) if exact else index.resolve(name)
+        if item is None:
+            logger.debug(f"No {item_type} matches '{name}'")
+        return item
+
+    def _not_found(self, items: List[Dict[str, Any]], name: str, item_type: str) -> Dict[str, Any]:
+        """Error for a name with no match, naming the closest ones so the caller can confirm one."""
+        error = {"error": f"{item_type.capitalize()} '{name}' not found"}
+        candidates = [item.get("name") for item, _ in NameIndex(items).search(name, limit=3)]
+        if candidates:
+            error["did_you_mean"] = candidates
+        return error
+
+    def _get_space(self, space_name: str = None, exact: bool = False) -> Dict[str, Any]:
+        """Get space information by name.
+
+        Writes pass ``exact`` so they never land in a guessed space.
+        """
         spaces = self._make_request("GET", f"team/{self.master_space_id}/space")
         if "error" in spaces:
             return spaces
@@ -103,9 +116,9 @@ class ClickUpTools(Toolkit):
         if not spaces_list:
             return {"error": "No spaces found"}
 
-        space = self._find_by_name(spaces_list, space_name, "space")
+        space = self._find_by_name(spaces_list, space_name, "space", exact=exact)
         if not space:
-            return {"error": f"Space '{space_name}' not found"}
+            return self._not_found(spaces_list, space_name, "space")
         return space
 
     def _get_list(self, space_id: str, list_name: str = None) -> Dict[str, Any]:
@@ -120,7 +133,7 @@ class ClickUpTools(Toolkit):
 
         list_item = self._find_by_name(lists_data, list_name, "list")
         if not list_item:
-            return {"error": f"List '{list_name}' not found"}
+            return self._not_found(lists_data, list_name, "list")
         return list_item
 
     def _get_tasks(self, list_id: str, task_name: str = None) -> List[Dict[str, Any]]:
@@ -176,8 +189,8 @@ class ClickUpTools(Toolkit):
         Returns:
             str: JSON string containing created task details
         """
-        # Get space
-        space = self._get_space(space_name)
+        # Get space, by exact name only: a near miss is reported, not written to
+        space = self._get_space(space_name, exact=True)
         if "error" in space:
             return json.dumps(space, indent=2)
 
@@ -271,15 +284,15 @@ class ClickUpTools(Toolkit):
 
 #     # List all spaces or filter by name
 #     print("Listing spaces:")
-#     spaces = clickup_tools.list_spaces()  # Regex pattern match
+#     spaces = clickup_tools.list_spaces()  # All spaces
 #     print(spaces)
 
 #     # List all lists in a space or filter by name
 #     print("\nListing lists in 'My Space':")
-#     lists = clickup_tools.list_lists("My Space")  # Regex pattern match
+#     lists = clickup_tools.list_lists("My Space")  # Exact name, else closest match
 #     print(lists)
 
 #     # List all tasks in a space, optionally filtered by list and task name
 #     print("\nListing tasks in 'My Space':")
-#     tasks = clickup_tools.list_tasks("My Space")  # Regex pattern matches
+#     tasks = clickup_tools.list_tasks("My Space")  # Exact name, else closest match
 #     print(tasks)
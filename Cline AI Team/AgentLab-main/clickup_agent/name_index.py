@@ -0,0 +1,82 @@
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+def normalize_name(name: str) -> str:
+    """Casefold a name and collapse its whitespace, so lookups ignore case and spacing."""
+    return " ".join(str(name).casefold().split())
+
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of a normalized name, padded so short names still have some."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """Name lookups over a fetched collection of ClickUp items (spaces, lists, tasks).
+
+    Exact matches ignore case and spacing and are a dict lookup. Fuzzy
+    matches are ranked by trigram similarity, with names containing the
+    query first; only items that share a trigram with the query are
+    scored. Names are plain strings throughout, so no user input is ever
+    compiled as a regex.
+    """
+
+    def __init__(self, items: Iterable[Dict[str, Any]], key: str = "name"):
+        self.items: List[Dict[str, Any]] = list(items)
+        self._names: List[str] = []
+        self._exact: Dict[str, int] = {}
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        self._gram_counts: List[int] = []
+        for position, item in enumerate(self.items):
+            name = normalize_name(item.get(key) or "")
+            self._names.append(name)
+            # The first item wins when names collide, like a scan would
+            self._exact.setdefault(name, position)
+            grams = trigrams(name)
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                self._postings[gram].append(position)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """The item whose name equals ``name`` ignoring case and spacing."""
+        position = self._exact.get(normalize_name(name))
+        return None if position is None else self.items[position]
+
+    def search(self, name: str, limit: int = 5, min_score: float = 0.3) -> List[Tuple[Dict[str, Any], float]]:
+        """Items ranked by similarity to ``name``, best first, with their scores (0-1).
+
+        Items whose name contains the query always qualify and rank ahead of
+        the rest; other items need a trigram similarity of ``min_score``.
+        """
+        query = normalize_name(name)
+        if not query:
+            return []
+        query_grams = trigrams(query)
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in query_grams:
+            for position in self._postings.get(gram, ()):
+                shared[position] += 1
+
+        ranked = []
+        for position, count in shared.items():
+            score = count / (len(query_grams) + self._gram_counts[position] - count)
+            contains = query in self._names[position]
+            if contains or score >= min_score:
+                ranked.append((contains, score, -position))
+        # Ties keep collection order
+        ranked.sort(reverse=True)
+        return [(self.items[-negated], round(score, 3)) for _, score, negated in ranked[:limit]]
+
+    def resolve(self, name: str, min_score: float = 0.3) -> Optional[Dict[str, Any]]:
+        """The exact match for ``name``, else the best fuzzy match, else None."""
+        item = self.get(name)
+        if item is not None:
+            return item
+        matches = self.search(name, limit=1, min_score=min_score)
+        return matches[0][0] if matches else None
+
@@ -0,0 +1,173 @@
+import os
+import math
+import time
+import asyncio
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from log_config import get_logger
+
+logger = get_logger("admission")
+
+
+class Overloaded(Exception):
+    """A request was shed; answer it with ``status_code`` and a Retry-After header."""
+
+    def __init__(self, message: str, retry_after: int, status_code: int = 503):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.status_code = status_code
+
+
+class Ticket:
+    """A granted slot. Releasing it more than once is harmless."""
+
+    __slots__ = ("lane", "user", "started", "released")
+
+    def __init__(self, lane: "Lane", user: Optional[str]):
+        self.lane = lane
+        self.user = user
+        self.started = time.monotonic()
+        self.released = False
+
+    def release(self) -> None:
+        if not self.released:
+            self.released = True
+            self.lane._release(self)
+
+
+class Lane:
+    """Admission control for one class of requests.
+
+    At most ``concurrency`` requests run at once; the rest wait in a FIFO
+    queue of at most ``max_queue``. A request is shed with 503 when the
+    queue is full, when the expected wait (from the recent service time)
+    already exceeds ``queue_timeout``, or when it has waited that long, so
+    accepted requests never queue for longer than ``queue_timeout``. A user
+    with ``per_user`` requests running or queued gets 429 for the next one,
+    so one client can't fill the queue; requests without a user are only
+    bounded by the queue. Each setting can be overridden with
+    ``ADMISSION_<NAME>_CONCURRENCY``, ``_QUEUE``, ``_QUEUE_TIMEOUT`` and
+    ``_PER_USER``.
+    """
+
+    def __init__(self, name: str, concurrency: int, max_queue: int, queue_timeout: float, per_user: int):
+        prefix = f"ADMISSION_{name.upper()}_"
+        self.name = name
+        self.concurrency = int(os.getenv(prefix + "CONCURRENCY", str(concurrency)))
+        self.max_queue = int(os.getenv(prefix + "QUEUE", str(max_queue)))
+        self.queue_timeout = float(os.getenv(prefix + "QUEUE_TIMEOUT", str(queue_timeout)))
+        self.per_user = int(os.getenv(prefix + "PER_USER", str(per_user)))
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._users: Counter = Counter()
+        # Moving average of how long a slot is held, for wait estimates
+        self._service_time = 0.0
+        self.stats = {"admitted": 0, "queued": 0, "shed_queue_full": 0, "shed_deadline": 0,
+                      "shed_per_user": 0, "max_wait_ms": 0.0}
+
+    def _retry_after(self) -> int:
+        backlog = (len(self._waiters) + 1) / max(1, self.concurrency)
+        return max(1, min(60, math.ceil(self._service_time * backlog)))
+
+    def _shed(self, reason: str, message: str, status_code: int = 503) -> Overloaded:
+        self.stats[reason] += 1
+        logger.warning("Shedding %s request: %s", self.name, message)
+        return Overloaded(message, self._retry_after(), status_code)
+
+    async def acquire(self, user: Optional[str] = None) -> Ticket:
+        """Wait for a slot, or raise Overloaded."""
+        if user is not None and self.per_user and self._users[user] >= self.per_user:
+            raise self._shed("shed_per_user", f"Too many concurrent {self.name} requests for this session", 429)
+        if self._active < self.concurrency and not self._waiters:
+            self._active += 1
+        else:
+            if len(self._waiters) >= self.max_queue:
+                raise self._shed("shed_queue_full", f"The {self.name} queue is full")
+            expected_wait = self._service_time * (len(self._waiters) + 1) / max(1, self.concurrency)
+            if expected_wait > self.queue_timeout:
+                raise self._shed("shed_deadline", f"The {self.name} queue would take about {expected_wait:.1f}s")
+            await self._wait(user)
+        self._users[user] += 1
+        self.stats["admitted"] += 1
+        return Ticket(self, user)
+
+    async def _wait(self, user: Optional[str]) -> None:
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        # Queued requests count towards the user's limit too
+        self._users[user] += 1
+        self.stats["queued"] += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done():
+                # The slot was handed over just as the wait ended; pass it on
+                self._hand_over()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._shed("shed_deadline", f"Waited {self.queue_timeout:g}s for a {self.name} slot")
+            raise
+        finally:
+            self._users[user] -= 1
+            if self._users[user] <= 0:
+                del self._users[user]
+            waited_ms = (time.monotonic() - started) * 1000
+            self.stats["max_wait_ms"] = max(self.stats["max_wait_ms"], round(waited_ms, 1))
+
+    def _hand_over(self) -> None:
+        """Give a freed slot to the next live waiter, or return it to the pool."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    def _release(self, ticket: Ticket) -> None:
+        held = time.monotonic() - ticket.started
+        self._service_time = held if not self._service_time else 0.8 * self._service_time + 0.2 * held
+        self._users[ticket.user] -= 1
+        if self._users[ticket.user] <= 0:
+            del self._users[ticket.user]
+        self._hand_over()
+
+    @asynccontextmanager
+    async def slot(self, user: Optional[str] = None) -> AsyncIterator[Ticket]:
+        ticket = await self.acquire(user)
+        try:
+            yield ticket
+        finally:
+            ticket.release()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "active": self._active,
+            "waiting": len(self._waiters),
+            "concurrency": self.concurrency,
+            "max_queue": self.max_queue,
+            "queue_timeout": self.queue_timeout,
+            "per_user": self.per_user,
+            "service_time_ms": round(self._service_time * 1000, 1),
+        }
+
+
+class AdmissionControl:
+    """Separate lanes so cheap reads keep flowing when model-backed requests back up.
+
+    ``llm`` fronts requests that need a model completion; its concurrency
+    caps in-flight completions per worker. ``read`` fronts read-only
+    endpoints and commands answered without the model.
+    """
+
+    def __init__(self, llm_concurrency: int = 16):
+        self.llm = Lane("llm", concurrency=llm_concurrency, max_queue=64, queue_timeout=10.0, per_user=2)
+        self.read = Lane("read", concurrency=64, max_queue=256, queue_timeout=2.0, per_user=16)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"llm": self.llm.snapshot(), "read": self.read.snapshot()}
@@ -1,45 +1,301 @@
 import os
 import json
-from typing import Dict, List, Optional
-from fastapi import FastAPI, HTTPException, Request
+import hmac
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, RedirectResponse
-from openai import OpenAI
+from fastapi.responses import FileResponse, JSONResponse, RedirectResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from openai import AsyncOpenAI
 from dotenv import load_dotenv
-from clickup import ClickUpClient
+from clickup import AsyncClickUpClient, add_task_listener, close_shared_http_client, coalescing_stats
 from auth import ClickUpAuth
-from token_storage import TokenStorage
+from rate_limit import rate_limit_stats, set_rate_limit_backend
+from token_storage import get_token_storage
+from state_backend import get_state_backend
+from mirror import ClickUpMirror
+from search import TaskSearchIndex
+from webhooks import WEBHOOK_EVENTS, WebhookProcessor, verify_signature
+from sessions import DEFAULT_SESSION_ID, SESSION_COOKIE, SessionRegistry, new_session_id, sign_session_id, unsign_session_id
+from intent_router import Intent, IntentRouter
+from response_cache import ResponseCache
+from conversation import ConversationState
+from http_cache import HTTPCache
+from jobs import Job, JobQueue, JobQueueFull
+from name_index import NameIndex
+from admission import AdmissionControl, Overloaded, Ticket
+from log_config import get_logger
 
 load_dotenv()
 
-app = FastAPI()
+logger = get_logger("app")
+
+# Keep references to background tasks so they are not garbage collected
+background_tasks = set()
+
+# Startup progress reported by /readyz. Restore and warm-up run in the
+# background, each bounded by STARTUP_TIMEOUT seconds.
+STARTUP_TIMEOUT = float(os.getenv("STARTUP_TIMEOUT", "15"))
+startup_state: Dict[str, Any] = {"ready": False, "restore": "pending", "warm_up": "pending"}
+
+async def warm_up_client(client: AsyncClickUpClient) -> bool:
+    """Pre-populate a client's workspace hierarchy cache and register webhooks."""
+    warmed_up = False
+    try:
+        await client.warm_up()
+        warmed_up = True
+        logger.info("ClickUp hierarchy cache warmed up")
+    except Exception as e:
+        logger.warning("Failed to warm up ClickUp hierarchy cache: %s", e)
+    if CLICKUP_WEBHOOK_URL:
+        await register_webhook(client)
+    return warmed_up
+
+async def register_webhook(client: AsyncClickUpClient) -> None:
+    """Register or renew the ClickUp webhook that keeps local caches fresh."""
+    # Only one worker registers at a time, so they don't race to create duplicates
+    if not state_backend.add("leases", "webhook_registration", os.getpid(), ttl=WEBHOOK_REGISTRATION_LEASE):
+        return
+    try:
+        webhook = await client.ensure_webhook(CLICKUP_WEBHOOK_URL, WEBHOOK_EVENTS)
+        if webhook.get("secret"):
+            await asyncio.to_thread(token_storage.store_webhook_secret, webhook["id"], webhook["secret"])
+    except Exception as e:
+        logger.warning("Failed to register ClickUp webhook: %s", e)
+
+def run_in_background(coro) -> None:
+    """Run a coroutine as a fire-and-forget background task."""
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+
+def schedule_warm_up(client: AsyncClickUpClient) -> None:
+    """Warm up a client's hierarchy cache in the background."""
+    run_in_background(warm_up_client(client))
+
+async def restore_default_session() -> Optional[AsyncClickUpClient]:
+    """Verify the stored default token. Returns the restored client, if any."""
+    default_client = await sessions.get(DEFAULT_SESSION_ID)
+    if not default_client:
+        startup_state["restore"] = "no_token"
+        return None
+    try:
+        logger.info("Restoring ClickUp session from stored token")
+        await asyncio.wait_for(default_client.get_team_id(), STARTUP_TIMEOUT)
+        logger.info("Successfully restored ClickUp session from stored token")
+    except asyncio.TimeoutError:
+        # The token may well be fine; the team ID is fetched again on first use
+        logger.warning("Timed out restoring ClickUp session after %ss", STARTUP_TIMEOUT)
+        startup_state["restore"] = "timeout"
+        return None
+    except Exception as e:
+        logger.warning("Failed to restore ClickUp session: %s", e)
+        await sessions.remove(DEFAULT_SESSION_ID)
+        await asyncio.to_thread(token_storage.clear_tokens)
+        startup_state["restore"] = "failed"
+        return None
+    startup_state["restore"] = "ok"
+    return default_client
+
+async def startup() -> None:
+    """Restore and warm up the default session, then report ready."""
+    started = time.monotonic()
+    try:
+        default_client = await restore_default_session()
+        if default_client is None:
+            startup_state["warm_up"] = "skipped"
+        else:
+            try:
+                warmed_up = await asyncio.wait_for(warm_up_client(default_client), STARTUP_TIMEOUT)
+                startup_state["warm_up"] = "ok" if warmed_up else "failed"
+            except asyncio.TimeoutError:
+                logger.warning("Timed out warming up ClickUp hierarchy cache after %ss", STARTUP_TIMEOUT)
+                startup_state["warm_up"] = "timeout"
+    finally:
+        startup_state["startup_seconds"] = round(time.monotonic() - started, 3)
+        startup_state["ready"] = True
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs in every worker process after the event loop has started. Startup
+    # work talks to ClickUp, so it runs in the background instead of delaying
+    # the server; /readyz reports when it is done.
+    startup_task = asyncio.create_task(startup())
+    await job_queue.start()
+    yield
+    startup_task.cancel()
+    # Let a restore or warm-up still in flight unwind before its clients close
+    await asyncio.gather(startup_task, return_exceptions=True)
+    await job_queue.close()
+    await conversations.close()
+    # Release pooled ClickUp connections on shutdown
+    await sessions.close()
+    await close_shared_http_client()
+    mirror.close()
+    search_index.close()
+    response_cache.close()
+    token_storage.close()
+    state_backend.close()
+
+app = FastAPI(lifespan=lifespan)
 
 # Mount the static directory
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4-turbo-preview")
+client = AsyncOpenAI(
+    api_key=os.getenv("OPENAI_API_KEY"),
+    timeout=float(os.getenv("OPENAI_TIMEOUT", "60"))
+)
+
+# Admission control. Requests that need the model queue for one of
+# OPENAI_MAX_CONCURRENCY slots per worker and are shed with 503 and
+# Retry-After rather than piling up when OpenAI slows down; read-only
+# endpoints and locally routed commands use a separate, cheaper lane.
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "16"))
+admission = AdmissionControl(llm_concurrency=OPENAI_MAX_CONCURRENCY)
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    return JSONResponse(status_code=exc.status_code, content={"detail": str(exc)},
+                        headers={"Retry-After": str(exc.retry_after)})
+
+# Local fast path for command-style messages; INTENT_ROUTER=false sends
+# every message to the model
+INTENT_ROUTER_ENABLED = os.getenv("INTENT_ROUTER", "true").lower() in ("1", "true", "yes", "on")
+intent_router = IntentRouter()
+
+# State shared by worker processes: STATE_BACKEND=sqlite keeps tokens, the
+# session secret and hierarchy caches in STATE_DB_PATH so any number of
+# uvicorn workers behave like one. The default (memory) suits a single worker.
+state_backend = get_state_backend()
+set_rate_limit_backend(state_backend)
 
 # Initialize ClickUp auth and token storage
 clickup_auth = ClickUpAuth()
-token_storage = TokenStorage()
+token_storage = get_token_storage(state_backend)
+
+# Local SQLite mirror of ClickUp data. MIRROR_MAX_AGE is the default freshness
+# bound in seconds for reads served from it; 0 keeps reads live.
+mirror = ClickUpMirror()
+MIRROR_MAX_AGE = float(os.getenv("MIRROR_MAX_AGE", "0"))
 
-# Global variable to store the ClickUp client
-clickup_client: Optional[ClickUpClient] = None
+# Full-text index over every task fetched through the ClickUp client
+search_index = TaskSearchIndex()
 
-# Try to restore session from stored token
-stored_token = token_storage.get_access_token()
-if stored_token:
+async def index_tasks(tasks: List[Dict[str, Any]]) -> None:
     try:
-        print("\nRestoring ClickUp session from stored token...")
-        clickup_client = ClickUpClient(stored_token)
-        # Test the connection
-        clickup_client.get_team_id()
-        print("Successfully restored ClickUp session from stored token")
+        await asyncio.to_thread(search_index.upsert_tasks, tasks)
     except Exception as e:
-        print(f"Failed to restore ClickUp session: {str(e)}")
-        clickup_client = None
-        token_storage.clear_tokens()
+        logger.warning("Failed to index tasks for search: %s", e)
+
+add_task_listener(lambda tasks: run_in_background(index_tasks(tasks)))
+
+# Push-based cache invalidation. CLICKUP_WEBHOOK_URL is the public URL of
+# /webhooks/clickup; when set, the webhook is registered or renewed on warm-up.
+CLICKUP_WEBHOOK_URL = os.getenv("CLICKUP_WEBHOOK_URL")
+WEBHOOK_REGISTRATION_LEASE = 60
+webhook_processor = WebhookProcessor(mirror, search_index, invalidate_cache=lambda **ids: sessions.invalidate_caches(**ids))
+
+# Events are workspace-wide, so created and updated tasks are re-fetched with a
+# dedicated service token (CLICKUP_WEBHOOK_TOKEN) rather than a user's. Without
+# one, the task's list is only marked stale in the mirror.
+CLICKUP_WEBHOOK_TOKEN = os.getenv("CLICKUP_WEBHOOK_TOKEN")
+_webhook_client: Optional[AsyncClickUpClient] = None
+
+def get_webhook_client() -> Optional[AsyncClickUpClient]:
+    global _webhook_client
+    if _webhook_client is None and CLICKUP_WEBHOOK_TOKEN:
+        _webhook_client = AsyncClickUpClient(CLICKUP_WEBHOOK_TOKEN)
+    return _webhook_client
+
+# Per-user ClickUp sessions, identified by a signed cookie. Without
+# SESSION_SECRET one is generated and kept in the state backend, so with the
+# memory backend cookies stop working on restart.
+SESSION_SECRET = os.getenv("SESSION_SECRET") or state_backend.get_or_create("config", "session_secret", new_session_id)
+if not os.getenv("SESSION_SECRET") and not state_backend.shared:
+    logger.warning("SESSION_SECRET is not set; session cookies will not survive a restart")
+SESSION_COOKIE_MAX_AGE = int(os.getenv("SESSION_COOKIE_MAX_AGE", str(30 * 24 * 3600)))
+SESSION_COOKIE_SECURE = os.getenv("SESSION_COOKIE_SECURE", "false").lower() in ("1", "true", "yes", "on")
+# Serve requests without a session cookie from the token stored outside any
+# session (single-user deployments and scripts)
+SESSION_DEFAULT_FALLBACK = os.getenv("SESSION_DEFAULT_FALLBACK", "false").lower() in ("1", "true", "yes", "on")
+
+async def load_session_token(session_id: str) -> Optional[str]:
+    if session_id == DEFAULT_SESSION_ID:
+        if not SESSION_DEFAULT_FALLBACK:
+            return None
+        return token_storage.get_access_token()
+    # Served from memory (JSON) or a primary-key lookup (SQLite), so no thread hop
+    return token_storage.get_access_token(session_id)
+
+sessions = SessionRegistry(load_session_token, backend=state_backend)
+
+# Selected space and list per session. Selecting a space prefetches it into
+# the mirror; LIST_TASKS serves tasks mirrored within CONVERSATION_MAX_AGE
+# seconds, waiting up to CONVERSATION_PREFETCH_WAIT for a prefetch in flight.
+conversations = ConversationState(state_backend, mirror)
+CONVERSATION_MAX_AGE = float(os.getenv("CONVERSATION_MAX_AGE", "300"))
+CONVERSATION_PREFETCH_WAIT = float(os.getenv("CONVERSATION_PREFETCH_WAIT", "2"))
+
+def request_session_id(request: Request) -> str:
+    """The session ID from the request's cookie, or the default session."""
+    return unsign_session_id(request.cookies.get(SESSION_COOKIE), SESSION_SECRET) or DEFAULT_SESSION_ID
+
+def admission_user(session_id: str) -> Optional[str]:
+    """The key for per-user admission limits.
+
+    Cookieless requests under SESSION_DEFAULT_FALLBACK all share the default
+    session, so it is exempt and only bounded by the lane's queue.
+    """
+    return None if session_id == DEFAULT_SESSION_ID else session_id
+
+async def get_clickup_client(request: Request) -> AsyncIterator[Optional[AsyncClickUpClient]]:
+    """Resolve the caller's ClickUp client, or None if they haven't authenticated.
+
+    The session is leased until the response has been sent, so evicting it
+    meanwhile doesn't close the client under the request.
+    """
+    async with sessions.lease(request_session_id(request)) as clickup_client:
+        yield clickup_client
+
+async def require_clickup_client(
+    clickup_client: Optional[AsyncClickUpClient] = Depends(get_clickup_client)
+) -> AsyncClickUpClient:
+    if not clickup_client:
+        raise HTTPException(status_code=401, detail="Not authenticated with ClickUp")
+    return clickup_client
+
+async def admit_read(session_id: str = Depends(request_session_id),
+                     clickup_client: AsyncClickUpClient = Depends(require_clickup_client)) -> AsyncIterator[None]:
+    """Hold a read-lane slot for the rest of the request.
+
+    Depends on authentication, so unauthenticated callers get their 401
+    without taking a slot.
+    """
+    async with admission.read.slot(admission_user(session_id)):
+        yield
+
+async def session_space_ids(clickup_client: AsyncClickUpClient) -> List[str]:
+    """IDs of the spaces a session can see, used to scope the shared mirror and search index."""
+    spaces = await clickup_client.list_spaces()
+    return [space["id"] for space in spaces.get("spaces", [])]
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness probe: the process is up and serving requests."""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness probe: 200 once startup session restore and warm-up have finished."""
+    if not startup_state["ready"]:
+        return JSONResponse(status_code=503, content={"status": "starting", **startup_state})
+    return {"status": "ready", **startup_state}
 
 @app.get("/")
 async def root():
@@ -47,18 +303,17 @@ async def root():
     return FileResponse('static/index.html')
 
 @app.get("/auth/status")
-async def auth_status():
+async def auth_status(clickup_client: Optional[AsyncClickUpClient] = Depends(get_clickup_client)):
     """Check authentication status."""
-    global clickup_client
     is_authenticated = clickup_client is not None
-    print(f"\nAuth Status Check: {'Authenticated' if is_authenticated else 'Not Authenticated'}")
+    logger.debug("Auth Status Check: %s", 'Authenticated' if is_authenticated else 'Not Authenticated')
     return {"authenticated": is_authenticated}
 
 @app.get("/auth")
 async def auth():
     """Start OAuth flow."""
     auth_url = clickup_auth.get_authorization_url()
-    print(f"Redirecting to ClickUp OAuth URL: {auth_url}")
+    logger.info("Redirecting to ClickUp OAuth URL")
     return RedirectResponse(url=auth_url)
 
 @app.get("/oauth/callback")
@@ -70,84 +325,107 @@ async def oauth_callback(
     state: str = None
 ):
     """Handle OAuth callback."""
-    global clickup_client
-    
-    print("\nOAuth Callback Debug:")
-    print(f"Code: {code}")
-    print(f"Error: {error}")
-    print(f"Error Description: {error_description}")
-    print(f"State: {state}")
-    print(f"Full Query Params: {dict(request.query_params)}")
-    print(f"Request URL: {request.url}")
-    print(f"Request Headers: {dict(request.headers)}")
+    logger.debug(
+        "OAuth callback received",
+        extra={"fields": {"has_code": bool(code), "error": error,
+                          "error_description": error_description, "state": state}}
+    )
 
     # Verify state parameter
     if state != "clickup_oauth":
         error_msg = "Invalid state parameter"
-        print(f"OAuth Error: {error_msg}")
+        logger.error("OAuth Error: %s", error_msg)
         raise ValueError(error_msg)
     
     try:
         if error or error_description:
             error_msg = f"OAuth error: {error}. Description: {error_description}"
-            print(f"OAuth Error: {error_msg}")
+            logger.error("OAuth Error: %s", error_msg)
             raise ValueError(error_msg)
             
         if not code:
-            print("No authorization code received")
+            logger.warning("No authorization code received")
             raise ValueError("No authorization code received in callback")
             
         # Exchange code for access token
-        print("\nStarting token exchange...")
-        token_data = clickup_auth.get_access_token(code)
+        logger.debug("Starting token exchange")
+        token_data = await asyncio.to_thread(clickup_auth.get_access_token, code)
         
         access_token = token_data.get("access_token")
         refresh_token = token_data.get("refresh_token")
         
         if not access_token:
-            print("No access token in response data")
-            print(f"Response data keys: {token_data.keys()}")
+            logger.error("No access token in response data (keys: %s)", list(token_data.keys()))
             raise ValueError("No access token received in response")
             
-        print("\nInitializing ClickUp client...")
-        clickup_client = ClickUpClient(access_token)
+        logger.debug("Initializing ClickUp client")
+        session_id = new_session_id()
+        clickup_client = await sessions.create(session_id, access_token)
         
         # Test the connection
-        print("\nTesting ClickUp connection...")
+        logger.debug("Testing ClickUp connection")
         try:
-            team_id = clickup_client.get_team_id()
-            print(f"Successfully connected to ClickUp (Team ID: {team_id})")
+            team_id = await clickup_client.get_team_id()
+            logger.info("Successfully connected to ClickUp (Team ID: %s)", team_id)
             
             # Store tokens only after successful connection test
-            token_storage.store_tokens(access_token, refresh_token)
-            print("Successfully stored access token")
+            await asyncio.to_thread(token_storage.store_tokens, access_token, refresh_token, session_id)
+            logger.info("Successfully stored access token")
+
+            schedule_warm_up(clickup_client)
             
         except Exception as team_error:
-            print(f"Error testing ClickUp connection: {str(team_error)}")
+            logger.error("Error testing ClickUp connection: %s", team_error)
+            await sessions.remove(session_id)
             raise ValueError(f"Failed to verify ClickUp access: {str(team_error)}")
         
-        print("\nOAuth flow completed successfully")
-        return RedirectResponse(url="/")
+        logger.info("OAuth flow completed successfully")
+        response = RedirectResponse(url="/")
+        response.set_cookie(
+            SESSION_COOKIE, sign_session_id(session_id, SESSION_SECRET),
+            max_age=SESSION_COOKIE_MAX_AGE, httponly=True, samesite="lax", secure=SESSION_COOKIE_SECURE
+        )
+        return response
         
     except Exception as e:
         error_detail = f"Authentication failed: {str(e)}"
-        print(f"\nError in OAuth callback: {error_detail}")
+        logger.error("Error in OAuth callback: %s", error_detail)
         raise HTTPException(status_code=400, detail=error_detail)
 
+@app.post("/auth/logout")
+async def logout(request: Request):
+    """End the caller's session and forget its token."""
+    session_id = request_session_id(request)
+    if session_id != DEFAULT_SESSION_ID:
+        await sessions.remove(session_id)
+        await conversations.clear(session_id)
+        await asyncio.to_thread(token_storage.clear_tokens, session_id)
+    response = RedirectResponse(url="/", status_code=303)
+    response.delete_cookie(SESSION_COOKIE)
+    return response
+
 @app.get("/api")
-async def api_info():
+async def api_info(clickup_client: AsyncClickUpClient = Depends(require_clickup_client)):
     """API information endpoint."""
-    if not clickup_client:
-        raise HTTPException(status_code=401, detail="Not authenticated with ClickUp")
-    
     return {
         "message": "OpenAI ClickUp Agent API",
         "endpoints": {
             "/auth": "GET - Start OAuth flow",
             "/oauth/callback": "GET - OAuth callback handler",
+            "/auth/logout": "POST - End the current session",
             "/process": "POST - Process natural language requests for task management",
+            "/process/stream": "POST - Like /process, streamed as Server-Sent Events (token, result, error)",
             "/spaces": "GET - List all available ClickUp spaces",
-            "/tasks/{list_id}": "GET - List all tasks in a specific list"
+            "/search": "GET - Full-text search over fetched tasks (?q=, space_id, list_id, status, limit)",
+            "/tasks/bulk": "POST - Create many tasks concurrently with per-item results",
+            "/tasks/{list_id}": "GET - List all tasks in a specific list (?stream=true for NDJSON, ?page=N for one page)",
+            "/jobs": "POST - Queue a background job (bulk_create, export_list, resync); GET - List the session's jobs",
+            "/jobs/{job_id}": "GET - Job status and progress (/jobs/{job_id}/result once finished)",
+            "/webhooks/clickup": "POST - ClickUp webhook receiver (signed with X-Signature)",
+            "/metrics": "GET - Service counters (ClickUp rate limiting, retries, webhook events)",
+            "/admin/response-cache": "GET/DELETE - Inspect or flush the assistant response cache (ADMIN_TOKEN)",
+            "/healthz": "GET - Liveness probe",
+            "/readyz": "GET - Readiness probe (503 until startup restore and warm-up finish)"
         }
     }
 
@@ -166,7 +444,11 @@ Special Commands:
 3. List Tasks:
    - When user asks to list tasks -> Return "LIST_TASKS"
    
-4. Create Task:
+4. Search Tasks:
+   - When user asks to find or search for tasks about something -> Return "SEARCH_TASKS: {query}"
+   Example: If user says "find tasks about the login page" -> Return "SEARCH_TASKS: login page"
+   
+5. Create Task:
    - When user asks to create a task, return task details in this format:
      Update Documentation
      Objective:
@@ -185,209 +467,810 @@ Special Commands:
 
 Remember: You have real access to ClickUp through the backend API. For list/get commands, just return the command keyword and let the backend handle the API calls."""
 
-def get_assistant_response(user_message: str) -> str:
+# Cache of assistant responses keyed on the message, prompt and model;
+# RESPONSE_CACHE=false always asks the model
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE", "true").lower() in ("1", "true", "yes", "on")
+response_cache = ResponseCache(ASSISTANT_PROMPT, OPENAI_MODEL)
+
+def assistant_messages(user_message: str) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": ASSISTANT_PROMPT},
+        {"role": "user", "content": user_message}
+    ]
+
+async def cache_assistant_response(user_message: str, response_text: str) -> None:
+    if RESPONSE_CACHE_ENABLED and response_text:
+        try:
+            await asyncio.to_thread(response_cache.set, user_message, response_text)
+        except Exception as e:
+            logger.warning("Failed to cache assistant response: %s", e)
+
+async def cached_assistant_response(user_message: str) -> Optional[str]:
+    """The cached assistant response for a message, if any.
+
+    Checked before admission, so cache hits don't wait for the LLM lane.
+    """
+    if not RESPONSE_CACHE_ENABLED:
+        return None
+    cached = await asyncio.to_thread(response_cache.get, user_message)
+    if cached is not None:
+        logger.debug("Using cached assistant response")
+    return cached
+
+async def get_assistant_response(user_message: str) -> str:
     """Get response from OpenAI assistant."""
     try:
-        print(f"\nGetting OpenAI response for message: {user_message}")
-        response = client.chat.completions.create(
-            model="gpt-4-turbo-preview",
-            messages=[
-                {"role": "system", "content": ASSISTANT_PROMPT},
-                {"role": "user", "content": user_message}
-            ]
+        logger.debug("Getting OpenAI response for message: %s", user_message)
+        response = await client.chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=assistant_messages(user_message)
         )
         response_text = response.choices[0].message.content
-        print(f"OpenAI Response: {response_text}")
-        return response_text
+        logger.debug("OpenAI Response: %s", response_text)
     except Exception as e:
-        print(f"OpenAI API error: {str(e)}")
+        logger.error("OpenAI API error: %s", e)
         raise HTTPException(status_code=500, detail=f"OpenAI API error: {str(e)}")
+    await cache_assistant_response(user_message, response_text)
+    return response_text
 
-@app.post("/process")
-async def process_request(request: Dict[str, str]):
-    """Process user request and interact with ClickUp."""
-    global clickup_client
-    
-    try:
-        print("\nProcessing Request:")
-        print(f"Request Data: {json.dumps(request, indent=2)}")
-        
-        if not clickup_client:
-            print("Error: Not authenticated with ClickUp")
-            raise HTTPException(status_code=401, detail="Not authenticated with ClickUp")
-            
-        user_message = request.get("message")
-        if not user_message:
-            print("Error: No message provided")
-            raise HTTPException(status_code=400, detail="Message is required")
+async def stream_assistant_response(user_message: str, cached: Optional[str] = None) -> AsyncIterator[str]:
+    """Yield the assistant response in pieces as OpenAI generates it, or in one piece if ``cached``."""
+    if cached is not None:
+        yield cached
+        return
+    logger.debug("Streaming OpenAI response for message: %s", user_message)
+    parts = []
+    stream = await client.chat.completions.create(
+        model=OPENAI_MODEL,
+        messages=assistant_messages(user_message),
+        stream=True
+    )
+    async for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            parts.append(delta)
+            yield delta
+    await cache_assistant_response(user_message, "".join(parts))
 
-        print(f"\nUser Message: {user_message}")
+async def resolve_default_list(client: AsyncClickUpClient, spaces: Optional[Dict[str, Any]] = None,
+                               space_id: Optional[str] = None) -> Dict[str, Any]:
+    """Get the list new tasks go to by default: the first list of ``space_id``, or of the first space."""
+    if space_id is None:
+        if spaces is None:
+            logger.debug("Getting ClickUp spaces")
+            spaces = await client.list_spaces()
+        if "spaces" not in spaces or not spaces["spaces"]:
+            logger.error("No spaces found")
+            raise HTTPException(status_code=404, detail="No spaces found")
+        space_id = spaces["spaces"][0]["id"]
+    logger.debug("Using space ID: %s", space_id)
 
-        # Get AI response
-        assistant_response = get_assistant_response(user_message)
-        print(f"Assistant Response: {assistant_response}")
+    logger.debug("Getting lists in space")
+    lists = await client.list_lists(space_id)
+    if "lists" not in lists or not lists["lists"]:
+        logger.error("No lists found")
+        raise HTTPException(status_code=404, detail="No lists found")
 
-        # Handle space selection
-        if assistant_response.startswith("SELECT_SPACE:"):
-            space_name = assistant_response.split(":", 1)[1].strip()
-            print(f"\nSelecting space: {space_name}")
-            try:
-                spaces = clickup_client.list_spaces()
-                if "error" in spaces:
-                    error_msg = f"Error listing spaces: {spaces['error']}"
-                    print(f"Error: {error_msg}")
-                    return {
-                        "error": error_msg,
-                        "assistant_response": "I had trouble accessing ClickUp spaces. Please check your credentials and try again."
-                    }
-                
-                # Find the space by name
-                space = next((s for s in spaces.get('spaces', []) if s['name'].lower() == space_name.lower()), None)
-                if not space:
+    default_list = lists["lists"][0]
+    logger.debug("Using list ID: %s", default_list["id"])
+    return default_list
+
+def is_task_creation(user_message: str) -> bool:
+    return any(phrase in user_message.lower() for phrase in ["create task", "new task", "add task"])
+
+class HierarchyPrefetch:
+    """ClickUp lookups for one request, started while the model is still answering.
+
+    ``start`` fetches the spaces (which also verifies the session's token and
+    team) and, for task creation, the default list, so the final action only
+    waits for whatever is still outstanding. Without ``start`` each lookup
+    runs when it is first awaited. Unused results still land in the
+    hierarchy cache. The default list follows the session's ``selection``.
+    """
+
+    def __init__(self, client: AsyncClickUpClient, selection: Optional[Dict[str, Any]] = None):
+        self.client = client
+        self.selection = selection or {}
+        self._spaces: Optional[asyncio.Task] = None
+        self._default_list: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _spawn(coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        # Errors surface where the result is awaited; retrieve them here so an
+        # unused lookup that failed doesn't log "exception was never retrieved"
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return task
+
+    def start(self, default_list: bool = False) -> "HierarchyPrefetch":
+        if self._spaces is None:
+            self._spaces = self._spawn(self.client.list_spaces())
+        if default_list and self._default_list is None:
+            self._default_list = self._spawn(self._resolve_default_list())
+        return self
+
+    async def _resolve_default_list(self) -> Dict[str, Any]:
+        if self.selection.get("list_id"):
+            return {"id": self.selection["list_id"], "name": self.selection.get("list_name")}
+        if self.selection.get("space_id"):
+            return await resolve_default_list(self.client, space_id=self.selection["space_id"])
+        return await resolve_default_list(self.client, await self.spaces())
+
+    async def spaces(self) -> Dict[str, Any]:
+        if self._spaces is None:
+            return await self.client.list_spaces()
+        return await self._spaces
+
+    async def default_list(self) -> Dict[str, Any]:
+        if self._default_list is None:
+            return await self._resolve_default_list()
+        return await self._default_list
+
+# Tasks shown in a LIST_TASKS reply
+LIST_TASKS_LIMIT = 25
+
+def format_task_list(tasks: List[Dict[str, Any]], limit: int = LIST_TASKS_LIMIT) -> str:
+    lines = [f"- {task.get('name')} ({(task.get('status') or {}).get('status') or 'no status'})" for task in tasks[:limit]]
+    if len(tasks) > limit:
+        lines.append(f"- ...and {len(tasks) - limit} more")
+    return "\n".join(lines)
+
+async def run_assistant_command(clickup_client: AsyncClickUpClient, user_message: str,
+                                assistant_response: str, session_id: str = DEFAULT_SESSION_ID,
+                                hierarchy: Optional[HierarchyPrefetch] = None) -> Dict[str, Any]:
+    """Carry out the ClickUp action for an assistant response and build the reply."""
+    if hierarchy is None:
+        hierarchy = HierarchyPrefetch(clickup_client, await asyncio.to_thread(conversations.get, session_id))
+    # Handle space selection
+    if assistant_response.startswith("SELECT_SPACE:"):
+        space_name = assistant_response.split(":", 1)[1].strip()
+        logger.debug("Selecting space: %s", space_name)
+        try:
+            spaces = await hierarchy.spaces()
+            if "error" in spaces:
+                error_msg = f"Error listing spaces: {spaces['error']}"
+                logger.error("%s", error_msg)
+                return {
+                    "error": error_msg,
+                    "assistant_response": "I had trouble accessing ClickUp spaces. Please check your credentials and try again."
+                }
+            
+            # Only an exact name selects a space; close matches are offered
+            # back to the user rather than guessed, since tasks follow the selection
+            index = NameIndex(spaces.get("spaces", []))
+            space = index.get(space_name)
+            if not space:
+                candidates = [item["name"] for item, _ in index.search(space_name, limit=3)]
+                if not candidates:
                     return {
                         "message": "Space not found",
                         "assistant_response": f"I couldn't find a space named '{space_name}'. Please check the space name and try again."
                     }
-                
-                print(f"Found space: {space['name']} (ID: {space['id']})")
-                return {
-                    "message": "Space selected",
-                    "assistant_response": f"Selected space: {space['name']}",
-                    "space": space
-                }
-            except Exception as e:
-                error_message = f"Error selecting space: {str(e)}"
-                print(f"Error: {error_message}")
+                suggestion = " or ".join(f"'{name}'" for name in candidates)
+                if len(candidates) == 1:
+                    how = f"Say \"use {candidates[0]}\" to select it."
+                else:
+                    how = "Say \"use\" and the full space name to select one."
                 return {
-                    "error": error_message,
-                    "assistant_response": "I encountered an error while trying to select the space. Please try again."
+                    "message": "Space not confirmed",
+                    "assistant_response": f"I couldn't find a space named '{space_name}'. Did you mean {suggestion}? {how}",
+                    "candidates": candidates
                 }
+            
+            logger.debug("Found space: %s (ID: %s)", space['name'], space['id'])
+            # Remember the space and load it ahead of the follow-up commands
+            await asyncio.to_thread(conversations.select_space, session_id, space)
+            conversations.prefetch(session_id, clickup_client, space["id"])
+            return {
+                "message": "Space selected",
+                "assistant_response": f"Selected space: {space['name']}",
+                "space": space
+            }
+        except Exception as e:
+            error_message = f"Error selecting space: {str(e)}"
+            logger.error("%s", error_message)
+            return {
+                "error": error_message,
+                "assistant_response": "I encountered an error while trying to select the space. Please try again."
+            }
 
-        # Handle list spaces command
-        if assistant_response == "LIST_SPACES":
-            print("\nProcessing list spaces request...")
-            try:
-                spaces = clickup_client.list_spaces()
-                if "error" in spaces:
-                    error_msg = f"Error listing spaces: {spaces['error']}"
-                    print(f"Error: {error_msg}")
-                    return {
-                        "error": error_msg,
-                        "assistant_response": "I had trouble retrieving your ClickUp spaces. Please check your credentials and try again."
-                    }
-                space_list = "\n".join([f"- {space['name']}" for space in spaces.get('spaces', [])])
-                print(f"Found spaces: {space_list}")
-                return {
-                    "message": "Spaces retrieved successfully",
-                    "assistant_response": f"Here are your ClickUp spaces:\n{space_list}"
-                }
-            except Exception as e:
-                error_message = f"Error listing spaces: {str(e)}"
-                print(f"Error: {error_message}")
-                return {
-                    "error": error_message,
-                    "assistant_response": "I encountered an error while trying to list your spaces. Please try again."
-                }
+    # Handle task search
+    if assistant_response.startswith("SEARCH_TASKS:"):
+        query = assistant_response.split(":", 1)[1].strip()
+        logger.debug("Searching tasks: %s", query)
+        space_ids = await session_space_ids(clickup_client)
+        results = await asyncio.to_thread(search_index.search, query, limit=10, space_ids=space_ids)
+        if not results:
+            return {
+                "message": "No matching tasks",
+                "assistant_response": f"I couldn't find any tasks matching '{query}'.",
+                "results": []
+            }
+        task_list = "\n".join(f"- {task['name']} ({task['status'] or 'no status'})" for task in results)
+        return {
+            "message": "Tasks found",
+            "assistant_response": f"Here are the tasks matching '{query}':\n{task_list}",
+            "results": results
+        }
 
-        # Handle task creation
-        if any(phrase in user_message.lower() for phrase in ["create task", "new task", "add task"]):
-            print("\nProcessing task creation request...")
-            try:
-                # Get the first list from the first space
-                print("Getting ClickUp spaces...")
-                spaces = clickup_client.list_spaces()
-                if "spaces" not in spaces or not spaces["spaces"]:
-                    print("Error: No spaces found")
-                    raise HTTPException(status_code=404, detail="No spaces found")
-                
-                space_id = spaces["spaces"][0]["id"]
-                print(f"Using space ID: {space_id}")
-                
-                print("Getting lists in space...")
-                lists = clickup_client.list_lists(space_id)
-                if "lists" not in lists or not lists["lists"]:
-                    print("Error: No lists found")
-                    raise HTTPException(status_code=404, detail="No lists found")
-                
-                list_id = lists["lists"][0]["id"]
-                print(f"Using list ID: {list_id}")
-
-                # Parse assistant response for task details
-                print("Parsing assistant response for task details...")
-                lines = assistant_response.split("\n", 1)
-                task_name = lines[0].strip()
-                task_description = lines[1].strip() if len(lines) > 1 else ""
-                print(f"Task Name: {task_name}")
-                print(f"Task Description: {task_description}")
-
-                # Create task in ClickUp
-                print("Creating task in ClickUp...")
-                task = clickup_client.create_task(list_id, task_name, task_description)
-                
-                if "error" in task:
-                    print(f"Error creating task: {task['error']}")
-                    raise HTTPException(status_code=500, detail=f"ClickUp API error: {task['error']}")
-
-                print("Task created successfully")
+    # Handle list spaces command
+    if assistant_response == "LIST_SPACES":
+        logger.debug("Processing list spaces request")
+        try:
+            spaces = await hierarchy.spaces()
+            if "error" in spaces:
+                error_msg = f"Error listing spaces: {spaces['error']}"
+                logger.error("%s", error_msg)
                 return {
-                    "message": "Task created successfully",
-                    "assistant_response": assistant_response,
-                    "task": task
+                    "error": error_msg,
+                    "assistant_response": "I had trouble retrieving your ClickUp spaces. Please check your credentials and try again."
                 }
+            space_list = "\n".join([f"- {space['name']}" for space in spaces.get('spaces', [])])
+            logger.debug("Found spaces: %s", space_list)
+            return {
+                "message": "Spaces retrieved successfully",
+                "assistant_response": f"Here are your ClickUp spaces:\n{space_list}"
+            }
+        except Exception as e:
+            error_message = f"Error listing spaces: {str(e)}"
+            logger.error("%s", error_message)
+            return {
+                "error": error_message,
+                "assistant_response": "I encountered an error while trying to list your spaces. Please try again."
+            }
 
-            except Exception as e:
-                error_message = f"Error creating task: {str(e)}"
-                print(f"Error: {error_message}")
+    # Handle list tasks command
+    if assistant_response == "LIST_TASKS":
+        logger.debug("Processing list tasks request")
+        try:
+            task_list = await hierarchy.default_list()
+            await conversations.wait_for_prefetch(session_id, CONVERSATION_PREFETCH_WAIT)
+            space_ids = [space["id"] for space in (await hierarchy.spaces()).get("spaces", [])]
+            tasks = await asyncio.to_thread(mirror.get_tasks, task_list["id"], CONVERSATION_MAX_AGE,
+                                            space_ids=space_ids, partial=True)
+            if tasks is None:
+                # Not prefetched: the first page is enough for a chat reply
+                tasks = await clickup_client.list_tasks(task_list["id"], page=0)
+            tasks = tasks.get("tasks", [])
+            list_name = task_list.get("name") or "your list"
+            if not tasks:
                 return {
-                    "error": error_message,
-                    "assistant_response": "I encountered an error while trying to create the task. Please make sure your ClickUp credentials are correct and try again."
+                    "message": "No tasks found",
+                    "assistant_response": f"There are no open tasks in {list_name}.",
+                    "tasks": []
                 }
-        
-        # Default response for other requests
-        print("Processing default request...")
-        return {
-            "message": "Request processed",
-            "assistant_response": assistant_response
-        }
+            return {
+                "message": "Tasks retrieved successfully",
+                "assistant_response": f"Here are the tasks in {list_name}:\n{format_task_list(tasks)}",
+                "tasks": tasks[:LIST_TASKS_LIMIT]
+            }
+        except Exception as e:
+            error_message = f"Error listing tasks: {str(e)}"
+            logger.error("%s", error_message)
+            return {
+                "error": error_message,
+                "assistant_response": "I encountered an error while trying to list your tasks. Please try again."
+            }
+
+    # Handle task creation
+    if is_task_creation(user_message):
+        logger.debug("Processing task creation request")
+        try:
+            list_id = (await hierarchy.default_list())["id"]
+
+            # Parse assistant response for task details
+            logger.debug("Parsing assistant response for task details")
+            lines = assistant_response.split("\n", 1)
+            task_name = lines[0].strip()
+            task_description = lines[1].strip() if len(lines) > 1 else ""
+            logger.debug("Task Name: %s", task_name)
+            logger.debug("Task Description: %s", task_description)
+
+            # Create task in ClickUp
+            logger.debug("Creating task in ClickUp")
+            task = await clickup_client.create_task(list_id, task_name, task_description)
+            
+            if "error" in task:
+                logger.error("Error creating task: %s", task['error'])
+                raise HTTPException(status_code=500, detail=f"ClickUp API error: {task['error']}")
+
+            logger.info("Task created successfully")
+            # Keep a prefetched list current for the next LIST_TASKS
+            await asyncio.to_thread(mirror.upsert_tasks, [task], list_id)
+            return {
+                "message": "Task created successfully",
+                "assistant_response": assistant_response,
+                "task": task
+            }
+
+        except Exception as e:
+            error_message = f"Error creating task: {str(e)}"
+            logger.error("%s", error_message)
+            return {
+                "error": error_message,
+                "assistant_response": "I encountered an error while trying to create the task. Please make sure your ClickUp credentials are correct and try again."
+            }
+    
+    # Default response for other requests
+    logger.debug("Processing default request")
+    return {
+        "message": "Request processed",
+        "assistant_response": assistant_response
+    }
+
+@app.post("/process")
+async def process_request(request: Dict[str, str],
+                          clickup_client: Optional[AsyncClickUpClient] = Depends(get_clickup_client),
+                          session_id: str = Depends(request_session_id)):
+    """Process user request and interact with ClickUp."""
+    try:
+        if not clickup_client:
+            logger.warning("Not authenticated with ClickUp")
+            raise HTTPException(status_code=401, detail="Not authenticated with ClickUp")
+            
+        user_message = request.get("message")
+        if not user_message:
+            logger.warning("No message provided")
+            raise HTTPException(status_code=400, detail="Message is required")
+
+        logger.debug("User Message: %s", user_message)
+
+        # Recognise commands locally; only drafting and unclear messages need the model
+        intent = intent_router.route(user_message) if INTENT_ROUTER_ENABLED else None
+        cached = None if intent else await cached_assistant_response(user_message)
+        # Only a model call needs the LLM lane; commands and cache hits are reads
+        lane = admission.llm if intent is None and cached is None else admission.read
+        async with lane.slot(admission_user(session_id)):
+            hierarchy = HierarchyPrefetch(clickup_client, await asyncio.to_thread(conversations.get, session_id))
+            if intent:
+                assistant_response = intent.response
+            elif cached is not None:
+                assistant_response = cached
+            else:
+                # The ClickUp lookups don't depend on the reply, so run them alongside it
+                hierarchy.start(default_list=is_task_creation(user_message))
+                assistant_response = await get_assistant_response(user_message)
+            logger.debug("Assistant Response: %s", assistant_response)
 
+            return await run_assistant_command(clickup_client, user_message, assistant_response, session_id, hierarchy)
+
+    except Overloaded:
+        raise
     except Exception as e:
         error_message = f"Error processing request: {str(e)}"
-        print(f"Error: {error_message}")
+        logger.error("%s", error_message)
         return {
             "error": error_message,
             "assistant_response": "I encountered an error while processing your request. Please try again."
         }
 
-@app.get("/spaces")
-async def list_spaces():
-    """List all ClickUp spaces."""
-    global clickup_client
-    if not clickup_client:
-        raise HTTPException(status_code=401, detail="Not authenticated with ClickUp")
-        
+# Command keywords the model may answer with. Streamed text is held back
+# while it could still be one, so users never see raw keywords.
+COMMAND_PREFIXES = ("LIST_SPACES", "LIST_TASKS", "SELECT_SPACE:", "SEARCH_TASKS:")
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def stream_process_events(clickup_client: AsyncClickUpClient, user_message: str, session_id: str,
+                                intent: Optional[Intent], cached: Optional[str],
+                                ticket: Ticket) -> AsyncIterator[str]:
+    """Yield ``token`` events while the assistant responds, then a ``result`` event.
+
+    ``intent`` is the locally routed command, if any, ``cached`` the cached
+    assistant response, if any, and ``ticket`` the admission slot, released
+    when the stream ends.
+    """
+    try:
+        hierarchy = HierarchyPrefetch(clickup_client, await asyncio.to_thread(conversations.get, session_id))
+        if intent:
+            assistant_response = intent.response
+        else:
+            if cached is None:
+                hierarchy.start(default_list=is_task_creation(user_message))
+            parts = []
+            held = ""
+            streaming = False
+            async for delta in stream_assistant_response(user_message, cached):
+                parts.append(delta)
+                if streaming:
+                    yield sse_event("token", {"text": delta})
+                    continue
+                held += delta
+                text = held.lstrip()
+                if not any(prefix.startswith(text) or text.startswith(prefix) for prefix in COMMAND_PREFIXES):
+                    streaming = True
+                    yield sse_event("token", {"text": held})
+            assistant_response = "".join(parts)
+        logger.debug("Assistant Response: %s", assistant_response)
+
+        result = await run_assistant_command(clickup_client, user_message, assistant_response, session_id, hierarchy)
+        yield sse_event("result", result)
+    except Exception as e:
+        # Headers are already sent, so report the failure in-band
+        error_message = f"Error processing request: {str(e)}"
+        logger.error("%s", error_message)
+        yield sse_event("error", {
+            "error": error_message,
+            "assistant_response": "I encountered an error while processing your request. Please try again."
+        })
+    finally:
+        ticket.release()
+
+@app.post("/process/stream")
+async def process_request_stream(request: Dict[str, str],
+                                 clickup_client: AsyncClickUpClient = Depends(require_clickup_client),
+                                 session_id: str = Depends(request_session_id)):
+    """Process a user request, streaming the reply as Server-Sent Events.
+
+    ``token`` events carry the assistant's text as it is generated (command
+    keywords are not streamed). A final ``result`` event carries the same
+    body /process returns, or an ``error`` event if processing failed.
+    """
+    user_message = request.get("message")
+    if not user_message:
+        raise HTTPException(status_code=400, detail="Message is required")
+    # Admit before the headers go out, so an overloaded service can still answer 503
+    intent = intent_router.route(user_message) if INTENT_ROUTER_ENABLED else None
+    cached = None if intent else await cached_assistant_response(user_message)
+    lane = admission.llm if intent is None and cached is None else admission.read
+    ticket = await lane.acquire(admission_user(session_id))
+    return StreamingResponse(
+        stream_process_events(clickup_client, user_message, session_id, intent, cached, ticket),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Covers a client that disconnects before the stream starts
+        background=BackgroundTask(ticket.release)
+    )
+
+@app.get("/search", dependencies=[Depends(admit_read)])
+async def search_tasks(q: str, space_id: Optional[str] = None, list_id: Optional[str] = None,
+                       status: Optional[str] = None, limit: int = 20,
+                       clickup_client: AsyncClickUpClient = Depends(require_clickup_client)):
+    """Full-text search over task names, descriptions and custom fields.
+
+    Searches the local index of tasks the service has fetched, ranked by
+    relevance, optionally filtered by space, list and status.
+    """
+    limit = max(1, min(limit, 100))
+    space_ids = await session_space_ids(clickup_client)
+    results = await asyncio.to_thread(
+        search_index.search, q, space_id=space_id, list_id=list_id, status=status, limit=limit,
+        space_ids=space_ids
+    )
+    return {"query": q, "results": results}
+
+# ETag/304 and compression for the JSON endpoints clients poll
+http_cache = HTTPCache()
+
+@app.get("/spaces", dependencies=[Depends(admit_read)])
+async def list_spaces(request: Request, max_age: Optional[float] = None,
+                      clickup_client: AsyncClickUpClient = Depends(require_clickup_client)):
+    """List all ClickUp spaces.
+
+    With a positive ``max_age`` (seconds, default MIRROR_MAX_AGE) spaces are
+    served from the local mirror, re-syncing it first if it is older than that.
+    Only the spaces the session can see are returned.
+    Responses carry an ETag; a matching If-None-Match gets a 304.
+    """
+    max_age = MIRROR_MAX_AGE if max_age is None else max_age
     try:
-        spaces = clickup_client.list_spaces()
+        if max_age > 0:
+            team_id = await clickup_client.get_team_id()
+            space_ids = await session_space_ids(clickup_client)
+            spaces = await asyncio.to_thread(mirror.get_spaces, team_id, max_age, space_ids=space_ids)
+            # Another session's sync may have left out spaces this one can see
+            if spaces is None or len(spaces["spaces"]) < len(space_ids):
+                await mirror.sync_spaces(clickup_client)
+                spaces = await asyncio.to_thread(mirror.get_spaces, team_id, max_age, space_ids=space_ids)
+            return await http_cache.json_response(request, spaces)
+
+        spaces = await clickup_client.list_spaces()
         if "error" in spaces:
             raise HTTPException(status_code=500, detail=f"ClickUp API error: {spaces['error']}")
-        return spaces
+        return await http_cache.json_response(request, spaces)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/tasks/{list_id}")
-async def list_tasks(list_id: str):
-    """List all tasks in a specific list."""
-    global clickup_client
-    if not clickup_client:
-        raise HTTPException(status_code=401, detail="Not authenticated with ClickUp")
-        
+async def stream_tasks_ndjson(client: AsyncClickUpClient, list_id: str):
+    """Yield the tasks of a list as NDJSON lines while later pages are still loading."""
     try:
-        tasks = clickup_client.list_tasks(list_id)
+        async for task in client.iter_tasks(list_id):
+            yield json.dumps(task) + "\n"
+    except Exception as e:
+        # Headers are already sent, so report the failure in-band
+        yield json.dumps({"error": str(e)}) + "\n"
+
+BULK_MAX_TASKS = int(os.getenv("BULK_MAX_TASKS", "1000"))
+BULK_MAX_CONCURRENCY = int(os.getenv("BULK_MAX_CONCURRENCY", "32"))
+
+def validate_bulk_request(request: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """Check a bulk creation body and return its tasks and capped concurrency."""
+    tasks = request.get("tasks")
+    if not isinstance(tasks, list) or not tasks:
+        raise HTTPException(status_code=400, detail="'tasks' must be a non-empty list")
+    if len(tasks) > BULK_MAX_TASKS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_TASKS} tasks per request")
+    if not all(isinstance(task, dict) for task in tasks):
+        raise HTTPException(status_code=400, detail="Each task must be an object")
+
+    concurrency = request.get("concurrency")
+    if concurrency is not None:
+        if not isinstance(concurrency, int) or concurrency < 1:
+            raise HTTPException(status_code=400, detail="'concurrency' must be a positive integer")
+        concurrency = min(concurrency, BULK_MAX_CONCURRENCY)
+    return tasks, concurrency
+
+@app.post("/tasks/bulk")
+async def create_tasks_bulk(request: Dict[str, Any],
+                            clickup_client: AsyncClickUpClient = Depends(require_clickup_client)):
+    """Create many tasks at once.
+
+    Body: ``{"list_id": "...", "tasks": [{"name": "...", "description": "..."}], "concurrency": 8}``.
+    ``list_id`` defaults to the first list of the first space, and each task
+    may override it. Failures are reported per item instead of failing the batch.
+    """
+    tasks, concurrency = validate_bulk_request(request)
+    list_id = request.get("list_id")
+    if not list_id and not all(task.get("list_id") for task in tasks):
+        list_id = (await resolve_default_list(clickup_client))["id"]
+
+    results = await clickup_client.create_tasks_bulk(list_id, tasks, concurrency=concurrency)
+    created = sum(1 for result in results if result["success"])
+    return {
+        "created": created,
+        "failed": len(results) - created,
+        "results": results
+    }
+
+@app.get("/tasks/{list_id}", dependencies=[Depends(admit_read)])
+async def list_tasks(request: Request, list_id: str, stream: bool = False, page: Optional[int] = None,
+                     max_age: Optional[float] = None,
+                     clickup_client: AsyncClickUpClient = Depends(require_clickup_client)):
+    """List all tasks in a specific list.
+
+    With ``stream=true`` tasks are returned as NDJSON (one task per line) as
+    pages arrive. With ``page`` only that page is returned. Otherwise, with a
+    positive ``max_age`` (seconds, default MIRROR_MAX_AGE) tasks are served
+    from the local mirror after an incremental sync if it is older than that.
+    Non-streamed responses carry an ETag; a matching If-None-Match gets a 304.
+    """
+    if stream:
+        return StreamingResponse(
+            stream_tasks_ndjson(clickup_client, list_id),
+            media_type="application/x-ndjson"
+        )
+
+    max_age = MIRROR_MAX_AGE if max_age is None else max_age
+    try:
+        if max_age > 0 and page is None:
+            space_ids = await session_space_ids(clickup_client)
+            tasks = await asyncio.to_thread(mirror.get_tasks, list_id, max_age, space_ids=space_ids)
+            if tasks is None:
+                await mirror.sync_list(clickup_client, list_id)
+                tasks = await asyncio.to_thread(mirror.get_tasks, list_id, max_age, space_ids=space_ids)
+            return await http_cache.json_response(request, tasks)
+
+        tasks = await clickup_client.list_tasks(list_id, page=page)
         if "error" in tasks:
             raise HTTPException(status_code=500, detail=f"ClickUp API error: {tasks['error']}")
-        return tasks
+        return await http_cache.json_response(request, tasks)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Long-running ClickUp work (bulk creates, list exports, mirror re-syncs) runs
+# as background jobs on JOB_WORKERS workers per process. Job records live in
+# JOBS_DB_PATH, so with several uvicorn workers any of them can run a job and
+# report its status.
+job_queue = JobQueue()
+RESYNC_CONCURRENCY = int(os.getenv("RESYNC_CONCURRENCY", "4"))
+
+@asynccontextmanager
+async def job_client(job: Job) -> AsyncIterator[AsyncClickUpClient]:
+    """The submitting session's client, leased for the whole job."""
+    async with sessions.lease(job.owner) as clickup_client:
+        if not clickup_client:
+            raise ValueError("The session that submitted this job is no longer authenticated")
+        yield clickup_client
+
+async def run_bulk_create_job(job: Job) -> Dict[str, Any]:
+    async with job_client(job) as clickup_client:
+        tasks = job.params["tasks"]
+        list_id = job.params.get("list_id")
+        if not list_id and not all(task.get("list_id") for task in tasks):
+            list_id = (await resolve_default_list(clickup_client))["id"]
+
+        job.progress(0, len(tasks))
+        results = await clickup_client.create_tasks_bulk(
+            list_id, tasks, concurrency=job.params.get("concurrency"),
+            on_result=lambda result: job.progress(job.done + 1)
+        )
+        created = sum(1 for result in results if result["success"])
+        return {"created": created, "failed": len(results) - created, "results": results}
+
+async def run_export_list_job(job: Job) -> Dict[str, Any]:
+    async with job_client(job) as clickup_client:
+        list_id = job.params["list_id"]
+        tasks = []
+        async for page in clickup_client.iter_task_pages(list_id):
+            tasks.extend(page)
+            job.progress(len(tasks))
+        return {"list_id": list_id, "tasks": tasks}
+
+async def run_resync_job(job: Job) -> Dict[str, Any]:
+    async with job_client(job) as clickup_client:
+        list_ids = job.params.get("list_ids")
+        if not list_ids:
+            space_id = job.params.get("space_id")
+            if space_id:
+                space_ids = [space_id]
+            else:
+                spaces = await mirror.sync_spaces(clickup_client)
+                space_ids = [space["id"] for space in spaces.get("spaces", [])]
+            lists = await asyncio.gather(*(mirror.sync_lists(clickup_client, space_id) for space_id in space_ids))
+            list_ids = [item["id"] for result in lists for item in result.get("lists", [])]
+
+        job.progress(0, len(list_ids))
+        semaphore = asyncio.Semaphore(RESYNC_CONCURRENCY)
+
+        async def sync_one(list_id: str) -> int:
+            async with semaphore:
+                written = await mirror.sync_list(clickup_client, list_id)
+            job.progress(job.done + 1)
+            return written
+
+        written = await asyncio.gather(*(sync_one(list_id) for list_id in list_ids))
+        return {"lists": len(list_ids), "tasks_written": sum(written)}
+
+job_queue.register("bulk_create", run_bulk_create_job)
+job_queue.register("export_list", run_export_list_job)
+job_queue.register("resync", run_resync_job)
+
+def validate_job_params(kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Check a job's parameters up front so bad requests fail with a 400, not a failed job."""
+    if kind == "bulk_create":
+        tasks, concurrency = validate_bulk_request(params)
+        return {"list_id": params.get("list_id"), "tasks": tasks, "concurrency": concurrency}
+    if kind == "export_list":
+        if not params.get("list_id"):
+            raise HTTPException(status_code=400, detail="'list_id' is required")
+        return {"list_id": str(params["list_id"])}
+    list_ids = params.get("list_ids")
+    if list_ids is not None and (not isinstance(list_ids, list) or not all(isinstance(i, str) for i in list_ids)):
+        raise HTTPException(status_code=400, detail="'list_ids' must be a list of list IDs")
+    return {"space_id": params.get("space_id"), "list_ids": list_ids}
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: Dict[str, Any], session_id: str = Depends(request_session_id),
+                     clickup_client: AsyncClickUpClient = Depends(require_clickup_client)):
+    """Queue a long-running ClickUp operation.
+
+    Body: ``{"kind": "bulk_create" | "export_list" | "resync", "params": {...}}``.
+    ``bulk_create`` takes the /tasks/bulk body, ``export_list`` a ``list_id``,
+    and ``resync`` an optional ``space_id`` or ``list_ids`` (default: every
+    list). Poll the returned job's URL for status and progress.
+    """
+    kind = request.get("kind")
+    if kind not in job_queue.handlers:
+        raise HTTPException(status_code=400, detail=f"'kind' must be one of: {', '.join(job_queue.handlers)}")
+    params = request.get("params") or {}
+    if not isinstance(params, dict):
+        raise HTTPException(status_code=400, detail="'params' must be an object")
+
+    try:
+        job = await job_queue.submit(kind, session_id, validate_job_params(kind, params))
+    except JobQueueFull:
+        raise HTTPException(status_code=503, detail="Too many queued jobs; try again later",
+                            headers={"Retry-After": "30"})
+    return JSONResponse(status_code=202, content=job, headers={"Location": f"/jobs/{job['id']}"})
+
+@app.get("/jobs")
+async def list_jobs(limit: int = 50, session_id: str = Depends(request_session_id),
+                    clickup_client: AsyncClickUpClient = Depends(require_clickup_client)):
+    """The session's most recent jobs."""
+    return {"jobs": await asyncio.to_thread(job_queue.list, session_id, max(1, min(limit, 200)))}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, session_id: str = Depends(request_session_id),
+                  clickup_client: AsyncClickUpClient = Depends(require_clickup_client)):
+    """A job's status and progress."""
+    job = await asyncio.to_thread(job_queue.get, job_id, owner=session_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str, session_id: str = Depends(request_session_id),
+                         clickup_client: AsyncClickUpClient = Depends(require_clickup_client)):
+    """The result of a finished job."""
+    job = await asyncio.to_thread(job_queue.get, job_id, owner=session_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] not in ("succeeded", "failed"):
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return {**job, "result": await asyncio.to_thread(job_queue.get_result, job_id)}
+
+async def apply_webhook_event(event: Dict[str, Any]) -> None:
+    try:
+        await webhook_processor.apply(event, get_webhook_client())
+    except Exception as e:
+        logger.warning("Failed to apply ClickUp webhook event %s: %s", event.get("event"), e)
+
+@app.post("/webhooks/clickup")
+async def clickup_webhook(request: Request):
+    """Receive ClickUp webhook events and apply them to local caches.
+
+    The X-Signature header must be the HMAC-SHA256 of the raw body, keyed by
+    CLICKUP_WEBHOOK_SECRET or the secret stored when the webhook was
+    registered. Events are applied in the background so ClickUp gets a
+    fast acknowledgement.
+    """
+    body = await request.body()
+    try:
+        event = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON payload")
+    if not isinstance(event, dict):
+        raise HTTPException(status_code=400, detail="Invalid webhook payload")
+
+    secret = os.getenv("CLICKUP_WEBHOOK_SECRET") or token_storage.get_webhook_secret(str(event.get("webhook_id", "")))
+    if not verify_signature(body, request.headers.get("X-Signature"), secret):
+        logger.warning("Rejected ClickUp webhook with invalid signature")
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+
+    run_in_background(apply_webhook_event(event))
+    return {"status": "accepted"}
+
+def check_bearer_token(request: Request, token: str) -> None:
+    supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+    if not hmac.compare_digest(supplied.encode(), token.encode()):
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+def require_admin(request: Request) -> None:
+    """Allow admin endpoints only with ``Authorization: Bearer $ADMIN_TOKEN``."""
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if not admin_token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled; set ADMIN_TOKEN")
+    check_bearer_token(request, admin_token)
+
+def require_metrics_access(request: Request) -> None:
+    """Allow /metrics only with ``Authorization: Bearer $METRICS_TOKEN``, or the admin token."""
+    token = os.getenv("METRICS_TOKEN") or os.getenv("ADMIN_TOKEN")
+    if not token:
+        raise HTTPException(status_code=403, detail="Metrics are disabled; set METRICS_TOKEN or ADMIN_TOKEN")
+    check_bearer_token(request, token)
+
+@app.get("/admin/response-cache", dependencies=[Depends(require_admin)])
+async def inspect_response_cache(limit: int = 50):
+    """Response cache statistics and the most recently used entries."""
+    limit = max(1, min(limit, 500))
+    return {
+        "stats": response_cache.snapshot(),
+        "entries": await asyncio.to_thread(response_cache.entries, limit)
+    }
+
+@app.delete("/admin/response-cache", dependencies=[Depends(require_admin)])
+async def flush_response_cache():
+    """Drop every cached assistant response."""
+    removed = await asyncio.to_thread(response_cache.clear)
+    logger.info("Flushed %s cached assistant responses", removed)
+    return {"removed": removed}
+
+@app.get("/metrics", dependencies=[Depends(require_metrics_access)])
+async def metrics():
+    """Service counters."""
+    return {
+        "clickup_rate_limits": await asyncio.to_thread(rate_limit_stats),
+        "clickup_coalescing": coalescing_stats(),
+        "webhook_events": webhook_processor.stats,
+        "intent_router": intent_router.snapshot(),
+        "response_cache": response_cache.snapshot(),
+        "sessions": sessions.snapshot(),
+        "conversations": conversations.snapshot(),
+        "http_cache": http_cache.snapshot(),
+        "admission": admission.snapshot(),
+        "jobs": job_queue.snapshot()
+    }
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,11 +1,15 @@
 import os
+import logging
 from typing import Optional, Dict
 import requests
 from urllib.parse import quote
 from dotenv import load_dotenv
+from log_config import get_logger, redact_headers
 
 load_dotenv()
 
+logger = get_logger("auth")
+
 class ClickUpAuth:
     def __init__(self):
         self.client_id = os.getenv("CLICKUP_CLIENT_ID")
@@ -33,21 +37,14 @@ class ClickUpAuth:
             f"&scope={scope_string}"
             f"&state=clickup_oauth"
         )
-        print(f"\nOAuth Flow Debug:")
-        print(f"Client ID: {self.client_id}")
-        print(f"Redirect URI (raw): {self.redirect_uri}")
-        print(f"Redirect URI (encoded): {self.encoded_redirect_uri}")
-        print(f"Scopes (raw): {','.join(scopes)}")
-        print(f"Scopes (encoded): {scope_string}")
-        print(f"Full Auth URL: {auth_url}\n")
+        logger.debug("OAuth authorization URL built for redirect URI %s with scopes %s",
+                     self.redirect_uri, ",".join(scopes))
         return auth_url
 
     def get_access_token(self, code: str) -> Dict[str, str]:
         """Exchange authorization code for access token."""
         try:
-            print(f"\nToken Exchange Debug:")
-            print(f"Authorization Code: {code}")
-            print(f"Token URL: {self.token_url}")
+            logger.debug("Exchanging authorization code at %s", self.token_url)
             
             headers = {
                 "Content-Type": "application/json",
@@ -62,37 +59,30 @@ class ClickUpAuth:
                 "redirect_uri": self.redirect_uri
             }
             
-            print(f"Request Data (redacted):")
-            safe_data = {**data}
-            safe_data["client_secret"] = "[REDACTED]"
-            print(f"Data: {safe_data}")
-            print(f"Headers: {headers}\n")
-            
             response = requests.post(
                 self.token_url,
                 headers=headers,
                 json=data  # Send as JSON instead of form data
             )
             
-            print(f"Response Status: {response.status_code}")
-            print(f"Response Headers: {dict(response.headers)}")
+            logger.debug("Token exchange response status %s", response.status_code)
             
             try:
                 response_json = response.json()
-                safe_response = {k: "[REDACTED]" if k in ["access_token", "refresh_token"] else v 
-                               for k, v in response_json.items()}
-                print(f"Response Body: {safe_response}\n")
+                if logger.isEnabledFor(logging.DEBUG):
+                    safe_response = {k: "[REDACTED]" if k in ["access_token", "refresh_token"] else v 
+                                   for k, v in response_json.items()}
+                    logger.debug("Token exchange response body: %s", safe_response)
             except ValueError:
-                print(f"Raw Response Text: {response.text}\n")
+                logger.warning("Token exchange returned invalid JSON (HTTP %s)", response.status_code)
                 raise ValueError("Invalid JSON in response")
             
             response.raise_for_status()
             return response_json
             
         except requests.exceptions.RequestException as e:
-            print(f"Token Exchange Error: {str(e)}")
-            if hasattr(e, "response"):
-                print(f"Error Response Status: {e.response.status_code}")
-                print(f"Error Response Headers: {dict(e.response.headers)}")
-                print(f"Error Response Body: {e.response.text}\n")
+            logger.error("Token exchange error: %s", e)
+            if getattr(e, "response", None) is not None:
+                logger.debug("Token exchange error response: status=%s headers=%s",
+                             e.response.status_code, redact_headers(e.response.headers))
             raise ValueError(f"Failed to get access token: {str(e)}")
@@ -0,0 +1,360 @@
+"""Load test: throughput and tail latency of /process, /spaces and /tasks/{list_id}.
+
+Starts the ClickUp and OpenAI stand-ins from stubs.py and the service itself
+(uvicorn, pointed at the stand-ins through CLICKUP_API_BASE_URL and
+OPENAI_BASE_URL) on local ports. It then drives the service with N
+concurrent users, each with their own session and token, and reports
+p50/p95/p99 latency, requests/sec and error rates per endpoint. Nothing
+leaves the machine.
+
+    python benchmarks/bench_load.py --users 50 --duration 30
+    python benchmarks/bench_load.py --users 50 --json before.json
+    python benchmarks/bench_load.py --users 50 --baseline before.json
+
+Save a run with --json and pass it as --baseline to a later run to compare.
+--target runs against an already running service instead. Pass the
+service's TOKEN_DB_PATH and SESSION_SECRET with --token-db and
+--session-secret to give each user their own session there too; without
+them, requests carry no session cookie, all users share the default
+session, and the service needs SESSION_DEFAULT_FALLBACK=true.
+"""
+import os
+import sys
+import json
+import time
+import random
+import signal
+import socket
+import asyncio
+import argparse
+import tempfile
+import statistics
+import subprocess
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+import httpx
+
+from stubs import list_ids
+
+SESSION_SECRET = "benchmark-session-secret"
+
+# Messages sent to /process, cycled per user. Task creation always goes to
+# the model; the others are commands the intent router may answer locally.
+PROCESS_MESSAGES = [
+    "create task Write release notes for the next version",
+    "list spaces",
+    "list tasks",
+    "create task Fix the flaky login test",
+    "what can you help me with",
+]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip() not in ("process", "stream", "spaces", "tasks"):
+            raise argparse.ArgumentTypeError(f"unknown endpoint in mix: {name}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, int(round(fraction * len(values) + 0.5)) - 1))
+    return values[index]
+
+
+class Recorder:
+    def __init__(self):
+        self.samples: Dict[str, List[Tuple[float, bool]]] = defaultdict(list)
+        self.errors: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.recording = False
+
+    def add(self, endpoint: str, latency: float, error: Optional[str]) -> None:
+        if not self.recording:
+            return
+        self.samples[endpoint].append((latency, error is None))
+        if error is not None:
+            self.errors[endpoint][error] += 1
+
+    def summary(self, duration: float) -> Dict[str, Any]:
+        endpoints = {}
+        everything = []
+        for endpoint in sorted(self.samples):
+            samples = self.samples[endpoint]
+            everything.extend(samples)
+            endpoints[endpoint] = self._summarize(samples, duration)
+            endpoints[endpoint]["error_kinds"] = dict(self.errors[endpoint])
+        return {"duration": duration, "endpoints": endpoints, "total": self._summarize(everything, duration)}
+
+    @staticmethod
+    def _summarize(samples: List[Tuple[float, bool]], duration: float) -> Dict[str, Any]:
+        latencies = sorted(latency for latency, _ in samples)
+        errors = sum(1 for _, ok in samples if not ok)
+        return {
+            "requests": len(samples),
+            "rps": round(len(samples) / duration, 2) if duration else 0.0,
+            "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+            "max_ms": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+            "mean_ms": round(statistics.fmean(latencies) * 1000, 1) if latencies else 0.0,
+        }
+
+
+async def call(client: httpx.AsyncClient, endpoint: str, headers: Dict[str, str], user: int, turn: int,
+               lists: List[str]) -> Optional[str]:
+    """Send one request. Returns None on success or a short error kind."""
+    if endpoint in ("process", "stream"):
+        message = PROCESS_MESSAGES[(user + turn) % len(PROCESS_MESSAGES)]
+        path = "/process" if endpoint == "process" else "/process/stream"
+        response = await client.post(path, json={"message": message}, headers=headers)
+        if response.status_code != 200:
+            return f"http_{response.status_code}"
+        if endpoint == "stream":
+            # The last event is the result (or an error reported in-band)
+            return "error_event" if "event: error" in response.text else None
+        return "error_body" if "error" in response.json() else None
+    if endpoint == "spaces":
+        response = await client.get("/spaces", headers=headers)
+    else:
+        response = await client.get(f"/tasks/{lists[(user + turn) % len(lists)]}", headers=headers)
+    return None if response.status_code == 200 else f"http_{response.status_code}"
+
+
+async def user_loop(user: int, client: httpx.AsyncClient, headers: Dict[str, str], mix: Dict[str, float],
+                    lists: List[str], recorder: Recorder, stop_at: float, think_time: float) -> None:
+    endpoints, weights = zip(*mix.items())
+    rng = random.Random(user)
+    turn = 0
+    while time.monotonic() < stop_at:
+        endpoint = rng.choices(endpoints, weights)[0]
+        start = time.perf_counter()
+        try:
+            error = await call(client, endpoint, headers, user, turn, lists)
+        except httpx.TimeoutException:
+            error = "timeout"
+        except httpx.HTTPError as e:
+            error = type(e).__name__
+        recorder.add(endpoint, time.perf_counter() - start, error)
+        turn += 1
+        if think_time:
+            await asyncio.sleep(rng.uniform(0, 2 * think_time))
+
+
+async def drive(base_url: str, user_headers: List[Dict[str, str]], mix: Dict[str, float], lists: List[str],
+                warmup: float, duration: float, think_time: float, timeout: float) -> Dict[str, Any]:
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=len(user_headers), max_keepalive_connections=len(user_headers))
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        stop_at = time.monotonic() + warmup + duration
+        users = [
+            asyncio.create_task(user_loop(user, client, headers, mix, lists, recorder, stop_at, think_time))
+            for user, headers in enumerate(user_headers)
+        ]
+        await asyncio.sleep(warmup)
+        recorder.recording = True
+        started = time.monotonic()
+        await asyncio.gather(*users)
+        # Requests still in flight at the deadline are included
+        elapsed = time.monotonic() - started
+    return recorder.summary(elapsed)
+
+
+def seed_sessions(token_db: str, secret: str, users: int) -> List[Dict[str, str]]:
+    """Store a token per user in the service's token database and build their session cookie headers."""
+    from token_storage import SQLiteTokenStorage
+    from sessions import SESSION_COOKIE, sign_session_id
+
+    storage = SQLiteTokenStorage(token_db, import_path=None)
+    storage.store_tokens("bench-token-default")
+    headers = []
+    for user in range(users):
+        session_id = f"bench-user-{user}"
+        storage.store_tokens(f"bench-token-{user}", session_id=session_id)
+        headers.append({"Cookie": f"{SESSION_COOKIE}={sign_session_id(session_id, secret)}"})
+    storage.close()
+    return headers
+
+
+def start(args: List[str], env: Dict[str, str], cwd: str) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, *args], env=env, cwd=cwd, start_new_session=True)
+
+
+def wait_until_up(url: str, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with status {process.returncode}")
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def stop(processes: List[subprocess.Popen]) -> None:
+    for process in processes:
+        if process.poll() is None:
+            os.killpg(process.pid, signal.SIGTERM)
+    for process in processes:
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+
+
+def print_report(result: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    columns = ("requests", "rps", "error_rate", "p50_ms", "p95_ms", "p99_ms", "max_ms")
+    print(f"\n{'endpoint':<10}" + "".join(f"{column:>12}" for column in columns))
+    rows = list(result["endpoints"].items()) + [("total", result["total"])]
+    for name, stats in rows:
+        print(f"{name:<10}" + "".join(f"{stats[column]:>12}" for column in columns))
+        if baseline is not None:
+            before = baseline["endpoints"].get(name) if name != "total" else baseline["total"]
+            if before:
+                deltas = []
+                for column in columns[1:]:
+                    if before[column]:
+                        deltas.append(f"{(stats[column] - before[column]) / before[column]:>+11.1%} ")
+                    else:
+                        deltas.append(f"{'-':>12}")
+                print(f"{'  vs base':<10}{'':>12}" + "".join(deltas))
+    for name, stats in result["endpoints"].items():
+        if stats["error_kinds"]:
+            print(f"{name} errors: {stats['error_kinds']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20, help="concurrent users, each with their own session")
+    parser.add_argument("--duration", type=float, default=20.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="unmeasured seconds before the measurement")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("process=2,spaces=1,tasks=1"),
+                        help="endpoint weights from process, stream, spaces, tasks")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean pause between a user's requests")
+    parser.add_argument("--timeout", type=float, default=60.0, help="client timeout per request")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers (>1 uses STATE_BACKEND=sqlite)")
+    parser.add_argument("--clickup-latency", type=float, default=0.05)
+    parser.add_argument("--clickup-jitter", type=float, default=0.02)
+    parser.add_argument("--clickup-rate-limit", type=int, default=0,
+                        help="requests per minute per token, enforced with 429s (0: none)")
+    parser.add_argument("--clickup-error-rate", type=float, default=0.0, help="fraction of random 429s")
+    parser.add_argument("--spaces", type=int, default=3)
+    parser.add_argument("--lists-per-space", type=int, default=4)
+    parser.add_argument("--tasks-per-list", type=int, default=250)
+    parser.add_argument("--openai-latency", type=float, default=0.8)
+    parser.add_argument("--openai-jitter", type=float, default=0.2)
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="extra environment for the service, e.g. --env RESPONSE_CACHE=true")
+    parser.add_argument("--target", help="URL of a running service; skips starting the service and stand-ins")
+    parser.add_argument("--token-db", help="with --target: the service's TOKEN_DB_PATH, to seed a session per user")
+    parser.add_argument("--session-secret", help="with --target: the service's SESSION_SECRET")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="results file from an earlier run to compare against")
+    args = parser.parse_args()
+    if args.target and bool(args.token_db) != bool(args.session_secret):
+        parser.error("--token-db and --session-secret go together")
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    lists = list_ids(args.spaces, args.lists_per_space)
+
+    processes: List[subprocess.Popen] = []
+    workdir = tempfile.TemporaryDirectory(prefix="clickup-bench-")
+    try:
+        if args.target:
+            base_url = args.target.rstrip("/")
+            if args.token_db:
+                user_headers = seed_sessions(args.token_db, args.session_secret, args.users)
+            else:
+                # Every user shares the default session and its per-session limits
+                user_headers = [{} for _ in range(args.users)]
+        else:
+            stubs_path = os.path.join(APP_DIR, "benchmarks", "stubs.py")
+            clickup_port, openai_port, app_port = free_port(), free_port(), free_port()
+            processes.append(start([
+                stubs_path, "clickup", "--port", str(clickup_port),
+                "--latency", str(args.clickup_latency), "--jitter", str(args.clickup_jitter),
+                "--spaces", str(args.spaces), "--lists-per-space", str(args.lists_per_space),
+                "--tasks-per-list", str(args.tasks_per_list), "--rate-limit", str(args.clickup_rate_limit),
+                "--error-rate", str(args.clickup_error_rate),
+            ], dict(os.environ), APP_DIR))
+            processes.append(start([
+                stubs_path, "openai", "--port", str(openai_port),
+                "--latency", str(args.openai_latency), "--jitter", str(args.openai_jitter),
+            ], dict(os.environ), APP_DIR))
+
+            data = workdir.name
+            env = {
+                **os.environ,
+                "CLICKUP_API_BASE_URL": f"http://127.0.0.1:{clickup_port}/api/v2",
+                "OPENAI_BASE_URL": f"http://127.0.0.1:{openai_port}/v1",
+                "OPENAI_API_KEY": "benchmark",
+                "CLICKUP_CLIENT_ID": "benchmark",
+                "CLICKUP_SECRET": "benchmark",
+                "SESSION_SECRET": SESSION_SECRET,
+                "SESSION_DEFAULT_FALLBACK": "true",
+                "STATE_BACKEND": "sqlite" if args.workers > 1 else "memory",
+                "STATE_DB_PATH": os.path.join(data, "state.db"),
+                "TOKEN_STORAGE": "sqlite",
+                "TOKEN_DB_PATH": os.path.join(data, "tokens.db"),
+                "MIRROR_DB_PATH": os.path.join(data, "mirror.db"),
+                "SEARCH_DB_PATH": os.path.join(data, "search.db"),
+                "JOBS_DB_PATH": os.path.join(data, "jobs.db"),
+                "RESPONSE_CACHE": "false",
+                "RESPONSE_CACHE_DB_PATH": os.path.join(data, "responses.db"),
+                # The stand-in enforces --clickup-rate-limit itself
+                "CLICKUP_RATE_LIMIT_PER_MINUTE": str(args.clickup_rate_limit or 10 ** 6),
+                "LOG_LEVEL": "WARNING",
+            }
+            for item in args.env:
+                key, _, value = item.partition("=")
+                env[key] = value
+            user_headers = seed_sessions(env["TOKEN_DB_PATH"], env["SESSION_SECRET"], args.users)
+            processes.append(start([
+                "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(app_port),
+                "--workers", str(args.workers), "--log-level", "warning", "--no-access-log",
+            ], env, APP_DIR))
+
+            wait_until_up(f"http://127.0.0.1:{clickup_port}/healthz", processes[0])
+            wait_until_up(f"http://127.0.0.1:{openai_port}/healthz", processes[1])
+            wait_until_up(f"http://127.0.0.1:{app_port}/readyz", processes[2])
+            base_url = f"http://127.0.0.1:{app_port}"
+
+        print(f"Driving {base_url} with {args.users} users for {args.duration:g}s "
+              f"(+{args.warmup:g}s warm-up), mix {args.mix}")
+        result = asyncio.run(drive(base_url, user_headers, args.mix, lists, args.warmup, args.duration,
+                                   args.think_time, args.timeout))
+    finally:
+        stop(processes)
+        workdir.cleanup()
+
+    result["config"] = {key: value for key, value in vars(args).items() if key not in ("json", "baseline")}
+    print_report(result, baseline)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Microbenchmark: per-request logging overhead on the ClickUp hot path.
+
+Runs AsyncClickUpClient._make_request against an in-process mock transport
+that returns a large task list, once with debug logging off (the default)
+and once with it on, and reports the median over several interleaved rounds of the mean time
+per request.
+
+    python benchmarks/bench_logging.py --requests 200 --tasks 500 --rounds 5
+"""
+import os
+import sys
+import io
+import gc
+import time
+import asyncio
+import statistics
+import logging
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from clickup import AsyncClickUpClient
+from rate_limit import RateLimiter
+from log_config import TextFormatter
+
+
+def build_client(task_count: int) -> AsyncClickUpClient:
+    payload = {
+        "tasks": [
+            {
+                "id": f"task{i}",
+                "name": f"Task {i}",
+                "description": "Lorem ipsum dolor sit amet " * 8,
+                "status": {"status": "open", "color": "#d3d3d3"},
+                "assignees": [{"id": 1, "username": "someone"}],
+                "custom_fields": [{"id": "cf1", "name": "Estimate", "value": i}],
+            }
+            for i in range(task_count)
+        ],
+        "last_page": True,
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=payload, headers={"X-RateLimit-Remaining": "100"})
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client = AsyncClickUpClient("benchmark-token", team_id="team", http_client=http_client)
+    # Don't let the per-token quota pace the benchmark
+    client.rate_limiter = RateLimiter(rate_per_minute=10 ** 9)
+    return client
+
+
+async def run(client: AsyncClickUpClient, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        await client._make_request("GET", "list/bench/task")
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="requests per round")
+    parser.add_argument("--tasks", type=int, default=500, help="tasks per response")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    # Send log output to memory so terminal speed doesn't skew the result
+    sink = io.StringIO()
+    handler = logging.StreamHandler(sink)
+    handler.setFormatter(TextFormatter())
+    clickup_logger = logging.getLogger("clickup")
+    clickup_logger.handlers = [handler]
+    clickup_logger.propagate = False
+
+    modes = (("disabled", logging.CRITICAL), ("info", logging.INFO), ("debug", logging.DEBUG))
+    samples = {mode: [] for mode, _ in modes}
+    log_bytes = {}
+
+    async def bench() -> None:
+        client = build_client(args.tasks)
+        await run(client, 10)  # warm-up
+        for _ in range(args.rounds):
+            for mode, level in modes:
+                clickup_logger.setLevel(level)
+                sink.seek(0)
+                sink.truncate()
+                gc.collect()  # don't bill one mode for the previous mode's garbage
+                samples[mode].append(await run(client, args.requests))
+                log_bytes[mode] = sink.tell() / args.requests
+
+    asyncio.run(bench())
+    results = {mode: statistics.median(values) for mode, values in samples.items()}
+    for mode, _ in modes:
+        print(f"{mode:>8}: {results[mode]:9.1f} us/request  ({log_bytes[mode]:,.0f} log bytes/request)")
+
+    print(f"\nLogging overhead with debug off: {results['info'] - results['disabled']:+.1f} us/request")
+    print(f"Logging overhead with debug on:  {results['debug'] - results['disabled']:+.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
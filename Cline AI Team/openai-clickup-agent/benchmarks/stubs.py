@@ -0,0 +1,272 @@
+"""Local stand-ins for the ClickUp v2 and OpenAI chat completions APIs.
+
+They answer the calls the service makes with generated data after a
+configurable delay, so load tests run offline and repeatably. bench_load.py
+starts them itself; they can also be run on their own:
+
+    python benchmarks/stubs.py clickup --port 9001 --latency 0.08 --rate-limit 100
+    python benchmarks/stubs.py openai --port 9002 --latency 0.8
+"""
+import re
+import json
+import time
+import random
+import asyncio
+import argparse
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# ClickUp returns at most this many tasks per page of list/{id}/task
+TASK_PAGE_SIZE = 100
+
+TASK_DRAFT = """Write release notes
+Objective:
+- Summarize the changes in this release for users
+
+Details:
+- List new features and fixes
+- Link the relevant tasks
+
+Acceptance Criteria:
+- Notes are reviewed and published"""
+
+
+async def delay(latency: float, jitter: float) -> None:
+    wait = latency + random.uniform(0, jitter) if jitter else latency
+    if wait > 0:
+        await asyncio.sleep(wait)
+
+
+def space_ids(spaces: int) -> List[str]:
+    return [f"space-{s}" for s in range(spaces)]
+
+
+def list_ids(spaces: int, lists_per_space: int) -> List[str]:
+    return [f"list-{s}-{l}" for s in range(spaces) for l in range(lists_per_space)]
+
+
+def build_clickup_app(latency: float = 0.05, jitter: float = 0.02, spaces: int = 3,
+                      lists_per_space: int = 4, tasks_per_list: int = 250,
+                      rate_limit: int = 0, error_rate: float = 0.0) -> FastAPI:
+    """ClickUp v2 stand-in.
+
+    ``rate_limit`` is requests per minute per token (0 for unlimited) and is
+    enforced with 429s carrying ClickUp's X-RateLimit-* headers, as is a
+    random ``error_rate`` fraction of requests.
+    """
+    app = FastAPI()
+    windows: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0])
+    tasks_cache: Dict[str, List[Dict[str, Any]]] = {}
+    created = [0]
+    stats = defaultdict(int)
+
+    def tasks_for(list_id: str) -> List[Dict[str, Any]]:
+        tasks = tasks_cache.get(list_id)
+        if tasks is None:
+            match = re.fullmatch(r"list-(\d+)-(\d+)", list_id)
+            if not match:
+                return []
+            space_id = f"space-{match.group(1)}"
+            now_ms = int(time.time() * 1000)
+            tasks = tasks_cache[list_id] = [
+                {
+                    "id": f"{list_id}-task-{i}",
+                    "name": f"Task {i} in {list_id}",
+                    "description": "Generated task for load testing. " * 4,
+                    "status": {"status": "open", "color": "#d3d3d3", "type": "open"},
+                    "date_updated": str(now_ms - i * 1000),
+                    "assignees": [{"id": 1, "username": "bench"}],
+                    "custom_fields": [{"id": "cf1", "name": "Estimate", "value": i % 8}],
+                    "list": {"id": list_id},
+                    "space": {"id": space_id},
+                }
+                for i in range(tasks_per_list)
+            ]
+        return tasks
+
+    @app.middleware("http")
+    async def limit(request: Request, call_next):
+        if request.url.path == "/healthz":
+            return await call_next(request)
+        token = request.headers.get("authorization", "")
+        stats["requests"] += 1
+        now = time.time()
+        window = windows[token]
+        if now - window[0] >= 60:
+            window[0], window[1] = now, 0
+        window[1] += 1
+        headers = {}
+        if rate_limit:
+            headers = {
+                "X-RateLimit-Limit": str(rate_limit),
+                "X-RateLimit-Remaining": str(max(0, rate_limit - window[1])),
+                "X-RateLimit-Reset": str(int(window[0] + 60)),
+            }
+        await delay(latency, jitter)
+        if (rate_limit and window[1] > rate_limit) or (error_rate and random.random() < error_rate):
+            stats["rate_limited"] += 1
+            return JSONResponse(status_code=429, content={"err": "Rate limit reached", "ECODE": "APP_002"},
+                                headers=headers)
+        response = await call_next(request)
+        response.headers.update(headers)
+        return response
+
+    @app.get("/healthz")
+    async def healthz():
+        return {"status": "ok", **stats}
+
+    @app.get("/api/v2/team")
+    async def teams():
+        return {"teams": [{"id": "team-1", "name": "Benchmark Team"}]}
+
+    @app.get("/api/v2/team/{team_id}/space")
+    async def spaces_route(team_id: str):
+        return {"spaces": [{"id": space_id, "name": f"Space {i}"} for i, space_id in enumerate(space_ids(spaces))]}
+
+    @app.get("/api/v2/space/{space_id}/list")
+    async def lists_route(space_id: str):
+        index = space_id.rsplit("-", 1)[-1]
+        return {"lists": [
+            {"id": f"list-{index}-{l}", "name": f"List {l}", "task_count": tasks_per_list}
+            for l in range(lists_per_space)
+        ]}
+
+    @app.get("/api/v2/list/{list_id}/task")
+    async def list_tasks(list_id: str, page: int = 0, date_updated_gt: Optional[int] = None):
+        tasks = tasks_for(list_id)
+        if date_updated_gt:
+            tasks = [task for task in tasks if int(task["date_updated"]) > date_updated_gt]
+        chunk = tasks[page * TASK_PAGE_SIZE:(page + 1) * TASK_PAGE_SIZE]
+        return {"tasks": chunk, "last_page": (page + 1) * TASK_PAGE_SIZE >= len(tasks)}
+
+    @app.post("/api/v2/list/{list_id}/task")
+    async def create_task(list_id: str, request: Request):
+        body = await request.json()
+        created[0] += 1
+        return {
+            "id": f"created-{created[0]}",
+            "name": body.get("name"),
+            "description": body.get("description", ""),
+            "status": {"status": "open", "type": "open"},
+            "date_updated": str(int(time.time() * 1000)),
+            "list": {"id": list_id},
+            "url": f"https://app.clickup.com/t/created-{created[0]}",
+        }
+
+    @app.get("/api/v2/task/{task_id}")
+    async def get_task(task_id: str):
+        return {"id": task_id, "name": task_id, "status": {"status": "open"}}
+
+    return app
+
+
+def completion_text(messages: List[Dict[str, Any]]) -> str:
+    """Answer like the assistant prompt asks: command keywords or a task draft."""
+    message = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+    lowered = message.lower()
+    match = re.search(r"\b(?:use|select)\s+(?:the\s+)?(.+?)\s+space\b", lowered)
+    if match:
+        return f"SELECT_SPACE: {match.group(1).title()}"
+    if "space" in lowered and "task" not in lowered:
+        return "LIST_SPACES"
+    if re.search(r"\b(find|search)\b", lowered):
+        return "SEARCH_TASKS: " + re.sub(r"^.*?\b(?:about|for)\s+", "", message).strip()
+    if "list tasks" in lowered or "my tasks" in lowered:
+        return "LIST_TASKS"
+    return TASK_DRAFT
+
+
+def build_openai_app(latency: float = 0.8, jitter: float = 0.2, chunk_latency: float = 0.02,
+                     chunk_chars: int = 12) -> FastAPI:
+    """OpenAI chat completions stand-in.
+
+    Replies arrive after ``latency`` (plus up to ``jitter``) seconds; streamed
+    replies then send ``chunk_chars`` characters every ``chunk_latency`` seconds.
+    """
+    app = FastAPI()
+    stats = defaultdict(int)
+
+    @app.get("/healthz")
+    async def healthz():
+        return {"status": "ok", **stats}
+
+    @app.post("/v1/chat/completions")
+    async def completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "stub")
+        text = completion_text(body.get("messages", []))
+        created = int(time.time())
+        stats["requests"] += 1
+        await delay(latency, jitter)
+
+        if not body.get("stream"):
+            return {
+                "id": f"chatcmpl-stub-{stats['requests']}",
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            }
+
+        async def events():
+            for start in range(0, len(text), chunk_chars):
+                chunk = {
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": text[start:start + chunk_chars]},
+                                 "finish_reason": None}],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+                if chunk_latency:
+                    await asyncio.sleep(chunk_latency)
+            done = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+            yield f"data: {json.dumps(done)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("service", choices=("clickup", "openai"))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--latency", type=float, help="seconds per response (clickup 0.05, openai 0.8)")
+    parser.add_argument("--jitter", type=float, help="extra random seconds per response (clickup 0.02, openai 0.2)")
+    parser.add_argument("--spaces", type=int, default=3)
+    parser.add_argument("--lists-per-space", type=int, default=4)
+    parser.add_argument("--tasks-per-list", type=int, default=250)
+    parser.add_argument("--rate-limit", type=int, default=0, help="ClickUp requests per minute per token (0: none)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of ClickUp requests answered 429")
+    parser.add_argument("--chunk-latency", type=float, default=0.02, help="seconds between streamed chunks")
+    args = parser.parse_args()
+
+    if args.service == "clickup":
+        app = build_clickup_app(
+            latency=0.05 if args.latency is None else args.latency,
+            jitter=0.02 if args.jitter is None else args.jitter,
+            spaces=args.spaces, lists_per_space=args.lists_per_space, tasks_per_list=args.tasks_per_list,
+            rate_limit=args.rate_limit, error_rate=args.error_rate,
+        )
+    else:
+        app = build_openai_app(
+            latency=0.8 if args.latency is None else args.latency,
+            jitter=0.2 if args.jitter is None else args.jitter,
+            chunk_latency=args.chunk_latency,
+        )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,336 @@
 import os
 import json
+import time
+import uuid
+import logging
+import asyncio
+import httpx
 import requests
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterator, AsyncIterator, Callable, TypeVar
 from dotenv import load_dotenv
+from rate_limit import RateLimiter, get_rate_limiter
+from singleflight import SingleFlight
+from state_backend import StateBackend
+from log_config import LazyJson, body_max_chars, get_logger, should_log_body
 
 load_dotenv()
 
+logger = get_logger("clickup")
+
+T = TypeVar("T")
+
+# Overridable so the service can be pointed at a stand-in (see benchmarks/)
+CLICKUP_API_BASE_URL = os.getenv("CLICKUP_API_BASE_URL", "https://api.clickup.com/api/v2").rstrip("/")
+
+# ClickUp returns at most this many tasks per page of list/{id}/task
+TASK_PAGE_SIZE = 100
+
+# Shared HTTP connection pools. Every ClickUpClient instance reuses the same
+# keep-alive connections instead of paying a TCP+TLS handshake per call.
+_shared_session: Optional[requests.Session] = None
+_shared_http_client: Optional[httpx.AsyncClient] = None
+
+# Identical GETs in flight at the same time (same URL, params and token)
+# through AsyncClickUpClient share one upstream call.
+# CLICKUP_COALESCE_GETS=false sends each separately.
+_flights = SingleFlight()
+
+# Callbacks that receive every batch of tasks fetched or written through
+# AsyncClickUpClient, used to keep local indexes populated.
+_task_listeners: List[Callable[[List[Dict[str, Any]]], None]] = []
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def get_shared_session() -> requests.Session:
+    """Get the process-wide requests session used by the synchronous client."""
+    global _shared_session
+    if _shared_session is None:
+        _shared_session = requests.Session()
+    return _shared_session
+
+
+def create_http_client(max_connections: Optional[int] = None,
+                       max_keepalive_connections: Optional[int] = None) -> httpx.AsyncClient:
+    """Build a pooled async HTTP client from environment settings.
+
+    Pool sizes default to CLICKUP_MAX_CONNECTIONS and
+    CLICKUP_MAX_KEEPALIVE_CONNECTIONS; timeouts and HTTP/2 always come from
+    the environment.
+    """
+    http2 = _env_flag("CLICKUP_HTTP2")
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("CLICKUP_HTTP2 is enabled but 'h2' is not installed; falling back to HTTP/1.1")
+            http2 = False
+
+    limits = httpx.Limits(
+        max_connections=max_connections or _env_int("CLICKUP_MAX_CONNECTIONS", 100),
+        max_keepalive_connections=max_keepalive_connections or _env_int("CLICKUP_MAX_KEEPALIVE_CONNECTIONS", 20),
+        keepalive_expiry=_env_float("CLICKUP_KEEPALIVE_EXPIRY", 30.0),
+    )
+    timeout = httpx.Timeout(
+        connect=_env_float("CLICKUP_CONNECT_TIMEOUT", 5.0),
+        read=_env_float("CLICKUP_READ_TIMEOUT", 30.0),
+        write=_env_float("CLICKUP_WRITE_TIMEOUT", 30.0),
+        pool=_env_float("CLICKUP_POOL_TIMEOUT", 10.0),
+    )
+    return httpx.AsyncClient(http2=http2, limits=limits, timeout=timeout)
+
+
+def get_shared_http_client() -> httpx.AsyncClient:
+    """Get the process-wide pooled async HTTP client, creating it on first use."""
+    global _shared_http_client
+    if _shared_http_client is None or _shared_http_client.is_closed:
+        _shared_http_client = create_http_client()
+    return _shared_http_client
+
+
+async def close_shared_http_client() -> None:
+    """Close the shared async HTTP client and release its connections."""
+    global _shared_http_client
+    if _shared_http_client is not None:
+        await _shared_http_client.aclose()
+        _shared_http_client = None
+
+
+def _coalesce_gets() -> bool:
+    return _env_flag("CLICKUP_COALESCE_GETS", True)
+
+
+def _flight_key(method: str, url: str, params: Optional[Dict], access_token: str) -> tuple:
+    return (method, url, json.dumps(params or {}, sort_keys=True, default=str), access_token)
+
+
+def coalescing_stats() -> Dict[str, int]:
+    """Upstream calls made and callers served by another caller's in-flight GET."""
+    return {**_flights.stats, "in_flight": len(_flights)}
+
+
+def add_task_listener(listener: Callable[[List[Dict[str, Any]]], None]) -> None:
+    """Register a callback for tasks seen by AsyncClickUpClient.
+
+    Listeners run on the event loop and must return quickly.
+    """
+    _task_listeners.append(listener)
+
+
+def _notify_task_listeners(tasks: List[Dict[str, Any]]) -> None:
+    if not tasks:
+        return
+    for listener in _task_listeners:
+        try:
+            listener(tasks)
+        except Exception:
+            logger.exception("Task listener failed")
+
+
+def _http_error_message(status_code: int, error: Exception) -> str:
+    """Map a ClickUp HTTP error status to a user-facing message."""
+    if status_code == 401:
+        return "Invalid ClickUp API key or unauthorized access"
+    elif status_code == 403:
+        return "Insufficient permissions for this operation"
+    elif status_code == 404:
+        return "Requested resource not found"
+    elif status_code == 429:
+        return "ClickUp API rate limit exceeded"
+    return f"ClickUp API error (HTTP {status_code}): {str(error)}"
+
+
+def _is_last_task_page(data: Dict[str, Any], tasks: List[Dict[str, Any]]) -> bool:
+    """Check whether a list/{id}/task response is the final page."""
+    if "last_page" in data:
+        return bool(data["last_page"])
+    return len(tasks) < TASK_PAGE_SIZE
+
+
+def _log_response(method: str, url: str, status_code: int, start: float) -> None:
+    """Emit one structured debug record per ClickUp call; free when debug is off."""
+    if logger.isEnabledFor(logging.DEBUG):
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.debug(
+            "ClickUp %s %s -> %s (%.1f ms)", method, url, status_code, elapsed_ms,
+            extra={"fields": {"method": method, "url": url, "status": status_code,
+                              "elapsed_ms": round(elapsed_ms, 1)}}
+        )
+
+
+def _team_error_message(status_code: int) -> Optional[str]:
+    """Map an HTTP error status from the teams endpoint to a user-facing message."""
+    if status_code == 401:
+        return "Invalid or expired access token. Please re-authenticate."
+    elif status_code == 403:
+        return "Insufficient permissions to access ClickUp teams."
+    elif status_code == 429:
+        return "ClickUp API rate limit exceeded. Please try again later."
+    return None
+
+
+class HierarchyCache:
+    """In-memory TTL cache for the team -> spaces -> lists hierarchy.
+
+    Spaces are cached per team and lists per space, each level with its own
+    TTL. Cached responses are shared, so callers must not mutate them.
+    ``size_bytes`` tracks the approximate serialized size of what is held.
+    """
+
+    # Whether entries are visible to other clients and worker processes
+    shared = False
+
+    def __init__(self, spaces_ttl: Optional[float] = None, lists_ttl: Optional[float] = None):
+        self.spaces_ttl = spaces_ttl if spaces_ttl is not None else _env_float("CLICKUP_SPACES_CACHE_TTL", 300.0)
+        self.lists_ttl = lists_ttl if lists_ttl is not None else _env_float("CLICKUP_LISTS_CACHE_TTL", 120.0)
+        self._spaces: Dict[str, tuple] = {}
+        self._lists: Dict[str, tuple] = {}
+        self.size_bytes = 0
+
+    def _get(self, entries: Dict[str, tuple], key: str) -> Optional[Dict[str, Any]]:
+        entry = entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value, _ = entry
+        if time.monotonic() >= expires_at:
+            self._pop(entries, key)
+            return None
+        return value
+
+    def _set(self, entries: Dict[str, tuple], key: str, ttl: float, value: Dict[str, Any]) -> None:
+        self._pop(entries, key)
+        size = len(json.dumps(value, separators=(",", ":"), default=str))
+        entries[key] = (time.monotonic() + ttl, value, size)
+        self.size_bytes += size
+
+    def _pop(self, entries: Dict[str, tuple], key: str) -> None:
+        entry = entries.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= entry[2]
+
+    def get_spaces(self, team_id: str) -> Optional[Dict[str, Any]]:
+        """Get the cached spaces response for a team, if still fresh."""
+        return self._get(self._spaces, team_id)
+
+    def set_spaces(self, team_id: str, spaces: Dict[str, Any]) -> None:
+        """Cache the spaces response for a team."""
+        if self.spaces_ttl > 0:
+            self._set(self._spaces, team_id, self.spaces_ttl, spaces)
+
+    def get_lists(self, space_id: str) -> Optional[Dict[str, Any]]:
+        """Get the cached lists response for a space, if still fresh."""
+        return self._get(self._lists, space_id)
+
+    def set_lists(self, space_id: str, lists: Dict[str, Any]) -> None:
+        """Cache the lists response for a space."""
+        if self.lists_ttl > 0:
+            self._set(self._lists, space_id, self.lists_ttl, lists)
+
+    def invalidate(self, team_id: Optional[str] = None, space_id: Optional[str] = None,
+                   list_id: Optional[str] = None) -> None:
+        """Drop cached entries.
+
+        With no arguments everything is dropped. Otherwise only the given team's
+        spaces, the given space's lists, and any lists response containing the
+        given list are removed.
+        """
+        if team_id is None and space_id is None and list_id is None:
+            self._spaces.clear()
+            self._lists.clear()
+            self.size_bytes = 0
+            return
+        if team_id is not None:
+            self._pop(self._spaces, team_id)
+        if space_id is not None:
+            self._pop(self._lists, space_id)
+        if list_id is not None:
+            for cached_space_id, (_, lists, _) in list(self._lists.items()):
+                if any(item.get("id") == list_id for item in lists.get("lists", [])):
+                    self._pop(self._lists, cached_space_id)
+
+
+class SharedHierarchyCache(HierarchyCache):
+    """HierarchyCache kept in a StateBackend so every worker sees the same entries.
+
+    Entries are keyed by ``owner`` (a token fingerprint) because users can
+    see different spaces, but invalidation by space or list applies to every
+    owner, so a change seen by one worker or user is seen by all. Lists
+    entries carry the space's version at the time they were stored;
+    invalidating a space (or, through a list-to-space index, one of its
+    lists) writes a new version, which retires every owner's entry without
+    scanning them.
+    """
+
+    NAMESPACE = "hierarchy"
+    shared = True
+
+    def __init__(self, backend: StateBackend, owner: str, spaces_ttl: Optional[float] = None,
+                 lists_ttl: Optional[float] = None):
+        super().__init__(spaces_ttl, lists_ttl)
+        self.backend = backend
+        self.owner = owner
+
+    def get_spaces(self, team_id: str) -> Optional[Dict[str, Any]]:
+        return self.backend.get(self.NAMESPACE, f"{self.owner}:spaces:{team_id}")
+
+    def set_spaces(self, team_id: str, spaces: Dict[str, Any]) -> None:
+        if self.spaces_ttl > 0:
+            self.backend.set(self.NAMESPACE, f"{self.owner}:spaces:{team_id}", spaces, ttl=self.spaces_ttl)
+
+    def get_lists(self, space_id: str) -> Optional[Dict[str, Any]]:
+        entry = self.backend.get(self.NAMESPACE, f"{self.owner}:lists:{space_id}")
+        if not isinstance(entry, dict) or "lists_response" not in entry:
+            return None
+        if entry["version"] != self.backend.get(self.NAMESPACE, f"version:{space_id}"):
+            return None
+        return entry["lists_response"]
+
+    def set_lists(self, space_id: str, lists: Dict[str, Any]) -> None:
+        if self.lists_ttl <= 0:
+            return
+        version = self.backend.get(self.NAMESPACE, f"version:{space_id}")
+        # The entry and its list-to-space index rows go in one write
+        values: Dict[str, Any] = {f"list_space:{item['id']}": space_id for item in lists.get("lists", []) if item.get("id")}
+        values[f"{self.owner}:lists:{space_id}"] = {"version": version, "lists_response": lists}
+        self.backend.set_many(self.NAMESPACE, values, ttl=self.lists_ttl)
+
+    def _bump_version(self, space_id: str) -> None:
+        # A fresh random version can't collide with one an entry was stored under
+        self.backend.set(self.NAMESPACE, f"version:{space_id}", uuid.uuid4().hex, ttl=self.lists_ttl)
+
+    def invalidate(self, team_id: Optional[str] = None, space_id: Optional[str] = None,
+                   list_id: Optional[str] = None) -> None:
+        if team_id is None and space_id is None and list_id is None:
+            self.backend.clear(self.NAMESPACE)
+            return
+        if team_id is not None:
+            self.backend.delete(self.NAMESPACE, f"{self.owner}:spaces:{team_id}")
+        if space_id is not None:
+            self._bump_version(space_id)
+        if list_id is not None:
+            list_space_id = self.backend.get(self.NAMESPACE, f"list_space:{list_id}")
+            if list_space_id is not None and list_space_id != space_id:
+                self._bump_version(list_space_id)
+
+
 class ClickUpClient:
     def __init__(self, access_token: str):
-        self.base_url = "https://api.clickup.com/api/v2"
+        self.base_url = CLICKUP_API_BASE_URL
         self.access_token = access_token
         
         if not self.access_token:
@@ -16,6 +338,12 @@ class ClickUpClient:
         
         self.headers = {"Authorization": f"Bearer {self.access_token}"}
         self.team_id = None  # Will be set when needed
+        self.cache = HierarchyCache()
+        self.rate_limiter: RateLimiter = get_rate_limiter(self.access_token)
+        self.timeout = (
+            _env_float("CLICKUP_CONNECT_TIMEOUT", 5.0),
+            _env_float("CLICKUP_READ_TIMEOUT", 30.0),
+        )
 
     def get_team_id(self) -> str:
         """Get the first team ID from the user's teams."""
@@ -23,22 +351,16 @@ class ClickUpClient:
             return self.team_id
 
         try:
-            print("\nGetting ClickUp teams...")
-            # Redact token when logging headers
-            logged_headers = {**self.headers, "Authorization": "Bearer [REDACTED]"}
-            print(f"Using headers: {logged_headers}")
-            
             url = f"{self.base_url}/team"
-            print(f"Making request to: {url}")
-            
-            response = requests.get(url, headers=self.headers)
+            logger.debug("Getting ClickUp teams from %s", url)
             
-            print(f"Response Status: {response.status_code}")
-            print(f"Response Headers: {dict(response.headers)}")
+            response = self._send("GET", url)
+            logger.debug("ClickUp teams response status %s", response.status_code)
             
             response.raise_for_status()
             teams_data = response.json()
-            print(f"Teams Response: {json.dumps(teams_data, indent=2)}")
+            if should_log_body(logger):
+                logger.debug("ClickUp teams response: %s", LazyJson(teams_data))
             
             if not isinstance(teams_data, dict):
                 raise ValueError("Invalid response format from ClickUp API")
@@ -48,75 +370,73 @@ class ClickUpClient:
                 raise ValueError("No teams found in ClickUp account. Please ensure you have access to at least one team.")
             
             self.team_id = teams[0]["id"]
-            print(f"Using team ID: {self.team_id}")
+            logger.info("Using ClickUp team ID %s", self.team_id)
             return self.team_id
             
         except Exception as e:
             if isinstance(e, requests.exceptions.HTTPError):
-                if e.response.status_code == 401:
-                    raise ValueError("Invalid or expired access token. Please re-authenticate.")
-                elif e.response.status_code == 403:
-                    raise ValueError("Insufficient permissions to access ClickUp teams.")
-                elif e.response.status_code == 429:
-                    raise ValueError("ClickUp API rate limit exceeded. Please try again later.")
-            print(f"Error getting team ID: {str(e)}")
-            if hasattr(e, 'response'):
-                print(f"Error Response: {e.response.text}")
+                message = _team_error_message(e.response.status_code)
+                if message:
+                    raise ValueError(message)
+                logger.warning("ClickUp teams error response: %s", e.response.text[:body_max_chars()])
+            logger.error("Error getting team ID: %s", e)
             raise ValueError(f"Failed to get ClickUp team ID: {str(e)}")
 
-    def _make_request(self, method: str, endpoint: str, params: Dict = None, data: Dict = None) -> Dict[str, Any]:
-        """Make a request to the ClickUp API."""
-        url = f"{self.base_url}/{endpoint}"
-        try:
-            print(f"\nMaking ClickUp API request:")
-            print(f"Method: {method}")
-            print(f"URL: {url}")
-            print(f"Headers: {dict(self.headers)}")
-            if params:
-                print(f"Query Params: {params}")
-            if data:
-                print(f"Request Body: {json.dumps(data, indent=2)}")
-                
-            response = requests.request(
+    def _send(self, method: str, url: str, params: Dict = None, data: Dict = None) -> requests.Response:
+        """Send a request paced by the token's rate limiter, retrying 429/5xx responses."""
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire_sync()
+            response = get_shared_session().request(
                 method=method,
                 url=url,
                 headers=self.headers,
                 params=params,
-                json=data
+                json=data,
+                timeout=self.timeout
             )
-            
-            print(f"\nResponse Status: {response.status_code}")
-            print(f"Response Headers: {dict(response.headers)}")
+            self.rate_limiter.update_from_headers(response.headers)
+            if not self.rate_limiter.should_retry(method, response.status_code, attempt):
+                return response
+            delay = self.rate_limiter.retry_delay(attempt, response.status_code, response.headers)
+            logger.warning("ClickUp returned HTTP %s for %s %s; retrying in %.2fs",
+                           response.status_code, method, url, delay)
+            time.sleep(delay)
+            attempt += 1
+
+    def rate_limit_stats(self) -> Dict[str, float]:
+        """Throttling and retry counters for this client's token."""
+        return self.rate_limiter.snapshot()
+
+    def _make_request(self, method: str, endpoint: str, params: Dict = None, data: Dict = None) -> Dict[str, Any]:
+        """Make a request to the ClickUp API."""
+        url = f"{self.base_url}/{endpoint}"
+        start = time.perf_counter()
+        try:
+            logger.debug("ClickUp request %s %s params=%s", method, url, params)
+            if data and should_log_body(logger):
+                logger.debug("ClickUp request body: %s", LazyJson(data))
+                
+            response = self._send(method, url, params=params, data=data)
+            _log_response(method, url, response.status_code, start)
             
             try:
                 response_data = response.json()
-                print(f"Response Body: {json.dumps(response_data, indent=2)}")
+                if should_log_body(logger):
+                    logger.debug("ClickUp response body: %s", LazyJson(response_data))
                 response.raise_for_status()
                 return response_data
             except json.JSONDecodeError:
-                print(f"Raw Response Text: {response.text}")
+                logger.warning("Invalid JSON from ClickUp: %s", response.text[:body_max_chars()])
                 raise ValueError("Invalid JSON response from ClickUp API")
             
         except requests.exceptions.RequestException as e:
-            print(f"\nAPI Request Error:")
-            print(f"Error Type: {type(e).__name__}")
-            print(f"Error Message: {str(e)}")
+            logger.warning("ClickUp request %s %s failed: %s: %s", method, url, type(e).__name__, e)
             
             if isinstance(e, requests.exceptions.HTTPError):
                 status_code = e.response.status_code
-                print(f"HTTP Status Code: {status_code}")
-                print(f"Response Body: {e.response.text}")
-                
-                if status_code == 401:
-                    raise ValueError("Invalid ClickUp API key or unauthorized access")
-                elif status_code == 403:
-                    raise ValueError("Insufficient permissions for this operation")
-                elif status_code == 404:
-                    raise ValueError("Requested resource not found")
-                elif status_code == 429:
-                    raise ValueError("ClickUp API rate limit exceeded")
-                else:
-                    raise ValueError(f"ClickUp API error (HTTP {status_code}): {str(e)}")
+                logger.debug("ClickUp error response body: %s", e.response.text[:body_max_chars()])
+                raise ValueError(_http_error_message(status_code, e))
             elif isinstance(e, requests.exceptions.ConnectionError):
                 raise ValueError("Failed to connect to ClickUp API. Please check your internet connection.")
             elif isinstance(e, requests.exceptions.Timeout):
@@ -124,39 +444,428 @@ class ClickUpClient:
             else:
                 raise ValueError(f"ClickUp API error: {str(e)}")
 
-    def list_spaces(self) -> Dict[str, Any]:
-        """List all spaces in the workspace."""
-        print("\nListing ClickUp Spaces:")
+    def list_spaces(self, refresh: bool = False) -> Dict[str, Any]:
+        """List all spaces in the workspace, served from the hierarchy cache when fresh."""
+        logger.debug("Listing ClickUp Spaces")
         team_id = self.get_team_id()
-        print(f"Using Team ID: {team_id}")
-        return self._make_request("GET", f"team/{team_id}/space")
+        logger.debug("Using Team ID: %s", team_id)
+        if not refresh:
+            cached = self.cache.get_spaces(team_id)
+            if cached is not None:
+                return cached
+        spaces = self._make_request("GET", f"team/{team_id}/space")
+        self.cache.set_spaces(team_id, spaces)
+        return spaces
+
+    def list_lists(self, space_id: str, refresh: bool = False) -> Dict[str, Any]:
+        """List all lists in a space, served from the hierarchy cache when fresh."""
+        logger.debug("Listing ClickUp Lists for Space %s", space_id)
+        if not refresh:
+            cached = self.cache.get_lists(space_id)
+            if cached is not None:
+                return cached
+        lists = self._make_request("GET", f"space/{space_id}/list")
+        self.cache.set_lists(space_id, lists)
+        return lists
 
-    def list_lists(self, space_id: str) -> Dict[str, Any]:
-        """List all lists in a space."""
-        print(f"\nListing ClickUp Lists for Space {space_id}:")
-        return self._make_request("GET", f"space/{space_id}/list")
+    def warm_up(self) -> None:
+        """Populate the hierarchy cache with the team, its spaces and their lists."""
+        spaces = self.list_spaces(refresh=True)
+        for space in spaces.get("spaces", []):
+            self.list_lists(space["id"], refresh=True)
 
-    def list_tasks(self, list_id: str) -> Dict[str, Any]:
-        """List all tasks in a list."""
-        print(f"\nListing ClickUp Tasks for List {list_id}:")
-        return self._make_request("GET", f"list/{list_id}/task")
+    def invalidate_cache(self, space_id: Optional[str] = None, list_id: Optional[str] = None) -> None:
+        """Drop cached hierarchy data after a write (everything if no IDs are given)."""
+        self.cache.invalidate(space_id=space_id, list_id=list_id)
+
+    def list_tasks(self, list_id: str, page: Optional[int] = None, **params) -> Dict[str, Any]:
+        """List tasks in a list.
+
+        Fetches every page unless a single page number is given.
+        """
+        logger.debug("Listing ClickUp Tasks for List %s", list_id)
+        if page is not None:
+            return self._make_request("GET", f"list/{list_id}/task", params={**params, "page": page})
+        tasks = []
+        for page_tasks in self.iter_task_pages(list_id, **params):
+            tasks.extend(page_tasks)
+        return {"tasks": tasks}
+
+    def iter_task_pages(self, list_id: str, **params) -> Iterator[List[Dict[str, Any]]]:
+        """Yield the tasks of a list one page at a time."""
+        page = 0
+        while True:
+            data = self._make_request("GET", f"list/{list_id}/task", params={**params, "page": page})
+            tasks = data.get("tasks", [])
+            yield tasks
+            if _is_last_task_page(data, tasks):
+                return
+            page += 1
 
     def create_task(self, list_id: str, name: str, description: str, **kwargs) -> Dict[str, Any]:
         """Create a new task in a list."""
-        print(f"\nCreating ClickUp Task in List {list_id}:")
+        logger.debug("Creating ClickUp Task in List %s", list_id)
         data = {
             "name": name,
             "description": description,
             **kwargs
         }
-        return self._make_request("POST", f"list/{list_id}/task", data=data)
+        task = self._make_request("POST", f"list/{list_id}/task", data=data)
+        # Lists responses carry task counts, so drop the one holding this list
+        self.invalidate_cache(list_id=list_id)
+        return task
 
     def update_task(self, task_id: str, **kwargs) -> Dict[str, Any]:
         """Update a task."""
-        print(f"\nUpdating ClickUp Task {task_id}:")
+        logger.debug("Updating ClickUp Task %s", task_id)
         return self._make_request("PUT", f"task/{task_id}", data=kwargs)
 
     def get_task(self, task_id: str) -> Dict[str, Any]:
         """Get task details."""
-        print(f"\nGetting ClickUp Task {task_id}:")
+        logger.debug("Getting ClickUp Task %s", task_id)
         return self._make_request("GET", f"task/{task_id}")
+
+
+class AsyncClickUpClient:
+    """Async ClickUp client built on the shared, connection-pooled httpx client.
+
+    Mirrors the ClickUpClient API so it can be awaited from FastAPI handlers
+    without blocking the event loop.
+    """
+
+    def __init__(self, access_token: str, team_id: Optional[str] = None,
+                 http_client: Optional[httpx.AsyncClient] = None, cache: Optional[HierarchyCache] = None):
+        self.base_url = CLICKUP_API_BASE_URL
+        self.access_token = access_token
+
+        if not self.access_token:
+            raise ValueError("Access token is required")
+
+        self.headers = {"Authorization": f"Bearer {self.access_token}"}
+        self.team_id = team_id  # Will be set when needed
+        self.cache = cache or HierarchyCache()
+        self.rate_limiter: RateLimiter = get_rate_limiter(self.access_token)
+        self._http_client = http_client
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """The pooled HTTP client used for requests."""
+        return self._http_client or get_shared_http_client()
+
+    async def aclose(self) -> None:
+        """Close the client's own HTTP pool. The shared pool is left open."""
+        if self._http_client is not None and not self._http_client.is_closed:
+            await self._http_client.aclose()
+
+    async def get_team_id(self) -> str:
+        """Get the first team ID from the user's teams."""
+        if self.team_id:
+            return self.team_id
+
+        try:
+            url = f"{self.base_url}/team"
+            logger.debug("Getting ClickUp teams from %s", url)
+
+            response = await self._send("GET", url)
+            logger.debug("ClickUp teams response status %s", response.status_code)
+
+            response.raise_for_status()
+            teams_data = response.json()
+            if should_log_body(logger):
+                logger.debug("ClickUp teams response: %s", LazyJson(teams_data))
+
+            if not isinstance(teams_data, dict):
+                raise ValueError("Invalid response format from ClickUp API")
+
+            teams = teams_data.get("teams")
+            if not teams:
+                raise ValueError("No teams found in ClickUp account. Please ensure you have access to at least one team.")
+
+            self.team_id = teams[0]["id"]
+            logger.info("Using ClickUp team ID %s", self.team_id)
+            return self.team_id
+
+        except Exception as e:
+            if isinstance(e, httpx.HTTPStatusError):
+                message = _team_error_message(e.response.status_code)
+                if message:
+                    raise ValueError(message)
+                logger.warning("ClickUp teams error response: %s", e.response.text[:body_max_chars()])
+            logger.error("Error getting team ID: %s", e)
+            raise ValueError(f"Failed to get ClickUp team ID: {str(e)}")
+
+    async def _send(self, method: str, url: str, params: Dict = None, data: Dict = None) -> httpx.Response:
+        """Send a request, sharing the response of an identical GET already in flight.
+
+        Each caller parses the shared response itself, so they never share
+        the decoded objects.
+        """
+        if method == "GET" and _coalesce_gets():
+            return await _flights.do(
+                _flight_key(method, url, params, self.access_token),
+                lambda: self._send_with_retries(method, url, params=params),
+            )
+        return await self._send_with_retries(method, url, params=params, data=data)
+
+    async def _send_with_retries(self, method: str, url: str, params: Dict = None,
+                                 data: Dict = None) -> httpx.Response:
+        """Send a request paced by the token's rate limiter, retrying 429/5xx responses."""
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire()
+            response = await self.http_client.request(
+                method,
+                url,
+                headers=self.headers,
+                params=params,
+                json=data
+            )
+            delay = await self.rate_limiter.record_response(method, response.status_code, response.headers, attempt)
+            if delay is None:
+                return response
+            logger.warning("ClickUp returned HTTP %s for %s %s; retrying in %.2fs",
+                           response.status_code, method, url, delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def rate_limit_stats(self) -> Dict[str, float]:
+        """Throttling and retry counters for this client's token."""
+        return self.rate_limiter.snapshot()
+
+    async def _make_request(self, method: str, endpoint: str, params: Dict = None, data: Dict = None) -> Dict[str, Any]:
+        """Make a request to the ClickUp API."""
+        url = f"{self.base_url}/{endpoint}"
+        start = time.perf_counter()
+        try:
+            logger.debug("ClickUp request %s %s params=%s", method, url, params)
+            if data and should_log_body(logger):
+                logger.debug("ClickUp request body: %s", LazyJson(data))
+
+            response = await self._send(method, url, params=params, data=data)
+            _log_response(method, url, response.status_code, start)
+
+            try:
+                response_data = response.json()
+                if should_log_body(logger):
+                    logger.debug("ClickUp response body: %s", LazyJson(response_data))
+                response.raise_for_status()
+                return response_data
+            except json.JSONDecodeError:
+                logger.warning("Invalid JSON from ClickUp: %s", response.text[:body_max_chars()])
+                raise ValueError("Invalid JSON response from ClickUp API")
+
+        except httpx.HTTPStatusError as e:
+            status_code = e.response.status_code
+            logger.warning("ClickUp request %s %s failed with HTTP %s", method, url, status_code)
+            logger.debug("ClickUp error response body: %s", e.response.text[:body_max_chars()])
+            raise ValueError(_http_error_message(status_code, e))
+        except httpx.TimeoutException:
+            logger.warning("ClickUp request %s %s timed out", method, url)
+            raise ValueError("ClickUp API request timed out. Please try again.")
+        except httpx.ConnectError:
+            logger.warning("ClickUp request %s %s could not connect", method, url)
+            raise ValueError("Failed to connect to ClickUp API. Please check your internet connection.")
+        except httpx.HTTPError as e:
+            logger.warning("ClickUp request %s %s failed: %s: %s", method, url, type(e).__name__, e)
+            raise ValueError(f"ClickUp API error: {str(e)}")
+
+    async def list_spaces(self, refresh: bool = False) -> Dict[str, Any]:
+        """List all spaces in the workspace, served from the hierarchy cache when fresh."""
+        logger.debug("Listing ClickUp Spaces")
+        team_id = await self.get_team_id()
+        logger.debug("Using Team ID: %s", team_id)
+        if not refresh:
+            cached = await self._cache_call(self.cache.get_spaces, team_id)
+            if cached is not None:
+                return cached
+        spaces = await self._make_request("GET", f"team/{team_id}/space")
+        await self._cache_call(self.cache.set_spaces, team_id, spaces)
+        return spaces
+
+    async def list_lists(self, space_id: str, refresh: bool = False) -> Dict[str, Any]:
+        """List all lists in a space, served from the hierarchy cache when fresh."""
+        logger.debug("Listing ClickUp Lists for Space %s", space_id)
+        if not refresh:
+            cached = await self._cache_call(self.cache.get_lists, space_id)
+            if cached is not None:
+                return cached
+        lists = await self._make_request("GET", f"space/{space_id}/list")
+        await self._cache_call(self.cache.set_lists, space_id, lists)
+        return lists
+
+    async def _cache_call(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a hierarchy cache operation, in a thread when the cache lives in a shared backend."""
+        if self.cache.shared:
+            return await asyncio.to_thread(fn, *args, **kwargs)
+        return fn(*args, **kwargs)
+
+    async def warm_up(self) -> None:
+        """Populate the hierarchy cache with the team, its spaces and their lists.
+
+        Lists for all spaces are fetched concurrently.
+        """
+        spaces = await self.list_spaces(refresh=True)
+        await asyncio.gather(*(
+            self.list_lists(space["id"], refresh=True)
+            for space in spaces.get("spaces", [])
+        ))
+
+    async def invalidate_cache(self, space_id: Optional[str] = None, list_id: Optional[str] = None) -> None:
+        """Drop cached hierarchy data after a write (everything if no IDs are given)."""
+        await self._cache_call(self.cache.invalidate, space_id=space_id, list_id=list_id)
+
+    async def list_tasks(self, list_id: str, page: Optional[int] = None, **params) -> Dict[str, Any]:
+        """List tasks in a list.
+
+        Fetches every page unless a single page number is given.
+        """
+        logger.debug("Listing ClickUp Tasks for List %s", list_id)
+        if page is not None:
+            return await self._fetch_task_page(list_id, page, params)
+        tasks = []
+        async for page_tasks in self.iter_task_pages(list_id, **params):
+            tasks.extend(page_tasks)
+        return {"tasks": tasks}
+
+    async def _fetch_task_page(self, list_id: str, page: int, params: Dict[str, Any]) -> Dict[str, Any]:
+        data = await self._make_request("GET", f"list/{list_id}/task", params={**params, "page": page})
+        _notify_task_listeners(data.get("tasks", []))
+        return data
+
+    async def iter_task_pages(self, list_id: str, **params) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield the tasks of a list one page at a time.
+
+        The next page is requested as soon as the current one arrives, so it
+        downloads while the caller consumes the current page. At most two
+        pages are held in memory.
+        """
+        page = 0
+        fetch = asyncio.ensure_future(self._fetch_task_page(list_id, page, params))
+        try:
+            while fetch is not None:
+                data = await fetch
+                tasks = data.get("tasks", [])
+                fetch = None
+                if not _is_last_task_page(data, tasks):
+                    page += 1
+                    fetch = asyncio.ensure_future(self._fetch_task_page(list_id, page, params))
+                yield tasks
+        finally:
+            # Don't leave a prefetch running if the caller stops early
+            if fetch is not None and not fetch.done():
+                fetch.cancel()
+
+    async def iter_tasks(self, list_id: str, **params) -> AsyncIterator[Dict[str, Any]]:
+        """Yield every task in a list, fetching pages on demand."""
+        async for page_tasks in self.iter_task_pages(list_id, **params):
+            for task in page_tasks:
+                yield task
+
+    async def create_task(self, list_id: str, name: str, description: str, **kwargs) -> Dict[str, Any]:
+        """Create a new task in a list."""
+        logger.debug("Creating ClickUp Task in List %s", list_id)
+        data = {
+            "name": name,
+            "description": description,
+            **kwargs
+        }
+        task = await self._make_request("POST", f"list/{list_id}/task", data=data)
+        # Lists responses carry task counts, so drop the one holding this list
+        await self.invalidate_cache(list_id=list_id)
+        _notify_task_listeners([task])
+        return task
+
+    async def create_tasks_bulk(self, list_id: Optional[str], tasks: List[Dict[str, Any]],
+                                concurrency: Optional[int] = None,
+                                on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        """Create many tasks with a bounded number of requests in flight.
+
+        Each spec needs a ``name`` and may set ``description``, ``list_id`` (to
+        override the default list) and any other ClickUp task field. Requests
+        still go through the token's rate limiter, so the pool runs at the API
+        quota rather than past it. Returns one result per spec, in input order:
+        ``{"index", "success", "task"}`` or ``{"index", "success", "error"}``.
+        ``on_result`` is called as each item finishes.
+        """
+        concurrency = concurrency or _env_int("CLICKUP_BULK_CONCURRENCY", 8)
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def create_one(index: int, spec: Dict[str, Any]) -> Dict[str, Any]:
+            fields = dict(spec)
+            target_list = fields.pop("list_id", None) or list_id
+            name = fields.pop("name", None)
+            description = fields.pop("description", "")
+            if not target_list or not name:
+                result = {"index": index, "success": False, "error": "Task spec needs a name and a list_id"}
+            else:
+                async with semaphore:
+                    try:
+                        task = await self.create_task(target_list, name, description, **fields)
+                        result = {"index": index, "success": True, "task": task}
+                    except Exception as e:
+                        result = {"index": index, "success": False, "error": str(e)}
+            if on_result:
+                on_result(result)
+            return result
+
+        results = await asyncio.gather(*(create_one(i, spec) for i, spec in enumerate(tasks)))
+        failed = sum(1 for result in results if not result["success"])
+        logger.info("Bulk created %s of %s ClickUp tasks", len(results) - failed, len(results))
+        return list(results)
+
+    async def update_task(self, task_id: str, **kwargs) -> Dict[str, Any]:
+        """Update a task."""
+        logger.debug("Updating ClickUp Task %s", task_id)
+        task = await self._make_request("PUT", f"task/{task_id}", data=kwargs)
+        _notify_task_listeners([task])
+        return task
+
+    async def get_task(self, task_id: str) -> Dict[str, Any]:
+        """Get task details."""
+        logger.debug("Getting ClickUp Task %s", task_id)
+        task = await self._make_request("GET", f"task/{task_id}")
+        _notify_task_listeners([task])
+        return task
+
+    async def list_webhooks(self) -> Dict[str, Any]:
+        """List the webhooks registered for the team."""
+        team_id = await self.get_team_id()
+        return await self._make_request("GET", f"team/{team_id}/webhook")
+
+    async def create_webhook(self, endpoint: str, events: List[str], **filters) -> Dict[str, Any]:
+        """Register a webhook. ``filters`` may scope it (space_id, folder_id, list_id, task_id).
+
+        The response includes the signing secret, which ClickUp only returns here.
+        """
+        team_id = await self.get_team_id()
+        data = {"endpoint": endpoint, "events": events, **filters}
+        return await self._make_request("POST", f"team/{team_id}/webhook", data=data)
+
+    async def update_webhook(self, webhook_id: str, **fields) -> Dict[str, Any]:
+        """Update a webhook's endpoint, events or status."""
+        return await self._make_request("PUT", f"webhook/{webhook_id}", data=fields)
+
+    async def delete_webhook(self, webhook_id: str) -> Dict[str, Any]:
+        """Delete a webhook."""
+        return await self._make_request("DELETE", f"webhook/{webhook_id}")
+
+    async def ensure_webhook(self, endpoint: str, events: List[str], **filters) -> Dict[str, Any]:
+        """Register a webhook for ``endpoint``, or renew the existing one.
+
+        An existing webhook is reactivated and given the requested events if
+        ClickUp marked it failing or suspended or its events differ. Returns
+        the webhook; ``secret`` is only present when it was newly created.
+        """
+        webhooks = (await self.list_webhooks()).get("webhooks", [])
+        existing = next((hook for hook in webhooks if hook.get("endpoint") == endpoint), None)
+        if existing is None:
+            created = await self.create_webhook(endpoint, events, **filters)
+            logger.info("Registered ClickUp webhook for %s", endpoint)
+            return created.get("webhook", created)
+
+        health = (existing.get("health") or {}).get("status", "active")
+        if health != "active" or sorted(existing.get("events") or []) != sorted(events):
+            updated = await self.update_webhook(existing["id"], endpoint=endpoint, events=events, status="active")
+            logger.info("Renewed ClickUp webhook %s (was %s)", existing["id"], health)
+            return updated.get("webhook", updated)
+        return existing
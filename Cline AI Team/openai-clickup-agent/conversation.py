@@ -0,0 +1,109 @@
+import os
+import asyncio
+from typing import Any, Dict, Optional
+
+from clickup import AsyncClickUpClient
+from mirror import ClickUpMirror
+from state_backend import StateBackend
+from log_config import get_logger
+
+logger = get_logger("conversation")
+
+
+class ConversationState:
+    """Per-session conversation state: the selected space and list.
+
+    Selections live in the state backend, so every worker sees them, and
+    expire after ``ttl`` seconds without a change. Selecting a space starts a
+    background prefetch of its lists and of the first page of open tasks in
+    its first ``prefetch_lists`` lists into the mirror, so follow-up
+    commands in that space are served locally. Prefetched tasks stay current
+    through webhook updates; a full read of a list still syncs it in full.
+    """
+
+    NAMESPACE = "conversation"
+
+    def __init__(self, backend: StateBackend, mirror: ClickUpMirror, ttl: Optional[float] = None,
+                 prefetch_lists: Optional[int] = None):
+        self.backend = backend
+        self.mirror = mirror
+        self.ttl = ttl or float(os.getenv("CONVERSATION_TTL", "86400"))
+        self.prefetch_lists = prefetch_lists if prefetch_lists is not None else int(
+            os.getenv("CONVERSATION_PREFETCH_LISTS", "3"))
+        self._prefetches: Dict[str, asyncio.Task] = {}
+        self.stats = {"selections": 0, "prefetches": 0, "prefetch_failures": 0}
+
+    def get(self, session_id: str) -> Dict[str, Any]:
+        """The session's selection (``space_id``, ``space_name``, ``list_id``, ``list_name``), possibly empty."""
+        return self.backend.get(self.NAMESPACE, session_id) or {}
+
+    def select_space(self, session_id: str, space: Dict[str, Any]) -> None:
+        """Remember a space, forgetting the list selected in the previous one."""
+        self.backend.set(self.NAMESPACE, session_id, {"space_id": space["id"], "space_name": space.get("name")},
+                         ttl=self.ttl)
+        self.stats["selections"] += 1
+
+    def select_list(self, session_id: str, space_id: str, list_item: Dict[str, Any]) -> None:
+        """Remember a list, unless the user has moved to another space meanwhile."""
+        state = self.get(session_id)
+        if state.get("space_id") != space_id:
+            return
+        state.update(list_id=list_item["id"], list_name=list_item.get("name"))
+        self.backend.set(self.NAMESPACE, session_id, state, ttl=self.ttl)
+
+    async def clear(self, session_id: str) -> None:
+        task = self._prefetches.pop(session_id, None)
+        if task is not None:
+            task.cancel()
+        await asyncio.to_thread(self.backend.delete, self.NAMESPACE, session_id)
+
+    def prefetch(self, session_id: str, client: AsyncClickUpClient, space_id: str) -> None:
+        """Start prefetching a space in the background, replacing any prefetch in flight."""
+        previous = self._prefetches.pop(session_id, None)
+        if previous is not None and not previous.done():
+            previous.cancel()
+        task = asyncio.create_task(self._prefetch(session_id, client, space_id))
+        self._prefetches[session_id] = task
+        task.add_done_callback(lambda t: self._forget(session_id, t))
+        self.stats["prefetches"] += 1
+
+    def _forget(self, session_id: str, task: asyncio.Task) -> None:
+        if self._prefetches.get(session_id) is task:
+            del self._prefetches[session_id]
+
+    async def _prefetch(self, session_id: str, client: AsyncClickUpClient, space_id: str) -> None:
+        try:
+            lists = (await self.mirror.sync_lists(client, space_id)).get("lists", [])
+            if lists:
+                await asyncio.to_thread(self.select_list, session_id, space_id, lists[0])
+            await asyncio.gather(*(
+                self.mirror.prefetch_list(client, item["id"]) for item in lists[:self.prefetch_lists]
+            ))
+            logger.debug("Prefetched space %s for session %s", space_id, session_id[:8])
+        except Exception as e:
+            self.stats["prefetch_failures"] += 1
+            logger.warning("Failed to prefetch space %s: %s", space_id, e)
+
+    async def wait_for_prefetch(self, session_id: str, timeout: float) -> None:
+        """Wait up to ``timeout`` seconds for the session's prefetch in this worker, if one is running."""
+        task = self._prefetches.get(session_id)
+        if task is None:
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            # A superseded prefetch is fine; our own cancellation is not
+            if not task.cancelled():
+                raise
+
+    async def close(self) -> None:
+        tasks = list(self._prefetches.values())
+        self._prefetches.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def snapshot(self) -> Dict[str, int]:
+        return {"prefetching": len(self._prefetches), **self.stats}
@@ -0,0 +1,162 @@
+import os
+import gzip
+import json
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from log_config import get_logger
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+logger = get_logger("http_cache")
+
+
+def serialize(payload: Any) -> bytes:
+    """Encode a payload exactly as FastAPI's JSONResponse would."""
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def content_tag(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def parse_if_none_match(header: Optional[str]) -> List[str]:
+    """Content tags named by an If-None-Match header ("*" matches anything).
+
+    Weak validators and the encoding suffixes added by HTTPCache are
+    stripped, since every representation of the same content is equivalent
+    for revalidation.
+    """
+    if not header:
+        return []
+    tags = []
+    for item in header.split(","):
+        item = item.strip()
+        if item.startswith("W/"):
+            item = item[2:]
+        item = item.strip('"')
+        if item:
+            tags.append(item.split("-", 1)[0])
+    return tags
+
+
+def accepted_encodings(header: Optional[str]) -> Dict[str, float]:
+    """Content codings from an Accept-Encoding header with their q-values."""
+    encodings = {}
+    for item in (header or "").split(","):
+        name, _, params = item.strip().partition(";")
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        encodings[name.strip().lower()] = quality
+    return encodings
+
+
+class HTTPCache:
+    """Conditional, compressed JSON responses for endpoints that clients poll.
+
+    Each response carries a strong ETag derived from a hash of its JSON, and
+    a request whose If-None-Match names it gets an empty 304. Bodies of at
+    least ``min_bytes`` are compressed with brotli (if installed) or gzip
+    when the client accepts it. The compressed bytes are kept in an LRU
+    keyed by content hash and coding, up to ``max_bytes``, so polling
+    clients don't pay for compression again until the content changes.
+    """
+
+    def __init__(self, min_bytes: Optional[int] = None, max_mb: Optional[float] = None,
+                 gzip_level: Optional[int] = None, brotli_quality: Optional[int] = None):
+        self.min_bytes = min_bytes if min_bytes is not None else int(os.getenv("HTTP_COMPRESS_MIN_BYTES", "1024"))
+        self.max_bytes = int((max_mb if max_mb is not None else float(os.getenv("HTTP_CACHE_MAX_MB", "32"))) * 1024 * 1024)
+        self.gzip_level = gzip_level if gzip_level is not None else int(os.getenv("HTTP_GZIP_LEVEL", "6"))
+        self.brotli_quality = brotli_quality if brotli_quality is not None else int(os.getenv("HTTP_BROTLI_QUALITY", "5"))
+        self._encoded: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.stats = {"responses": 0, "not_modified": 0, "compressed": 0, "compression_cache_hits": 0,
+                      "bytes_before": 0, "bytes_sent": 0}
+
+    def _choose_encoding(self, header: Optional[str]) -> Optional[str]:
+        encodings = accepted_encodings(header)
+        for name in (("br", "gzip") if brotli is not None else ("gzip",)):
+            if encodings.get(name, encodings.get("*", 0.0)) > 0:
+                return name
+        return None
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def _get_encoded(self, key: Tuple[str, str]) -> Optional[bytes]:
+        with self._lock:
+            encoded = self._encoded.get(key)
+            if encoded is not None:
+                self._encoded.move_to_end(key)
+            return encoded
+
+    def _store_encoded(self, key: Tuple[str, str], encoded: bytes) -> None:
+        if len(encoded) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._encoded.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._encoded[key] = encoded
+            self._size += len(encoded)
+            while self._size > self.max_bytes:
+                _, evicted = self._encoded.popitem(last=False)
+                self._size -= len(evicted)
+
+    async def json_response(self, request: Request, payload: Any) -> Response:
+        """Build the response for a JSON payload, honouring If-None-Match and Accept-Encoding."""
+        body = serialize(payload)
+        tag = content_tag(body)
+        self.stats["responses"] += 1
+        self.stats["bytes_before"] += len(body)
+        # Per-user data: browsers may keep it but must revalidate every time
+        headers = {"Cache-Control": "private, no-cache", "Vary": "Accept-Encoding, Cookie"}
+
+        encoding = self._choose_encoding(request.headers.get("accept-encoding")) if len(body) >= self.min_bytes else None
+        headers["ETag"] = f'"{tag}-{encoding}"' if encoding else f'"{tag}"'
+
+        requested = parse_if_none_match(request.headers.get("if-none-match"))
+        if "*" in requested or tag in requested:
+            self.stats["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+
+        if encoding:
+            key = (tag, encoding)
+            encoded = self._get_encoded(key)
+            if encoded is None:
+                encoded = await asyncio.to_thread(self._compress, body, encoding)
+                self._store_encoded(key, encoded)
+            else:
+                self.stats["compression_cache_hits"] += 1
+            self.stats["compressed"] += 1
+            headers["Content-Encoding"] = encoding
+            body = encoded
+        self.stats["bytes_sent"] += len(body)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "brotli": brotli is not None,
+            "cached_entries": len(self._encoded),
+            "cached_bytes": self._size,
+        }
@@ -0,0 +1,232 @@
+import os
+import re
+import math
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from log_config import get_logger
+
+logger = get_logger("intent_router")
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+# Messages asking for a task to be written always go to the LLM for drafting
+CREATE_TASK = re.compile(r"\b(create|new|add|make|draft|write)\s+(a\s+|an\s+|the\s+)?(new\s+)?task\b", re.I)
+
+_POLITE = r"(please\s+|can you\s+|could you\s+|would you\s+)?"
+_SHOW = r"(list|show|display|get|give|tell)(\s+me)?\s+(all\s+)?(of\s+)?(my\s+|the\s+|our\s+)?"
+_QUESTION = r"(what|which)\s+(are\s+)?(my\s+|the\s+)?"
+_QUESTION_TAIL = r"(\s+(do i have|are there|can i see|exist|are available))?"
+# Only verbs that mean "make this the current space"; "open" or "go to" could be about anything
+_SELECT = r"(use|select|switch to|change to)\s+"
+
+# (command, pattern) pairs tried in order. Patterns match the whole message
+# after trimming trailing punctuation; the "arg" group becomes the argument.
+PATTERNS: List[Tuple[str, re.Pattern]] = [
+    ("LIST_SPACES", re.compile(_POLITE + _SHOW + r"(clickup\s+)?(spaces|workspaces)(\s+please)?", re.I)),
+    ("LIST_SPACES", re.compile(_QUESTION + r"(clickup\s+)?(spaces|workspaces)" + _QUESTION_TAIL, re.I)),
+    ("LIST_TASKS", re.compile(_POLITE + _SHOW + r"(open\s+|current\s+)?tasks(\s+please)?", re.I)),
+    ("LIST_TASKS", re.compile(_QUESTION + r"(open\s+|current\s+)?tasks" + _QUESTION_TAIL, re.I)),
+    # The name sits directly before or after "space" and must read like a name (see _is_space_name)
+    ("SELECT_SPACE", re.compile(_POLITE + _SELECT + r"(the\s+|my\s+)?(?P<arg>.+?)\s+(space|workspace)", re.I)),
+    ("SELECT_SPACE", re.compile(_POLITE + _SELECT + r"(the\s+|my\s+)?(space|workspace)\s+(?P<arg>.+)", re.I)),
+    # "task(s)" is required so "find a way to speed up the build" still goes to the model
+    ("SEARCH_TASKS", re.compile(
+        _POLITE + r"(find|search|search for|look for|look up)\s+(all\s+)?(the\s+|my\s+)?tasks?\s+"
+        r"(about|for|on|matching|mentioning|related to|regarding|with)?\s*(the\s+)?(?P<arg>.+)", re.I)),
+]
+
+# Arguments made only of these words carry no search terms ("find tasks for me")
+STOPWORDS = {
+    "a", "an", "the", "me", "my", "i", "it", "us", "our", "you", "this", "that", "these", "those",
+    "all", "any", "some", "please", "now", "to", "of", "for", "on", "in", "with", "and", "or",
+}
+
+# A space name longer than this is more likely a sentence about something else
+MAX_SPACE_NAME_WORDS = 5
+# Words that put an argument about tasks or lists rather than a space name
+NOT_SPACE_NAME_WORDS = {"task", "tasks", "list", "lists", "space", "spaces", "workspace", "workspaces"}
+
+# Messages and the response they must route to (None: left to the LLM), checked by
+# running this module. Includes phrasings that once routed wrongly.
+ROUTING_CHECKS: List[Tuple[str, Optional[str]]] = [
+    ("list spaces", "LIST_SPACES"),
+    ("use the Jon Cline space", "SELECT_SPACE: Jon Cline"),
+    ("switch to space Other", "SELECT_SPACE: Other"),
+    ("find tasks about billing", "SEARCH_TASKS: billing"),
+    ("open the task about billing in my space", None),
+    ("use the task about billing in my space", None),
+    ("use this space", None),
+    ("find a way to speed up the build", None),
+    ("search for billing", None),
+    ("rename my tasks list to Sprint", None),
+    ("show me tasks assigned to Bob", None),
+    ("create a task to update the docs", None),
+]
+
+# Labelled examples for the fallback classifier
+TRAINING_EXAMPLES: Dict[str, List[str]] = {
+    "LIST_SPACES": [
+        "list spaces", "show me my spaces", "what spaces do i have", "which spaces can i see",
+        "spaces please", "can you list all the spaces", "show the workspaces", "tell me my clickup spaces",
+        "what workspaces are there", "i want to see my spaces",
+    ],
+    "LIST_TASKS": [
+        "list tasks", "show me my tasks", "what tasks do i have", "tasks please",
+        "what is on my task list", "can you show the tasks", "what are my open tasks",
+        "i want to see my tasks", "what do i have to do", "show everything on my list",
+    ],
+    "CREATE_TASK": [
+        "create a task to update the docs", "new task fix login bug", "add a task for the release notes",
+        "remind me to call the vendor", "we need to refactor the billing module",
+        "make a ticket for the outage", "i need a task to review the pull request",
+        "write up a task for onboarding", "set up a task to migrate the database", "log a bug about search",
+    ],
+    "OTHER": [
+        "hello", "thanks", "how are you", "what can you do", "help",
+        "who are you", "explain how this works", "good morning", "what is clickup", "tell me a joke",
+    ],
+}
+
+# Classifier labels that map to an argument-free command
+CLASSIFIER_COMMANDS = {"LIST_SPACES": "LIST_SPACES", "LIST_TASKS": "LIST_TASKS"}
+
+
+def _tokens(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def _is_space_name(argument: str) -> bool:
+    """Whether a SELECT_SPACE argument reads like a space name, not a phrase about something else."""
+    words = _tokens(argument)
+    return (0 < len(words) <= MAX_SPACE_NAME_WORDS and words[0] not in STOPWORDS and words[-1] not in STOPWORDS
+            and not NOT_SPACE_NAME_WORDS.intersection(words))
+
+
+class NaiveBayesClassifier:
+    """Multinomial naive Bayes over words with Laplace smoothing."""
+
+    def __init__(self, examples: Dict[str, List[str]]):
+        self.labels = list(examples)
+        self.word_counts: Dict[str, Counter] = {}
+        self.totals: Dict[str, int] = {}
+        self.priors: Dict[str, float] = {}
+        vocabulary = set()
+        total_examples = sum(len(texts) for texts in examples.values())
+        for label, texts in examples.items():
+            counts = Counter(word for text in texts for word in _tokens(text))
+            self.word_counts[label] = counts
+            self.totals[label] = sum(counts.values())
+            self.priors[label] = math.log(len(texts) / total_examples)
+            vocabulary.update(counts)
+        self.vocabulary = vocabulary
+        self.vocabulary_size = len(vocabulary)
+
+    def known_fraction(self, text: str) -> float:
+        """Share of the text's words seen in training (1.0 for no words)."""
+        words = _tokens(text)
+        if not words:
+            return 1.0
+        return sum(1 for word in words if word in self.vocabulary) / len(words)
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """Most likely label and its posterior probability.
+
+        Unseen words are scored too, as one shared unknown word, so they
+        weigh against every label instead of being ignored.
+        """
+        words = _tokens(text)
+        scores = {}
+        for label in self.labels:
+            counts = self.word_counts[label]
+            denominator = self.totals[label] + self.vocabulary_size + 1
+            scores[label] = self.priors[label] + sum(math.log((counts[word] + 1) / denominator) for word in words)
+        best = max(scores, key=scores.get)
+        # Softmax over log scores for the posterior of the winner
+        norm = sum(math.exp(score - scores[best]) for score in scores.values())
+        return best, 1.0 / norm
+
+
+class Intent:
+    __slots__ = ("command", "argument", "confidence", "source")
+
+    def __init__(self, command: str, argument: Optional[str], confidence: float, source: str):
+        self.command = command
+        self.argument = argument
+        self.confidence = confidence
+        self.source = source
+
+    @property
+    def response(self) -> str:
+        """The command in the assistant's response format, e.g. ``SELECT_SPACE: Jon Cline``."""
+        return f"{self.command}: {self.argument}" if self.argument else self.command
+
+
+class IntentRouter:
+    """Recognise command-style messages locally so they skip the LLM.
+
+    Messages are matched against a pattern grammar first, which also
+    extracts arguments. Otherwise a naive Bayes classifier may route
+    argument-free commands when it is at least ``min_confidence`` sure and
+    at least ``min_known_fraction`` of the message's words were seen in
+    training; an unseen word is often a filter or an action ("tasks due
+    today", "rename my tasks list") the command would silently drop. Task
+    drafting and everything else return None and go to the LLM.
+    """
+
+    def __init__(self, min_confidence: Optional[float] = None, min_known_fraction: float = 1.0):
+        self.min_confidence = min_confidence if min_confidence is not None else float(
+            os.getenv("INTENT_MIN_CONFIDENCE", "0.85"))
+        self.min_known_fraction = min_known_fraction
+        self.classifier = NaiveBayesClassifier(TRAINING_EXAMPLES)
+        self.stats: Dict[str, int] = {"messages": 0, "pattern": 0, "classifier": 0, "llm": 0}
+
+    def _classify(self, message: str) -> Optional[Intent]:
+        text = message.strip().rstrip("?!. ")
+        if not text or CREATE_TASK.search(text):
+            return None
+        for command, pattern in PATTERNS:
+            match = pattern.fullmatch(text)
+            if match:
+                argument = match.groupdict().get("arg")
+                argument = argument.strip(" '\"") if argument else None
+                if "arg" in pattern.groupindex and not argument:
+                    continue
+                if command == "SEARCH_TASKS" and all(word in STOPWORDS for word in _tokens(argument)):
+                    continue
+                if command == "SELECT_SPACE" and not _is_space_name(argument):
+                    continue
+                return Intent(command, argument, 1.0, "pattern")
+        if self.classifier.known_fraction(text) < self.min_known_fraction:
+            return None
+        label, confidence = self.classifier.predict(text)
+        if label in CLASSIFIER_COMMANDS and confidence >= self.min_confidence:
+            return Intent(CLASSIFIER_COMMANDS[label], None, confidence, "classifier")
+        return None
+
+    def route(self, message: str) -> Optional[Intent]:
+        """The command for a message, or None if it needs the LLM."""
+        intent = self._classify(message)
+        self.stats["messages"] += 1
+        self.stats[intent.source if intent else "llm"] += 1
+        if intent:
+            logger.debug("Routed message locally to %s (%s, %.2f)", intent.command, intent.source, intent.confidence)
+        return intent
+
+    def snapshot(self) -> Dict[str, float]:
+        messages = self.stats["messages"]
+        local = self.stats["pattern"] + self.stats["classifier"]
+        return {**self.stats, "hit_rate": round(local / messages, 4) if messages else 0.0}
+
+
+if __name__ == "__main__":
+    router = IntentRouter()
+    failures = 0
+    for message, expected in ROUTING_CHECKS:
+        intent = router.route(message)
+        routed = intent.response if intent else None
+        if routed != expected:
+            failures += 1
+            print(f"FAIL {message!r}: routed to {routed!r}, expected {expected!r}")
+    print(f"{len(ROUTING_CHECKS) - failures}/{len(ROUTING_CHECKS)} routing checks passed")
+    raise SystemExit(1 if failures else 0)
@@ -0,0 +1,275 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from log_config import get_logger
+
+logger = get_logger("jobs")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    progress_done INTEGER NOT NULL DEFAULT 0,
+    progress_total INTEGER,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs(status, created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_owner_created ON jobs(owner, created_at);
+"""
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class JobQueueFull(Exception):
+    """Raised by submit when ``max_queued`` jobs are already waiting."""
+
+
+class Job:
+    """A claimed job, passed to its handler."""
+
+    __slots__ = ("id", "kind", "owner", "params", "done", "total")
+
+    def __init__(self, job_id: str, kind: str, owner: str, params: Dict[str, Any]):
+        self.id = job_id
+        self.kind = kind
+        self.owner = owner
+        self.params = params
+        self.done = 0
+        self.total: Optional[int] = None
+
+    def progress(self, done: int, total: Optional[int] = None) -> None:
+        """Record progress; it is saved to the job record periodically."""
+        self.done = done
+        if total is not None:
+            self.total = total
+
+
+JobHandler = Callable[[Job], Awaitable[Any]]
+
+
+class JobQueue:
+    """Background jobs with persisted records and a bounded worker pool.
+
+    Submitted jobs are stored in SQLite as ``queued`` and claimed by
+    ``workers`` tasks in each process that shares the database, so any
+    worker process can run them and queued jobs survive a restart. While a
+    job runs, its progress is saved every ``progress_interval`` seconds,
+    which doubles as a heartbeat. A running job whose heartbeat is older
+    than ``stale_after`` seconds was interrupted and is marked failed rather
+    than re-run, since jobs like bulk creation are not idempotent.
+    """
+
+    def __init__(self, path: Optional[str] = None, workers: Optional[int] = None,
+                 max_queued: Optional[int] = None, retention: Optional[float] = None):
+        self.path = path or os.getenv("JOBS_DB_PATH", "clickup_jobs.db")
+        self.workers = workers or int(os.getenv("JOB_WORKERS", "4"))
+        self.max_queued = max_queued or int(os.getenv("JOB_MAX_QUEUED", "100"))
+        self.retention = retention or float(os.getenv("JOB_RETENTION", str(7 * 24 * 3600)))
+        self.progress_interval = 1.0
+        self.poll_interval = 1.0
+        self.stale_after = 60.0
+        self.handlers: Dict[str, JobHandler] = {}
+        self.stats = {"submitted": 0, "succeeded": 0, "failed": 0}
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        self.handlers[kind] = handler
+
+    # Records
+
+    @staticmethod
+    def _record(row: tuple) -> Dict[str, Any]:
+        job_id, kind, status, done, total, error, created_at, started_at, finished_at = row
+        return {
+            "id": job_id,
+            "kind": kind,
+            "status": status,
+            "progress": {"done": done, "total": total},
+            "error": error,
+            "created_at": created_at,
+            "started_at": started_at,
+            "finished_at": finished_at,
+        }
+
+    _COLUMNS = "id, kind, status, progress_done, progress_total, error, created_at, started_at, finished_at"
+
+    def get(self, job_id: str, owner: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """A job's record, or None if it doesn't exist or belongs to another owner."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {self._COLUMNS}, owner FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None or (owner is not None and row[-1] != owner):
+            return None
+        return self._record(row[:-1])
+
+    def get_result(self, job_id: str) -> Any:
+        with self._lock:
+            row = self._conn.execute("SELECT result FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row and row[0] is not None else None
+
+    def list(self, owner: str, limit: int = 50) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {self._COLUMNS} FROM jobs WHERE owner = ? ORDER BY created_at DESC LIMIT ?",
+                (owner, limit),
+            ).fetchall()
+        return [self._record(row) for row in rows]
+
+    def _insert(self, job_id: str, kind: str, owner: str, params: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            queued = self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()[0]
+            if queued >= self.max_queued:
+                raise JobQueueFull(f"{queued} jobs are already queued")
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, owner, status, params, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, owner, QUEUED, json.dumps(params), now, now),
+            )
+
+    def _claim(self) -> Optional[Job]:
+        """Move the oldest queued job to running, unless another worker got there first."""
+        with self._lock:
+            while True:
+                row = self._conn.execute(
+                    "SELECT id, kind, owner, params FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+                ).fetchone()
+                if row is None:
+                    return None
+                now = time.time()
+                with self._conn:
+                    claimed = self._conn.execute(
+                        "UPDATE jobs SET status = ?, started_at = ?, updated_at = ? WHERE id = ? AND status = ?",
+                        (RUNNING, now, now, row[0], QUEUED),
+                    ).rowcount
+                if claimed:
+                    return Job(row[0], row[1], row[2], json.loads(row[3]))
+
+    def _save_progress(self, job: Job) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET progress_done = ?, progress_total = ?, updated_at = ? WHERE id = ?",
+                (job.done, job.total, time.time(), job.id),
+            )
+
+    def _finish(self, job: Job, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, progress_done = ?, progress_total = ?, result = ?, error = ?, "
+                "finished_at = ?, updated_at = ? WHERE id = ?",
+                (status, job.done, job.total, json.dumps(result) if result is not None else None, error,
+                 now, now, job.id),
+            )
+        self.stats[status] += 1
+
+    def _sweep(self) -> None:
+        """Fail jobs whose worker stopped heart-beating and drop old finished jobs."""
+        now = time.time()
+        with self._lock, self._conn:
+            interrupted = self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ?, updated_at = ? "
+                "WHERE status = ? AND updated_at < ?",
+                (FAILED, "Interrupted before it finished", now, now, RUNNING, now - self.stale_after),
+            ).rowcount
+            self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?", (SUCCEEDED, FAILED, now - self.retention)
+            )
+        if interrupted:
+            logger.warning("Marked %s interrupted jobs as failed", interrupted)
+
+    # Queue
+
+    async def submit(self, kind: str, owner: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a job and wake a worker. Returns the job's record."""
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job_id = uuid.uuid4().hex
+        await asyncio.to_thread(self._insert, job_id, kind, owner, params)
+        self.stats["submitted"] += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+        logger.info("Queued %s job %s", kind, job_id)
+        return self.get(job_id)
+
+    async def start(self) -> None:
+        await asyncio.to_thread(self._sweep)
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def _worker(self) -> None:
+        sweep_at = time.monotonic() + self.stale_after
+        while True:
+            self._wakeup.clear()
+            job = await asyncio.to_thread(self._claim)
+            if job is not None:
+                await self._run(job)
+                continue
+            if time.monotonic() >= sweep_at:
+                await asyncio.to_thread(self._sweep)
+                sweep_at = time.monotonic() + self.stale_after
+            # Jobs submitted by other processes are picked up on the next poll
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run(self, job: Job) -> None:
+        logger.info("Running %s job %s", job.kind, job.id)
+        task = asyncio.create_task(self.handlers[job.kind](job))
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=self.progress_interval)
+                if done:
+                    break
+                await asyncio.to_thread(self._save_progress, job)
+        except asyncio.CancelledError:
+            task.cancel()
+            self._finish(job, FAILED, error="Interrupted by shutdown")
+            raise
+        try:
+            result = task.result()
+        except Exception as e:
+            logger.warning("%s job %s failed: %s", job.kind, job.id, e)
+            await asyncio.to_thread(self._finish, job, FAILED, None, str(e))
+        else:
+            logger.info("%s job %s succeeded", job.kind, job.id)
+            await asyncio.to_thread(self._finish, job, SUCCEEDED, result)
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        with self._lock:
+            self._conn.close()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {"workers": self.workers, **self.stats, "queued": counts.get(QUEUED, 0),
+                "running": counts.get(RUNNING, 0)}
@@ -0,0 +1,126 @@
+import os
+import json
+import random
+import logging
+from typing import Any, Optional
+
+# Largest request/response body (in characters) written to debug logs
+DEFAULT_BODY_MAX_CHARS = 2000
+
+_configured = False
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line.
+
+    Structured fields passed with ``extra={"fields": {...}}`` are merged into
+    the top-level object.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable format with structured fields appended as key=value pairs."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+def setup_logging() -> None:
+    """Configure logging from the environment. Safe to call more than once.
+
+    LOG_LEVEL sets the default level, LOG_LEVELS overrides it per module
+    (e.g. ``clickup=DEBUG,app=WARNING``) and LOG_FORMAT selects ``text`` or
+    ``json`` output.
+    """
+    global _configured
+    if _configured:
+        return
+    _configured = True
+
+    handler = logging.StreamHandler()
+    if os.getenv("LOG_FORMAT", "text").lower() == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(TextFormatter())
+
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    # httpx logs every request at INFO; keep it quiet unless asked for
+    for noisy in ("httpx", "httpcore"):
+        logging.getLogger(noisy).setLevel(logging.WARNING)
+
+    for item in os.getenv("LOG_LEVELS", "").split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            logging.getLogger(name.strip()).setLevel(level.strip().upper())
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Get a module logger, configuring logging on first use."""
+    setup_logging()
+    return logging.getLogger(name)
+
+
+class LazyJson:
+    """Defer JSON serialization of a log argument until the record is emitted.
+
+    Output is compact and truncated to LOG_BODY_MAX_CHARS, so large task
+    lists cost nothing when debug logging is off and stay bounded when on.
+    """
+
+    __slots__ = ("value", "max_chars")
+
+    def __init__(self, value: Any, max_chars: Optional[int] = None):
+        self.value = value
+        self.max_chars = max_chars if max_chars is not None else body_max_chars()
+
+    def __str__(self) -> str:
+        text = json.dumps(self.value, separators=(",", ":"), default=str)
+        if len(text) > self.max_chars:
+            return f"{text[:self.max_chars]}...[truncated {len(text) - self.max_chars} chars]"
+        return text
+
+
+def body_max_chars() -> int:
+    return int(os.getenv("LOG_BODY_MAX_CHARS", DEFAULT_BODY_MAX_CHARS))
+
+
+def should_log_body(logger: logging.Logger) -> bool:
+    """Whether to log a request/response body: debug must be on and the sample must hit.
+
+    LOG_BODY_SAMPLE_RATE (0.0-1.0, default 1.0) keeps only a fraction of bodies.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return False
+    rate = float(os.getenv("LOG_BODY_SAMPLE_RATE", "1.0"))
+    return rate >= 1.0 or random.random() < rate
+
+
+def redact_headers(headers: Any) -> dict:
+    """Copy headers with credentials removed."""
+    return {
+        key: "[REDACTED]" if key.lower() in ("authorization", "cookie", "set-cookie") else value
+        for key, value in dict(headers).items()
+    }
@@ -0,0 +1,310 @@
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from clickup import AsyncClickUpClient
+from log_config import get_logger
+
+logger = get_logger("mirror")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS spaces (
+    id TEXT PRIMARY KEY,
+    team_id TEXT NOT NULL,
+    name TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_spaces_team ON spaces(team_id);
+
+CREATE TABLE IF NOT EXISTS lists (
+    id TEXT PRIMARY KEY,
+    space_id TEXT NOT NULL,
+    name TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_lists_space ON lists(space_id);
+
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    list_id TEXT NOT NULL,
+    space_id TEXT,
+    name TEXT,
+    status TEXT,
+    closed INTEGER NOT NULL DEFAULT 0,
+    date_updated INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_list_updated ON tasks(list_id, date_updated);
+CREATE INDEX IF NOT EXISTS idx_tasks_space ON tasks(space_id);
+
+-- One row per synced scope ("spaces:<team>", "lists:<space>", "tasks:<list>").
+-- high_water_mark is the largest date_updated seen for a list's tasks.
+CREATE TABLE IF NOT EXISTS sync_state (
+    scope TEXT PRIMARY KEY,
+    high_water_mark INTEGER NOT NULL DEFAULT 0,
+    synced_at REAL NOT NULL
+);
+"""
+
+
+def _task_row(task: Dict[str, Any], list_id: Optional[str] = None) -> tuple:
+    status = task.get("status") or {}
+    return (
+        task["id"],
+        (task.get("list") or {}).get("id") or list_id,
+        (task.get("space") or {}).get("id"),
+        task.get("name"),
+        status.get("status"),
+        1 if status.get("type") == "closed" else 0,
+        int(task.get("date_updated") or 0),
+        json.dumps(task),
+    )
+
+
+class ClickUpMirror:
+    """Local SQLite mirror of ClickUp spaces, lists and tasks.
+
+    Tasks are synced incrementally per list with ClickUp's ``date_updated_gt``
+    filter against a stored high-water mark, so a re-sync only costs the
+    changed tasks. Every synced scope records when it was last synced so
+    readers can apply a freshness bound. Deleted tasks are not reported by
+    the delta query and have to be removed with ``delete_task``.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("MIRROR_DB_PATH", "clickup_mirror.db")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # Sync state
+
+    def _sync_state(self, scope: str) -> Optional[tuple]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT high_water_mark, synced_at FROM sync_state WHERE scope = ?", (scope,)
+            ).fetchone()
+
+    def _mark_synced(self, scope: str, high_water_mark: int = 0) -> None:
+        self._conn.execute(
+            "INSERT INTO sync_state (scope, high_water_mark, synced_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(scope) DO UPDATE SET "
+            "high_water_mark = MAX(high_water_mark, excluded.high_water_mark), synced_at = excluded.synced_at",
+            (scope, high_water_mark, time.time()),
+        )
+
+    def is_fresh(self, scope: str, max_age: float) -> bool:
+        """Whether a scope was synced within the last ``max_age`` seconds."""
+        state = self._sync_state(scope)
+        return state is not None and time.time() - state[1] <= max_age
+
+    # Writes
+
+    def store_spaces(self, team_id: str, spaces: Dict[str, Any]) -> None:
+        """Upsert the spaces of a list_spaces response.
+
+        Each session sees only some of a team's spaces, so one session's
+        sync never removes rows another session relies on; readers filter
+        by the spaces they can see instead.
+        """
+        items = spaces.get("spaces", [])
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO spaces (id, team_id, name, data) VALUES (?, ?, ?, ?)",
+                [(space["id"], team_id, space.get("name"), json.dumps(space)) for space in items],
+            )
+            self._mark_synced(f"spaces:{team_id}")
+
+    def store_lists(self, space_id: str, lists: Dict[str, Any]) -> None:
+        """Replace the mirrored lists of a space with a list_lists response."""
+        items = lists.get("lists", [])
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM lists WHERE space_id = ?", (space_id,))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO lists (id, space_id, name, data) VALUES (?, ?, ?, ?)",
+                [(item["id"], space_id, item.get("name"), json.dumps(item)) for item in items],
+            )
+            self._mark_synced(f"lists:{space_id}")
+
+    def upsert_tasks(self, tasks: Iterable[Dict[str, Any]], list_id: Optional[str] = None) -> int:
+        """Insert or update tasks. Returns the largest date_updated written.
+
+        ``list_id`` is used for tasks that don't carry their own list.
+        """
+        rows = [row for row in (_task_row(task, list_id) for task in tasks if task.get("id")) if row[1]]
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO tasks "
+                "(id, list_id, space_id, name, status, closed, date_updated, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return max(row[6] for row in rows)
+
+    def delete_task(self, task_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+
+    def mark_list_synced(self, list_id: str, high_water_mark: int) -> None:
+        with self._lock, self._conn:
+            self._mark_synced(f"tasks:{list_id}", high_water_mark)
+
+    def mark_list_prefetched(self, list_id: str) -> None:
+        with self._lock, self._conn:
+            self._mark_synced(f"tasks_partial:{list_id}")
+
+    def invalidate(self, scope: str) -> None:
+        """Force the next read of a scope to re-sync, keeping its high-water mark."""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE sync_state SET synced_at = 0 WHERE scope = ?", (scope,))
+
+    def invalidate_task(self, task_id: str, list_id: Optional[str] = None) -> Optional[str]:
+        """Force a re-sync of the list holding a task, without fetching the task.
+
+        The list is looked up in the mirror unless given. Returns its ID, or
+        None if the task isn't mirrored.
+        """
+        with self._lock, self._conn:
+            if list_id is None:
+                row = self._conn.execute("SELECT list_id FROM tasks WHERE id = ?", (task_id,)).fetchone()
+                list_id = row[0] if row else None
+            if list_id is not None:
+                self._conn.execute("UPDATE sync_state SET synced_at = 0 WHERE scope IN (?, ?)",
+                                   (f"tasks:{list_id}", f"tasks_partial:{list_id}"))
+        return list_id
+
+    def invalidate_list(self, list_id: str) -> None:
+        """Force a re-sync of a list's tasks and of the lists of its space.
+
+        If the list isn't mirrored yet (e.g. it was just created) every
+        space's lists are invalidated.
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT space_id FROM lists WHERE id = ?", (list_id,)).fetchone()
+            self._conn.execute("UPDATE sync_state SET synced_at = 0 WHERE scope IN (?, ?)",
+                               (f"tasks:{list_id}", f"tasks_partial:{list_id}"))
+            if row:
+                self._conn.execute("UPDATE sync_state SET synced_at = 0 WHERE scope = ?", (f"lists:{row[0]}",))
+            else:
+                self._conn.execute("UPDATE sync_state SET synced_at = 0 WHERE scope LIKE 'lists:%'")
+
+    # Reads
+
+    def get_spaces(self, team_id: str, max_age: float,
+                   space_ids: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """Mirrored spaces for a team in list_spaces shape, or None if stale.
+
+        ``space_ids`` restricts the result to the spaces a caller can see.
+        """
+        if not self.is_fresh(f"spaces:{team_id}", max_age):
+            return None
+        query = "SELECT data FROM spaces WHERE team_id = ?"
+        params: List[Any] = [team_id]
+        if space_ids is not None:
+            query += f" AND id IN ({', '.join('?' * len(space_ids))})"
+            params.extend(space_ids)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY rowid", params).fetchall()
+        return {"spaces": [json.loads(row[0]) for row in rows]}
+
+    def get_lists(self, space_id: str, max_age: float) -> Optional[Dict[str, Any]]:
+        """Mirrored lists for a space in list_lists shape, or None if stale."""
+        if not self.is_fresh(f"lists:{space_id}", max_age):
+            return None
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM lists WHERE space_id = ? ORDER BY rowid", (space_id,)
+            ).fetchall()
+        return {"lists": [json.loads(row[0]) for row in rows]}
+
+    def get_tasks(self, list_id: str, max_age: float, include_closed: bool = False,
+                  space_ids: Optional[List[str]] = None, partial: bool = False) -> Optional[Dict[str, Any]]:
+        """Mirrored tasks for a list in list_tasks shape, or None if stale.
+
+        Closed tasks are left out by default, matching ClickUp's own default.
+        ``space_ids`` restricts the result to the spaces a caller can see.
+        With ``partial``, a list that only had its first page prefetched
+        also counts as fresh; the most recently updated tasks come first, so
+        the head of the result is complete but the tail may not be.
+        """
+        fresh = self.is_fresh(f"tasks:{list_id}", max_age)
+        if not fresh and partial:
+            fresh = self.is_fresh(f"tasks_partial:{list_id}", max_age)
+        if not fresh:
+            return None
+        query = "SELECT data FROM tasks WHERE list_id = ?"
+        params: List[Any] = [list_id]
+        if not include_closed:
+            query += " AND closed = 0"
+        if space_ids is not None:
+            query += f" AND space_id IN ({', '.join('?' * len(space_ids))})"
+            params.extend(space_ids)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY date_updated DESC", params).fetchall()
+        return {"tasks": [json.loads(row[0]) for row in rows]}
+
+    # Sync
+
+    async def sync_spaces(self, client: AsyncClickUpClient) -> Dict[str, Any]:
+        """Mirror the client's spaces."""
+        team_id = await client.get_team_id()
+        spaces = await client.list_spaces(refresh=True)
+        await asyncio.to_thread(self.store_spaces, team_id, spaces)
+        return spaces
+
+    async def sync_lists(self, client: AsyncClickUpClient, space_id: str) -> Dict[str, Any]:
+        """Mirror the lists of a space."""
+        lists = await client.list_lists(space_id, refresh=True)
+        await asyncio.to_thread(self.store_lists, space_id, lists)
+        return lists
+
+    async def sync_hierarchy(self, client: AsyncClickUpClient) -> None:
+        """Mirror all spaces and their lists."""
+        spaces = await self.sync_spaces(client)
+        await asyncio.gather(*(self.sync_lists(client, space["id"]) for space in spaces.get("spaces", [])))
+
+    async def sync_list(self, client: AsyncClickUpClient, list_id: str) -> int:
+        """Fetch tasks updated since the list's high-water mark and mirror them.
+
+        Returns the number of tasks written.
+        """
+        state = self._sync_state(f"tasks:{list_id}")
+        high_water_mark = state[0] if state else 0
+        params = {"include_closed": "true"}
+        if high_water_mark:
+            params["date_updated_gt"] = high_water_mark
+
+        written = 0
+        async for page in client.iter_task_pages(list_id, **params):
+            newest = await asyncio.to_thread(self.upsert_tasks, page, list_id)
+            high_water_mark = max(high_water_mark, newest)
+            written += len(page)
+        await asyncio.to_thread(self.mark_list_synced, list_id, high_water_mark)
+        logger.debug("Mirrored %s changed tasks for list %s", written, list_id)
+        return written
+
+    async def prefetch_list(self, client: AsyncClickUpClient, list_id: str) -> int:
+        """Mirror the first page of a list's open tasks, most recently updated first.
+
+        Only the list's partial scope is marked synced, so full reads still
+        run ``sync_list``, and the high-water mark is left alone. Returns the
+        number of tasks written.
+        """
+        page = (await client.list_tasks(list_id, page=0, order_by="updated")).get("tasks", [])
+        await asyncio.to_thread(self.upsert_tasks, page, list_id)
+        await asyncio.to_thread(self.mark_list_prefetched, list_id)
+        logger.debug("Prefetched %s tasks for list %s", len(page), list_id)
+        return len(page)
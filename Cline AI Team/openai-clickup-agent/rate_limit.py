@@ -0,0 +1,303 @@
+import os
+import time
+import random
+import asyncio
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Optional, Mapping, Tuple, TypeVar
+
+from state_backend import StateBackend
+
+T = TypeVar("T")
+
+# ClickUp allows 100 requests per minute per token on the base plans
+DEFAULT_RATE_PER_MINUTE = 100
+
+# Statuses worth retrying. 429 means the request was rejected before it ran,
+# so it is safe to retry for any method; 5xx only for idempotent methods.
+RETRYABLE_SERVER_STATUSES = {500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE", "OPTIONS"}
+
+
+class RateLimiter:
+    """Token bucket scheduler for requests made with one ClickUp access token.
+
+    The bucket refills at the token's per-minute quota and is corrected from
+    ClickUp's X-RateLimit-* response headers, so calls are paced up to the
+    quota rather than failing with 429s. Retries of 429/5xx responses use
+    jittered exponential backoff.
+    """
+
+    def __init__(self, rate_per_minute: Optional[int] = None, max_retries: Optional[int] = None,
+                 base_delay: Optional[float] = None, max_delay: Optional[float] = None):
+        self.rate_per_minute = rate_per_minute or int(os.getenv("CLICKUP_RATE_LIMIT_PER_MINUTE", DEFAULT_RATE_PER_MINUTE))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("CLICKUP_MAX_RETRIES", "3"))
+        self.base_delay = base_delay if base_delay is not None else float(os.getenv("CLICKUP_RETRY_BASE_DELAY", "0.5"))
+        self.max_delay = max_delay if max_delay is not None else float(os.getenv("CLICKUP_RETRY_MAX_DELAY", "30"))
+
+        self._lock = threading.Lock()
+        self._state = self._new_state()
+        self.stats: Dict[str, float] = {
+            "requests": 0,
+            "throttled": 0,
+            "throttle_wait_seconds": 0.0,
+            "retried": 0,
+            "rate_limited": 0,
+            "server_errors": 0,
+        }
+
+    # Bucket state is a dict so SharedRateLimiter can keep it in a StateBackend
+
+    def _now(self) -> float:
+        return time.monotonic()
+
+    def _new_state(self) -> Dict[str, float]:
+        return {"rate_per_minute": self.rate_per_minute, "tokens": float(self.rate_per_minute),
+                "updated_at": self._now(), "paused_until": 0.0}
+
+    def _transact(self, fn: Callable[[Dict[str, float]], T]) -> T:
+        """Apply ``fn`` to the bucket state atomically and return its result."""
+        with self._lock:
+            return fn(self._state)
+
+    async def _transact_async(self, fn: Callable[[Dict[str, float]], T]) -> T:
+        """``_transact`` for async callers; the in-process bucket is quick enough to run inline."""
+        return self._transact(fn)
+
+    def _load(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._state)
+
+    @staticmethod
+    def _refill(state: Dict[str, float], now: float) -> None:
+        elapsed = max(0.0, now - state["updated_at"])
+        rate = state["rate_per_minute"]
+        state["tokens"] = min(float(rate), state["tokens"] + elapsed * rate / 60.0)
+        state["updated_at"] = now
+
+    def _take(self, state: Dict[str, float]) -> float:
+        now = self._now()
+        self._refill(state, now)
+        state["tokens"] -= 1
+        delay = 0.0 if state["tokens"] >= 0 else -state["tokens"] * 60.0 / state["rate_per_minute"]
+        return max(delay, state["paused_until"] - now)
+
+    def _count_request(self, delay: float) -> float:
+        self.stats["requests"] += 1
+        if delay > 0:
+            self.stats["throttled"] += 1
+            self.stats["throttle_wait_seconds"] += delay
+        return delay
+
+    def reserve(self) -> float:
+        """Take a token and return how long the caller must wait before sending.
+
+        Tokens may go negative so that concurrent callers queue up in order
+        instead of all waking at the same moment.
+        """
+        return self._count_request(self._transact(self._take))
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent (async)."""
+        delay = self._count_request(await self._transact_async(self._take))
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def acquire_sync(self) -> None:
+        """Wait until a request may be sent (blocking)."""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        """Hold all requests for this token for the given number of seconds."""
+        self._transact(lambda state: self._hold(state, seconds))
+
+    def _hold(self, state: Dict[str, float], seconds: float) -> None:
+        state["paused_until"] = max(state["paused_until"], self._now() + seconds)
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Sync the bucket with ClickUp's X-RateLimit-Limit/Remaining/Reset headers."""
+        update = self._header_update(headers)
+        if update is not None:
+            self._transact(update)
+
+    async def record_response(self, method: str, status_code: int, headers: Mapping[str, str],
+                              attempt: int) -> Optional[float]:
+        """Apply a response to the bucket and decide whether to retry it (async).
+
+        The header sync and any 429 pause are applied in one transaction.
+        Returns the wait before retrying, or None if the response is final.
+        """
+        update = self._header_update(headers)
+        delay = None
+        if self.should_retry(method, status_code, attempt):
+            delay = self._retry_wait(attempt, status_code, headers)
+        pause = delay if status_code == 429 else None
+        if update is not None or pause is not None:
+            def apply(state: Dict[str, float]) -> None:
+                if update is not None:
+                    update(state)
+                if pause is not None:
+                    self._hold(state, pause)
+
+            await self._transact_async(apply)
+        return delay
+
+    def _header_update(self, headers: Mapping[str, str]) -> Optional[Callable[[Dict[str, float]], None]]:
+        """The bucket change described by a response's rate-limit headers, if any."""
+        limit = _header_int(headers, "x-ratelimit-limit")
+        remaining = _header_int(headers, "x-ratelimit-remaining")
+        reset_in = _reset_seconds(headers)
+        if not limit and remaining is None:
+            return None
+
+        def apply(state: Dict[str, float]) -> None:
+            now = self._now()
+            if limit:
+                state["rate_per_minute"] = limit
+            if remaining is not None:
+                self._refill(state, now)
+                state["tokens"] = min(state["tokens"], float(remaining))
+            if remaining == 0 and reset_in:
+                state["paused_until"] = max(state["paused_until"], now + reset_in)
+
+        if limit:
+            self.rate_per_minute = limit
+        return apply
+
+    def should_retry(self, method: str, status_code: int, attempt: int) -> bool:
+        """Whether a response with this status should be retried."""
+        if attempt >= self.max_retries:
+            return False
+        if status_code == 429:
+            return True
+        return status_code in RETRYABLE_SERVER_STATUSES and method.upper() in IDEMPOTENT_METHODS
+
+    def retry_delay(self, attempt: int, status_code: int, headers: Mapping[str, str]) -> float:
+        """Compute the wait before retrying and record the retry.
+
+        Rate-limited responses wait for the quota reset (or Retry-After) plus
+        jitter and pause every caller sharing the token. Other failures use
+        full-jitter exponential backoff.
+        """
+        delay = self._retry_wait(attempt, status_code, headers)
+        if status_code == 429:
+            self.pause(delay)
+        return delay
+
+    def _retry_wait(self, attempt: int, status_code: int, headers: Mapping[str, str]) -> float:
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        self.stats["retried"] += 1
+        if status_code == 429:
+            self.stats["rate_limited"] += 1
+            wait = _reset_seconds(headers) or _header_float(headers, "retry-after")
+            return min(self.max_delay, wait + random.uniform(0, self.base_delay)) if wait else backoff
+        self.stats["server_errors"] += 1
+        return backoff
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return a copy of the counters plus the current bucket state."""
+        state = self._load()
+        self._refill(state, self._now())
+        return {
+            **self.stats,
+            "rate_per_minute": state["rate_per_minute"],
+            "available_tokens": round(max(state["tokens"], 0.0), 2),
+        }
+
+
+class SharedRateLimiter(RateLimiter):
+    """RateLimiter whose bucket and pause live in a shared StateBackend.
+
+    Every worker process using the same token draws from one bucket, so
+    together they pace to the quota instead of each pacing to all of it.
+    Counters in ``stats`` stay per process.
+    """
+
+    NAMESPACE = "rate_limit"
+    # Idle buckets refill completely within a minute, so they needn't outlive that by much
+    STATE_TTL = 600
+
+    def __init__(self, backend: StateBackend, key: str, **kwargs: Any):
+        self.backend = backend
+        self.key = key
+        super().__init__(**kwargs)
+
+    def _now(self) -> float:
+        # Monotonic clocks aren't comparable between processes
+        return time.time()
+
+    def _transact(self, fn: Callable[[Dict[str, float]], T]) -> T:
+        def apply(state: Optional[Dict[str, float]]) -> Tuple[Dict[str, float], T]:
+            state = state or self._new_state()
+            return state, fn(state)
+
+        return self.backend.update(self.NAMESPACE, self.key, apply, ttl=self.STATE_TTL)
+
+    async def _transact_async(self, fn: Callable[[Dict[str, float]], T]) -> T:
+        # The transaction can wait on another process's write lock; keep it off the event loop
+        return await asyncio.to_thread(self._transact, fn)
+
+    def _load(self) -> Dict[str, float]:
+        return self.backend.get(self.NAMESPACE, self.key) or self._new_state()
+
+
+def _header_float(headers: Mapping[str, str], name: str) -> Optional[float]:
+    value = headers.get(name)
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _header_int(headers: Mapping[str, str], name: str) -> Optional[int]:
+    value = _header_float(headers, name)
+    return int(value) if value is not None else None
+
+
+def _reset_seconds(headers: Mapping[str, str]) -> Optional[float]:
+    """Seconds until the quota resets, from the Unix timestamp in X-RateLimit-Reset."""
+    reset_at = _header_float(headers, "x-ratelimit-reset")
+    if reset_at is None:
+        return None
+    return max(reset_at - time.time(), 0.0)
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+_backend: Optional[StateBackend] = None
+
+
+def set_rate_limit_backend(backend: StateBackend) -> None:
+    """Keep rate limiter buckets in ``backend`` when it is shared between workers."""
+    global _backend
+    with _limiters_lock:
+        _backend = backend if backend.shared else None
+        _limiters.clear()
+
+
+def get_rate_limiter(access_token: str) -> RateLimiter:
+    """Get the shared rate limiter for an access token.
+
+    Every client using the same token shares one bucket, since ClickUp
+    enforces the quota per token. With a shared backend (see
+    set_rate_limit_backend) so does every worker process.
+    """
+    key = hashlib.sha256(access_token.encode()).hexdigest()
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            if _backend is not None:
+                limiter = SharedRateLimiter(_backend, key)
+            else:
+                limiter = RateLimiter()
+            _limiters[key] = limiter
+        return limiter
+
+
+def rate_limit_stats() -> Dict[str, Dict[str, float]]:
+    """Counters for every token, keyed by a short token fingerprint."""
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {key[:12]: limiter.snapshot() for key, limiter in limiters.items()}
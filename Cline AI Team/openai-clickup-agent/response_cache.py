@@ -0,0 +1,139 @@
+import os
+import re
+import time
+import hashlib
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+from log_config import get_logger
+
+logger = get_logger("response_cache")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    prompt_hash TEXT NOT NULL,
+    model TEXT NOT NULL,
+    message TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used);
+"""
+
+# A hit only rewrites last_used once it is older than this, so hot entries
+# don't cost a write on every lookup
+TOUCH_INTERVAL = 60.0
+
+_SPACE = re.compile(r"\s+")
+
+
+def normalize_message(message: str) -> str:
+    """Case-fold and collapse whitespace so trivially different messages share an entry."""
+    return _SPACE.sub(" ", message).strip().casefold()
+
+
+class ResponseCache:
+    """SQLite cache of assistant responses.
+
+    Entries are keyed on the normalized message, a hash of the system prompt
+    and the model name, so changing either makes old entries unreachable;
+    they are also purged on startup. Entries expire after ``ttl`` seconds
+    and the least recently used are evicted beyond ``max_entries``.
+    """
+
+    def __init__(self, prompt: str, model: str, path: Optional[str] = None,
+                 ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        self.path = path or os.getenv("RESPONSE_CACHE_DB_PATH", "clickup_responses.db")
+        self.ttl = ttl if ttl is not None else float(os.getenv("RESPONSE_CACHE_TTL", "86400"))
+        self.max_entries = max_entries or int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "10000"))
+        self.model = model
+        self.prompt_hash = hashlib.sha256(prompt.encode()).hexdigest()[:16]
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evicted": 0}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        with self._conn:
+            purged = self._conn.execute(
+                "DELETE FROM responses WHERE prompt_hash != ? OR model != ?", (self.prompt_hash, self.model)
+            ).rowcount
+        if purged:
+            logger.info("Purged %s cached responses for an old prompt or model", purged)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _key(self, message: str) -> str:
+        return hashlib.sha256(f"{self.prompt_hash}\0{self.model}\0{message}".encode()).hexdigest()
+
+    def get(self, message: str) -> Optional[str]:
+        """The cached response for a message, if present and not expired."""
+        normalized = normalize_message(message)
+        key = self._key(normalized)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at, last_used FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (self.ttl > 0 and now - row[1] >= self.ttl):
+                self.stats["misses"] += 1
+                return None
+            if now - row[2] >= TOUCH_INTERVAL:
+                with self._conn:
+                    self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self.stats["hits"] += 1
+            return row[0]
+
+    def set(self, message: str, response: str) -> None:
+        normalized = normalize_message(message)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, prompt_hash, model, message, response, created_at, last_used) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self._key(normalized), self.prompt_hash, self.model, normalized, response, now, now),
+            )
+            self.stats["stores"] += 1
+            excess = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+                    (excess,),
+                )
+                self.stats["evicted"] += excess
+
+    def clear(self) -> int:
+        """Drop every entry. Returns the number removed."""
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM responses").rowcount
+
+    def entries(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """The most recently used entries."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT message, response, created_at, last_used FROM responses ORDER BY last_used DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [
+            {"message": row[0], "response": row[1], "created_at": row[2], "last_used": row[3]}
+            for row in rows
+        ]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "entries": count,
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "model": self.model,
+            "prompt_hash": self.prompt_hash,
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,78 @@
+"""Replay recorded ClickUp webhook payloads against a running agent.
+
+Payloads are read from JSON files (one object or an array) or NDJSON files
+(one object per line), signed with the webhook secret exactly as ClickUp
+signs them, and POSTed to the receiver in order. Use it to exercise
+/webhooks/clickup offline:
+
+    python scripts/replay_webhooks.py scripts/sample_webhooks.ndjson \\
+        --url http://127.0.0.1:8000/webhooks/clickup --secret "$CLICKUP_WEBHOOK_SECRET"
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from typing import Any, Dict, Iterator
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from webhooks import sign_payload
+
+
+def load_payloads(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield webhook payloads from a JSON or NDJSON file."""
+    with open(path, "r") as f:
+        text = f.read()
+    try:
+        data = json.loads(text)
+    except ValueError:
+        for line in text.splitlines():
+            if line.strip():
+                yield json.loads(line)
+        return
+    if isinstance(data, list):
+        yield from data
+    else:
+        yield data
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay recorded ClickUp webhook payloads.")
+    parser.add_argument("files", nargs="+", help="JSON or NDJSON files with recorded payloads")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/webhooks/clickup")
+    parser.add_argument("--secret", default=os.getenv("CLICKUP_WEBHOOK_SECRET"),
+                        help="webhook signing secret (default: $CLICKUP_WEBHOOK_SECRET)")
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds to wait between events")
+    parser.add_argument("--bad-signature", action="store_true",
+                        help="send an invalid signature to check that events are rejected")
+    args = parser.parse_args()
+
+    if not args.secret:
+        parser.error("a webhook secret is required (--secret or CLICKUP_WEBHOOK_SECRET)")
+
+    failures = 0
+    with httpx.Client(timeout=10.0) as client:
+        for path in args.files:
+            for payload in load_payloads(path):
+                body = json.dumps(payload).encode()
+                signature = "0" * 64 if args.bad_signature else sign_payload(body, args.secret)
+                response = client.post(
+                    args.url,
+                    content=body,
+                    headers={"Content-Type": "application/json", "X-Signature": signature},
+                )
+                ok = response.status_code < 300
+                failures += 0 if ok else 1
+                print(f"{payload.get('event', '?'):<12} {payload.get('task_id') or payload.get('list_id') or '':<16} "
+                      f"-> {response.status_code} {response.text[:120]}")
+                if args.delay:
+                    time.sleep(args.delay)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
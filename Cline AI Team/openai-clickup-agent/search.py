@@ -0,0 +1,207 @@
+import os
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from log_config import get_logger
+
+logger = get_logger("search")
+
+# External-content FTS5 index: task_docs holds the indexed text plus filter
+# columns, and triggers keep task_fts in step with it.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS task_docs (
+    rowid INTEGER PRIMARY KEY,
+    task_id TEXT NOT NULL UNIQUE,
+    space_id TEXT,
+    list_id TEXT,
+    status TEXT,
+    url TEXT,
+    name TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    custom_fields TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_task_docs_space ON task_docs(space_id);
+CREATE INDEX IF NOT EXISTS idx_task_docs_list ON task_docs(list_id);
+CREATE INDEX IF NOT EXISTS idx_task_docs_status ON task_docs(status);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5(
+    name, description, custom_fields,
+    content='task_docs', content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS task_docs_ai AFTER INSERT ON task_docs BEGIN
+    INSERT INTO task_fts(rowid, name, description, custom_fields)
+    VALUES (new.rowid, new.name, new.description, new.custom_fields);
+END;
+CREATE TRIGGER IF NOT EXISTS task_docs_ad AFTER DELETE ON task_docs BEGIN
+    INSERT INTO task_fts(task_fts, rowid, name, description, custom_fields)
+    VALUES ('delete', old.rowid, old.name, old.description, old.custom_fields);
+END;
+CREATE TRIGGER IF NOT EXISTS task_docs_au AFTER UPDATE ON task_docs BEGIN
+    INSERT INTO task_fts(task_fts, rowid, name, description, custom_fields)
+    VALUES ('delete', old.rowid, old.name, old.description, old.custom_fields);
+    INSERT INTO task_fts(rowid, name, description, custom_fields)
+    VALUES (new.rowid, new.name, new.description, new.custom_fields);
+END;
+"""
+
+# bm25 column weights: a hit in the name counts most, then the description
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 2.0
+CUSTOM_FIELDS_WEIGHT = 1.0
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def _custom_field_text(fields: Optional[List[Dict[str, Any]]]) -> str:
+    """Flatten custom field names and values into searchable text."""
+    parts = []
+    for field in fields or []:
+        value = field.get("value")
+        if value is None or value == "":
+            continue
+        options = (field.get("type_config") or {}).get("options") or []
+        if options and isinstance(value, (int, str)):
+            # Dropdowns store the option's orderindex or id; index its label
+            for option in options:
+                if value in (option.get("orderindex"), option.get("id")):
+                    value = option.get("name") or option.get("label") or value
+                    break
+        if isinstance(value, list):
+            value = " ".join(
+                str(item.get("name") or item.get("label") or item.get("username") or "")
+                if isinstance(item, dict) else str(item)
+                for item in value
+            )
+        elif isinstance(value, dict):
+            value = " ".join(str(item) for item in value.values() if isinstance(item, (str, int, float)))
+        parts.append(f"{field.get('name', '')} {value}")
+    return "\n".join(parts)
+
+
+def _match_expression(query: str) -> Optional[str]:
+    """Turn free text into a safe FTS5 query: every word must match, the last as a prefix."""
+    words = _WORD.findall(query)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+class TaskSearchIndex:
+    """Full-text index over task names, descriptions and custom field values.
+
+    Backed by SQLite FTS5 with bm25 ranking. Tasks are added as they are
+    fetched from ClickUp, so the index covers every task the service has
+    seen, and results can be filtered by space, list and status.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("SEARCH_DB_PATH", "clickup_search.db")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def upsert_tasks(self, tasks: Iterable[Dict[str, Any]]) -> int:
+        """Index or re-index tasks. Returns the number written."""
+        rows = []
+        for task in tasks:
+            if not task.get("id"):
+                continue
+            rows.append((
+                task["id"],
+                (task.get("space") or {}).get("id"),
+                (task.get("list") or {}).get("id"),
+                (task.get("status") or {}).get("status"),
+                task.get("url"),
+                task.get("name") or "",
+                task.get("text_content") or task.get("description") or "",
+                _custom_field_text(task.get("custom_fields")),
+            ))
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO task_docs "
+                "(task_id, space_id, list_id, status, url, name, description, custom_fields) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(task_id) DO UPDATE SET "
+                "space_id = COALESCE(excluded.space_id, space_id), "
+                "list_id = COALESCE(excluded.list_id, list_id), "
+                "status = COALESCE(excluded.status, status), "
+                "url = COALESCE(excluded.url, url), "
+                "name = excluded.name, description = excluded.description, "
+                "custom_fields = excluded.custom_fields",
+                rows,
+            )
+        return len(rows)
+
+    def delete_task(self, task_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM task_docs WHERE task_id = ?", (task_id,))
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM task_docs").fetchone()[0]
+
+    def search(self, query: str, space_id: Optional[str] = None, list_id: Optional[str] = None,
+               status: Optional[str] = None, limit: int = 20,
+               space_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Rank tasks matching every word of ``query`` (the last word as a prefix).
+
+        ``space_ids`` restricts results to the spaces a caller can see.
+        """
+        expression = _match_expression(query)
+        if not expression:
+            return []
+
+        sql = (
+            "SELECT d.task_id, d.name, d.status, d.list_id, d.space_id, d.url, "
+            "bm25(task_fts, ?, ?, ?) AS score, "
+            "snippet(task_fts, -1, '[', ']', '...', 12) "
+            "FROM task_fts JOIN task_docs d ON d.rowid = task_fts.rowid "
+            "WHERE task_fts MATCH ?"
+        )
+        params: List[Any] = [NAME_WEIGHT, DESCRIPTION_WEIGHT, CUSTOM_FIELDS_WEIGHT, expression]
+        if space_id:
+            sql += " AND d.space_id = ?"
+            params.append(space_id)
+        if list_id:
+            sql += " AND d.list_id = ?"
+            params.append(list_id)
+        if status:
+            sql += " AND d.status = ? COLLATE NOCASE"
+            params.append(status)
+        if space_ids is not None:
+            sql += f" AND d.space_id IN ({', '.join('?' * len(space_ids))})"
+            params.extend(space_ids)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            {
+                "id": row[0],
+                "name": row[1],
+                "status": row[2],
+                "list_id": row[3],
+                "space_id": row[4],
+                "url": row[5],
+                # bm25 is lower-is-better; flip it so higher means more relevant
+                "score": round(-row[6], 4),
+                "snippet": row[7],
+            }
+            for row in rows
+        ]
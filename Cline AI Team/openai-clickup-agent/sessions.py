@@ -0,0 +1,267 @@
+import os
+import hmac
+import time
+import base64
+import asyncio
+import hashlib
+import secrets
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from clickup import AsyncClickUpClient, HierarchyCache, SharedHierarchyCache, create_http_client
+from state_backend import StateBackend
+from log_config import get_logger
+
+logger = get_logger("sessions")
+
+SESSION_COOKIE = "clickup_session"
+# Session used for requests without a cookie (the token stored outside any session)
+DEFAULT_SESSION_ID = "default"
+
+# Rough fixed cost of a session (client, pool bookkeeping, TLS buffers) on top of its caches
+SESSION_OVERHEAD_BYTES = 64 * 1024
+
+
+def new_session_id() -> str:
+    return secrets.token_urlsafe(24)
+
+
+def sign_session_id(session_id: str, secret: str) -> str:
+    """Build a cookie value of the form ``<session id>.<HMAC-SHA256 signature>``."""
+    digest = hmac.new(secret.encode(), session_id.encode(), hashlib.sha256).digest()
+    return f"{session_id}.{base64.urlsafe_b64encode(digest).decode().rstrip('=')}"
+
+
+def unsign_session_id(cookie: Optional[str], secret: str) -> Optional[str]:
+    """Get the session ID from a signed cookie value, or None if it was tampered with."""
+    if not cookie or "." not in cookie:
+        return None
+    session_id = cookie.rsplit(".", 1)[0]
+    if not hmac.compare_digest(sign_session_id(session_id, secret), cookie):
+        return None
+    return session_id
+
+
+class Session:
+    __slots__ = ("session_id", "client", "created_at", "last_used", "validated_at", "leases", "retired")
+
+    def __init__(self, session_id: str, client: AsyncClickUpClient):
+        self.session_id = session_id
+        self.client = client
+        self.created_at = self.last_used = self.validated_at = time.monotonic()
+        # Requests and jobs currently using the client
+        self.leases = 0
+        # Removed from the registry; the client closes when the last lease ends
+        self.retired = False
+
+    def size_bytes(self) -> int:
+        return SESSION_OVERHEAD_BYTES + self.client.cache.size_bytes
+
+
+class SessionRegistry:
+    """Per-user ClickUp clients keyed by session ID.
+
+    Each session owns an AsyncClickUpClient with its own connection pool,
+    cached team ID and hierarchy cache. Sessions are kept in LRU order and
+    evicted when idle for longer than ``idle_timeout``, when there are more
+    than ``max_sessions``, or when their estimated memory exceeds
+    ``max_memory_bytes``. An evicted session's token stays in storage, so its
+    client is rebuilt through ``token_loader`` on the next request.
+
+    With a shared ``backend`` the hierarchy caches live there, and every
+    ``revalidate_interval`` seconds a live session's token is re-read so a
+    logout handled by another worker takes effect here too.
+
+    Work that uses a client across awaits holds a ``lease``. A session that
+    is evicted, replaced or removed leaves the registry at once, but its
+    client is closed only when its last lease ends, and a leased session is
+    never considered idle.
+    """
+
+    def __init__(self, token_loader: Callable[[str], Awaitable[Optional[str]]],
+                 backend: Optional[StateBackend] = None,
+                 max_sessions: Optional[int] = None, idle_timeout: Optional[float] = None,
+                 max_memory_mb: Optional[float] = None, pool_size: Optional[int] = None,
+                 revalidate_interval: Optional[float] = None):
+        self.token_loader = token_loader
+        self.backend = backend
+        self.revalidate_interval = revalidate_interval or float(os.getenv("SESSION_REVALIDATE_INTERVAL", "30"))
+        self.max_sessions = max_sessions or int(os.getenv("SESSION_MAX_SESSIONS", "1000"))
+        self.idle_timeout = idle_timeout or float(os.getenv("SESSION_IDLE_TIMEOUT", "1800"))
+        self.max_memory_bytes = int((max_memory_mb or float(os.getenv("SESSION_MAX_MEMORY_MB", "256"))) * 1024 * 1024)
+        self.pool_size = pool_size or int(os.getenv("SESSION_MAX_CONNECTIONS", "10"))
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = asyncio.Lock()
+        self.stats = {"created": 0, "restored": 0, "evicted_idle": 0, "evicted_lru": 0, "evicted_memory": 0}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _build_client(self, access_token: str, team_id: Optional[str] = None) -> AsyncClickUpClient:
+        http_client = create_http_client(
+            max_connections=self.pool_size,
+            max_keepalive_connections=max(1, self.pool_size // 2),
+        )
+        if self.backend is not None and self.backend.shared:
+            owner = hashlib.sha256(access_token.encode()).hexdigest()[:16]
+            cache: HierarchyCache = SharedHierarchyCache(self.backend, owner)
+        else:
+            cache = HierarchyCache()
+        return AsyncClickUpClient(access_token, team_id=team_id, http_client=http_client, cache=cache)
+
+    async def get(self, session_id: str) -> Optional[AsyncClickUpClient]:
+        """Get a session's client, rebuilding it from its stored token if it was evicted.
+
+        The client may be closed once the session is evicted; use ``lease``
+        to keep it open for the duration of a request or job.
+        """
+        session = await self._acquire(session_id)
+        return session.client if session else None
+
+    @asynccontextmanager
+    async def lease(self, session_id: str) -> AsyncIterator[Optional[AsyncClickUpClient]]:
+        """Hold a session's client open until the block exits. Yields None if unauthenticated."""
+        session = await self._acquire(session_id, lease=True)
+        if session is None:
+            yield None
+            return
+        try:
+            yield session.client
+        finally:
+            session.leases -= 1
+            session.last_used = time.monotonic()
+            if session.retired and not session.leases:
+                await session.client.aclose()
+
+    async def _acquire(self, session_id: str, lease: bool = False) -> Optional[Session]:
+        session = self._sessions.get(session_id)
+        if session is None:
+            async with self._lock:
+                session = self._sessions.get(session_id)
+                if session is None:
+                    access_token = await self.token_loader(session_id)
+                    if not access_token:
+                        return None
+                    session = self._add(session_id, self._build_client(access_token))
+                    self.stats["restored"] += 1
+                    logger.debug("Restored ClickUp session %s from storage", session_id[:8])
+        elif time.monotonic() - session.validated_at >= self.revalidate_interval:
+            session = await self._revalidate(session)
+            if session is None:
+                return None
+        session.last_used = time.monotonic()
+        self._sessions.move_to_end(session_id)
+        # Taken before evicting, so the session can't be closed under the caller
+        if lease:
+            session.leases += 1
+        await self._evict()
+        return session
+
+    async def _revalidate(self, session: Session) -> Optional[Session]:
+        """Drop or rebuild a session whose stored token was removed or replaced."""
+        access_token = await self.token_loader(session.session_id)
+        current = self._sessions.get(session.session_id)
+        if current is not session:
+            # Another request revalidated or removed it meanwhile
+            return current
+        if access_token == session.client.access_token:
+            session.validated_at = time.monotonic()
+            return session
+        del self._sessions[session.session_id]
+        await self._retire(session)
+        if not access_token:
+            return None
+        return self._add(session.session_id, self._build_client(access_token, team_id=session.client.team_id))
+
+    async def create(self, session_id: str, access_token: str,
+                     team_id: Optional[str] = None) -> AsyncClickUpClient:
+        """Start a session for a freshly authorized token, replacing any previous one."""
+        client = self._build_client(access_token, team_id=team_id)
+        async with self._lock:
+            previous = self._sessions.pop(session_id, None)
+            self._add(session_id, client)
+            self.stats["created"] += 1
+        if previous is not None:
+            await self._retire(previous)
+        await self._evict()
+        return client
+
+    def _add(self, session_id: str, client: AsyncClickUpClient) -> Session:
+        session = Session(session_id, client)
+        self._sessions[session_id] = session
+        return session
+
+    async def remove(self, session_id: str) -> None:
+        session = self._sessions.pop(session_id, None)
+        if session is not None:
+            await self._retire(session)
+
+    async def _retire(self, session: Session) -> None:
+        """Close a session's client now, or when its last lease ends."""
+        session.retired = True
+        if not session.leases:
+            await session.client.aclose()
+
+    def peek(self, session_id: str) -> Optional[AsyncClickUpClient]:
+        """Get a live session's client without touching its LRU position or storage."""
+        session = self._sessions.get(session_id)
+        return session.client if session else None
+
+    async def invalidate_caches(self, space_id: Optional[str] = None, list_id: Optional[str] = None) -> None:
+        """Invalidate the hierarchy cache of every session."""
+        if self.backend is not None and self.backend.shared:
+            # The shared cache covers every owner and worker, live here or not
+            cache = SharedHierarchyCache(self.backend, owner="")
+            await asyncio.to_thread(cache.invalidate, space_id=space_id, list_id=list_id)
+            return
+        for session in list(self._sessions.values()):
+            await session.client.invalidate_cache(space_id=space_id, list_id=list_id)
+
+    def memory_bytes(self) -> int:
+        return sum(session.size_bytes() for session in self._sessions.values())
+
+    async def _evict(self) -> None:
+        evicted = []
+        now = time.monotonic()
+        # Oldest sessions sit at the front, so idle ones are found without a full scan
+        idle = []
+        for session in self._sessions.values():
+            if session.leases:
+                # In use by a request or job, so not idle
+                session.last_used = now
+                continue
+            if now - session.last_used < self.idle_timeout:
+                break
+            idle.append(session)
+        for session in idle:
+            del self._sessions[session.session_id]
+            evicted.append(session)
+            self.stats["evicted_idle"] += 1
+        while len(self._sessions) > self.max_sessions:
+            evicted.append(self._sessions.popitem(last=False)[1])
+            self.stats["evicted_lru"] += 1
+        # Keep the most recent session even if it alone is over the cap
+        if len(self._sessions) > 1:
+            memory = self.memory_bytes()
+            while len(self._sessions) > 1 and memory > self.max_memory_bytes:
+                session = self._sessions.popitem(last=False)[1]
+                memory -= session.size_bytes()
+                evicted.append(session)
+                self.stats["evicted_memory"] += 1
+        for session in evicted:
+            logger.debug("Evicted ClickUp session %s", session.session_id[:8])
+            await self._retire(session)
+
+    async def close(self) -> None:
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        for session in sessions:
+            await session.client.aclose()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "active": len(self._sessions),
+            "memory_bytes": self.memory_bytes(),
+            **self.stats,
+        }
@@ -0,0 +1,263 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, TypeVar
+
+from log_config import get_logger
+
+logger = get_logger("state_backend")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_kv_expires ON kv(expires_at) WHERE expires_at IS NOT NULL;
+"""
+
+T = TypeVar("T")
+
+# Expired rows are swept after this many writes
+PURGE_EVERY_WRITES = 256
+
+_backend: Optional["StateBackend"] = None
+_backend_lock = threading.Lock()
+
+
+class StateBackend:
+    """Namespaced key-value store for state that workers need to agree on.
+
+    Values are JSON-serializable and may carry a TTL in seconds. ``shared``
+    tells callers whether other processes see the same state.
+    """
+
+    shared = False
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def set_many(self, namespace: str, values: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        """Set several keys of a namespace at once, in a single write."""
+        for key, value in values.items():
+            self.set(namespace, key, value, ttl=ttl)
+
+    def add(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Set a key only if it is absent or expired. Returns whether it was set."""
+        raise NotImplementedError
+
+    def update(self, namespace: str, key: str, fn: Callable[[Optional[Any]], Tuple[Any, T]],
+               ttl: Optional[float] = None) -> T:
+        """Atomically replace a value with ``fn(current)[0]``; returns ``fn(current)[1]``.
+
+        ``current`` is None when the key is absent or expired. No other
+        process or thread can change the key in between.
+        """
+        raise NotImplementedError
+
+    def delete(self, namespace: str, key: str) -> None:
+        raise NotImplementedError
+
+    def items(self, namespace: str) -> Iterator[Tuple[str, Any]]:
+        """Iterate over the live keys and values of a namespace."""
+        raise NotImplementedError
+
+    def clear(self, namespace: str) -> None:
+        raise NotImplementedError
+
+    def get_or_create(self, namespace: str, key: str, factory: Callable[[], Any]) -> Any:
+        """Get a value, creating it once across all processes sharing the backend."""
+        value = self.get(namespace, key)
+        if value is None:
+            self.add(namespace, key, factory())
+            value = self.get(namespace, key)
+        return value
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryBackend(StateBackend):
+    """Process-local backend. State is lost on restart and not seen by other workers."""
+
+    def __init__(self):
+        self._data: Dict[str, Dict[str, tuple]] = {}
+        self._lock = threading.Lock()
+
+    def _live(self, namespace: str, key: str) -> Optional[tuple]:
+        entries = self._data.get(namespace, {})
+        entry = entries.get(key)
+        if entry is not None and entry[0] is not None and time.time() >= entry[0]:
+            entries.pop(key, None)
+            return None
+        return entry
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._live(namespace, key)
+            return entry[1] if entry else None
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._data.setdefault(namespace, {})[key] = (expires_at, value)
+
+    def set_many(self, namespace: str, values: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            entries = self._data.setdefault(namespace, {})
+            for key, value in values.items():
+                entries[key] = (expires_at, value)
+
+    def add(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        with self._lock:
+            if self._live(namespace, key) is not None:
+                return False
+            self._data.setdefault(namespace, {})[key] = (time.time() + ttl if ttl else None, value)
+            return True
+
+    def update(self, namespace: str, key: str, fn: Callable[[Optional[Any]], Tuple[Any, T]],
+               ttl: Optional[float] = None) -> T:
+        with self._lock:
+            entry = self._live(namespace, key)
+            value, result = fn(entry[1] if entry else None)
+            self._data.setdefault(namespace, {})[key] = (time.time() + ttl if ttl else None, value)
+            return result
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._data.get(namespace, {}).pop(key, None)
+
+    def items(self, namespace: str) -> Iterator[Tuple[str, Any]]:
+        with self._lock:
+            keys = list(self._data.get(namespace, {}))
+            entries = [(key, self._live(namespace, key)) for key in keys]
+        return iter([(key, entry[1]) for key, entry in entries if entry is not None])
+
+    def clear(self, namespace: str) -> None:
+        with self._lock:
+            self._data.pop(namespace, None)
+
+
+class SQLiteBackend(StateBackend):
+    """SQLite backend in WAL mode, shared by every process on the host.
+
+    Readers never block writers, and writes are single short statements, so
+    concurrent workers only contend for the brief write lock.
+    """
+
+    shared = True
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("STATE_DB_PATH", "clickup_state.db")
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _after_write(self) -> None:
+        self._writes += 1
+        if self._writes % PURGE_EVERY_WRITES == 0:
+            self._conn.execute("DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM kv WHERE namespace = ? AND key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (namespace, key, time.time()),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO kv (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value), expires_at),
+            )
+            self._after_write()
+
+    def set_many(self, namespace: str, values: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO kv (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                [(namespace, key, json.dumps(value), expires_at) for key, value in values.items()],
+            )
+            self._after_write()
+
+    def add(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO kv (namespace, key, value, expires_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(namespace, key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at "
+                "WHERE kv.expires_at IS NOT NULL AND kv.expires_at <= ?",
+                (namespace, key, json.dumps(value), now + ttl if ttl else None, now),
+            )
+            self._after_write()
+            return cursor.rowcount > 0
+
+    def update(self, namespace: str, key: str, fn: Callable[[Optional[Any]], Tuple[Any, T]],
+               ttl: Optional[float] = None) -> T:
+        now = time.time()
+        with self._lock, self._conn:
+            # Take the write lock before reading so other processes wait for us
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute(
+                "SELECT value FROM kv WHERE namespace = ? AND key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (namespace, key, now),
+            ).fetchone()
+            value, result = fn(json.loads(row[0]) if row else None)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO kv (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value), now + ttl if ttl else None),
+            )
+            self._after_write()
+            return result
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM kv WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def items(self, namespace: str) -> Iterator[Tuple[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value FROM kv WHERE namespace = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (namespace, time.time()),
+            ).fetchall()
+        return iter([(key, json.loads(value)) for key, value in rows])
+
+    def clear(self, namespace: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM kv WHERE namespace = ?", (namespace,))
+
+
+def get_state_backend() -> StateBackend:
+    """Get the process-wide state backend selected by STATE_BACKEND (memory or sqlite)."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            kind = os.getenv("STATE_BACKEND", "memory").lower()
+            if kind == "sqlite":
+                _backend = SQLiteBackend()
+            elif kind == "memory":
+                _backend = MemoryBackend()
+            else:
+                raise ValueError(f"Unknown STATE_BACKEND: {kind}")
+            logger.info("Using %s state backend", kind)
+        return _backend
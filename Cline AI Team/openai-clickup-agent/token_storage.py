@@ -1,45 +1,253 @@
 import os
+import copy
 import json
-from typing import Optional, Dict
+import time
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional, Dict
+
+try:
+    import fcntl
+except ImportError:  # Windows: only in-process locking
+    fcntl = None
+
+from state_backend import StateBackend
 
 class TokenStorage:
+    """Tokens in a JSON file, cached in memory and written atomically.
+
+    Reads are served from memory until the file's mtime, size or inode
+    changes. Writes go to a temp file that is renamed over the original
+    while holding an exclusive lock on ``<path>.lock``, so concurrent
+    writers (threads or processes) can't interleave or leave a torn file.
+    """
+
     def __init__(self, storage_path: str = "tokens.json"):
         self.storage_path = storage_path
+        self._lock = threading.RLock()
+        self._cache: Optional[Dict[str, Any]] = None
+        self._cache_stat: Optional[tuple] = None
         self._ensure_storage_exists()
 
     def _ensure_storage_exists(self):
         """Create storage file if it doesn't exist."""
         if not os.path.exists(self.storage_path):
-            self.save_tokens({})
+            with self._locked():
+                if not os.path.exists(self.storage_path):
+                    self.save_tokens({})
 
-    def save_tokens(self, tokens: Dict[str, str]) -> None:
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the in-process lock and, where supported, the cross-process file lock."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(f"{self.storage_path}.lock", "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _stat_key(stat: os.stat_result) -> tuple:
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def save_tokens(self, tokens: Dict[str, Any]) -> None:
         """Save tokens to storage."""
-        with open(self.storage_path, 'w') as f:
-            json.dump(tokens, f, indent=2)
-        # Set restrictive permissions
-        os.chmod(self.storage_path, 0o600)
+        directory = os.path.dirname(os.path.abspath(self.storage_path))
+        fd, temp_path = tempfile.mkstemp(prefix=".tokens-", suffix=".tmp", dir=directory)
+        try:
+            # Set restrictive permissions before any secret is written
+            os.chmod(temp_path, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(tokens, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.storage_path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        with self._lock:
+            self._cache = copy.deepcopy(tokens)
+            self._cache_stat = self._stat_key(os.stat(self.storage_path))
 
-    def load_tokens(self) -> Dict[str, str]:
-        """Load tokens from storage."""
+    def _read(self) -> Dict[str, Any]:
+        """The current tokens, from memory unless the file changed. Don't mutate the result."""
         try:
-            with open(self.storage_path, 'r') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
+            stat_key = self._stat_key(os.stat(self.storage_path))
+        except FileNotFoundError:
             return {}
+        with self._lock:
+            if self._cache is not None and stat_key == self._cache_stat:
+                return self._cache
+            try:
+                with open(self.storage_path, 'r') as f:
+                    tokens = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                return {}
+            self._cache, self._cache_stat = tokens, stat_key
+            return tokens
 
-    def get_access_token(self) -> Optional[str]:
-        """Get the stored access token."""
-        tokens = self.load_tokens()
+    def load_tokens(self) -> Dict[str, Any]:
+        """Load tokens from storage."""
+        return copy.deepcopy(self._read())
+
+    def close(self) -> None:
+        pass
+
+    def get_access_token(self, session_id: Optional[str] = None) -> Optional[str]:
+        """Get the stored access token, or that of a user session."""
+        tokens = self._read()
+        if session_id is not None:
+            tokens = tokens.get('sessions', {}).get(session_id, {})
         return tokens.get('access_token')
 
-    def store_tokens(self, access_token: str, refresh_token: Optional[str] = None) -> None:
-        """Store new tokens."""
-        tokens = self.load_tokens()
-        tokens['access_token'] = access_token
-        if refresh_token:
-            tokens['refresh_token'] = refresh_token
-        self.save_tokens(tokens)
-
-    def clear_tokens(self) -> None:
-        """Clear stored tokens."""
-        self.save_tokens({})
+    def store_tokens(self, access_token: str, refresh_token: Optional[str] = None,
+                     session_id: Optional[str] = None) -> None:
+        """Store new tokens, for a user session if one is given."""
+        with self._locked():
+            tokens = self.load_tokens()
+            entry = tokens.setdefault('sessions', {}).setdefault(session_id, {}) if session_id is not None else tokens
+            entry['access_token'] = access_token
+            if refresh_token:
+                entry['refresh_token'] = refresh_token
+            self.save_tokens(tokens)
+
+    def clear_tokens(self, session_id: Optional[str] = None) -> None:
+        """Clear the stored tokens, or those of a user session.
+
+        Other sessions and webhook secrets are kept.
+        """
+        with self._locked():
+            tokens = self.load_tokens()
+            if session_id is not None:
+                tokens.get('sessions', {}).pop(session_id, None)
+            else:
+                tokens.pop('access_token', None)
+                tokens.pop('refresh_token', None)
+            self.save_tokens(tokens)
+
+    def store_webhook_secret(self, webhook_id: str, secret: str) -> None:
+        """Store the signing secret of a registered webhook."""
+        with self._locked():
+            tokens = self.load_tokens()
+            tokens.setdefault('webhook_secrets', {})[webhook_id] = secret
+            self.save_tokens(tokens)
+
+    def get_webhook_secret(self, webhook_id: str) -> Optional[str]:
+        """Get the signing secret of a registered webhook."""
+        return self._read().get('webhook_secrets', {}).get(webhook_id)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tokens (
+    session_id TEXT PRIMARY KEY,
+    access_token TEXT NOT NULL,
+    refresh_token TEXT,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS webhook_secrets (
+    webhook_id TEXT PRIMARY KEY,
+    secret TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class SQLiteTokenStorage:
+    """Tokens for many users in SQLite, looked up by session ID.
+
+    Uses WAL mode so every worker process shares the same logins and
+    logouts, with each read a single primary-key lookup. Tokens outside any
+    session are kept under the ``default`` key. On first use an existing
+    JSON token file is imported.
+    """
+
+    DEFAULT_KEY = "default"
+
+    def __init__(self, path: Optional[str] = None, import_path: Optional[str] = "tokens.json"):
+        self.path = path or os.getenv("TOKEN_DB_PATH") or os.getenv("STATE_DB_PATH", "clickup_state.db")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        if import_path and os.path.exists(import_path):
+            self._import_json(import_path)
+
+    def _import_json(self, import_path: str) -> None:
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM tokens LIMIT 1").fetchone():
+                return
+        tokens = TokenStorage(import_path).load_tokens()
+        if tokens.get('access_token'):
+            self.store_tokens(tokens['access_token'], tokens.get('refresh_token'))
+        for session_id, entry in tokens.get('sessions', {}).items():
+            if entry.get('access_token'):
+                self.store_tokens(entry['access_token'], entry.get('refresh_token'), session_id)
+        for webhook_id, secret in tokens.get('webhook_secrets', {}).items():
+            self.store_webhook_secret(webhook_id, secret)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def get_access_token(self, session_id: Optional[str] = None) -> Optional[str]:
+        """Get the stored access token, or that of a user session."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT access_token FROM tokens WHERE session_id = ?", (session_id or self.DEFAULT_KEY,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def store_tokens(self, access_token: str, refresh_token: Optional[str] = None,
+                     session_id: Optional[str] = None) -> None:
+        """Store new tokens, for a user session if one is given."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO tokens (session_id, access_token, refresh_token, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET access_token = excluded.access_token, "
+                "refresh_token = COALESCE(excluded.refresh_token, refresh_token), updated_at = excluded.updated_at",
+                (session_id or self.DEFAULT_KEY, access_token, refresh_token, time.time()),
+            )
+
+    def clear_tokens(self, session_id: Optional[str] = None) -> None:
+        """Clear the stored tokens, or those of a user session."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM tokens WHERE session_id = ?", (session_id or self.DEFAULT_KEY,))
+
+    def store_webhook_secret(self, webhook_id: str, secret: str) -> None:
+        """Store the signing secret of a registered webhook."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO webhook_secrets (webhook_id, secret) VALUES (?, ?)", (webhook_id, secret)
+            )
+
+    def get_webhook_secret(self, webhook_id: str) -> Optional[str]:
+        """Get the signing secret of a registered webhook."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT secret FROM webhook_secrets WHERE webhook_id = ?", (webhook_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+
+def get_token_storage(backend: StateBackend):
+    """Token storage selected by TOKEN_STORAGE (json or sqlite).
+
+    Defaults to SQLite when the state backend is shared between workers and
+    to the JSON file otherwise.
+    """
+    kind = os.getenv("TOKEN_STORAGE", "sqlite" if backend.shared else "json").lower()
+    if kind == "sqlite":
+        return SQLiteTokenStorage()
+    if kind == "json":
+        return TokenStorage()
+    raise ValueError(f"Unknown TOKEN_STORAGE: {kind}")
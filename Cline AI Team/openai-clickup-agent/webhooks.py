@@ -0,0 +1,91 @@
+import hmac
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from clickup import AsyncClickUpClient
+from mirror import ClickUpMirror
+from search import TaskSearchIndex
+from log_config import get_logger
+
+logger = get_logger("webhooks")
+
+# Events the service subscribes to and knows how to apply
+WEBHOOK_EVENTS = ["taskCreated", "taskUpdated", "taskDeleted", "listCreated", "listUpdated", "listDeleted"]
+
+
+def sign_payload(body: bytes, secret: str) -> str:
+    """Compute ClickUp's X-Signature for a raw request body."""
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(body: bytes, signature: Optional[str], secret: str) -> bool:
+    """Check an X-Signature header against the raw body in constant time."""
+    if not signature or not secret:
+        return False
+    return hmac.compare_digest(sign_payload(body, secret), signature.strip().lower())
+
+
+class WebhookProcessor:
+    """Apply ClickUp webhook events to the in-process caches.
+
+    Task events update the mirror and search index, and list events
+    invalidate the hierarchy cache and the mirror's list scopes. Created or
+    updated tasks are re-fetched when a client is available, since webhook
+    payloads only carry the changed fields; without one, their list is only
+    marked stale.
+
+    ``invalidate_cache`` is awaited with the same arguments as
+    ``AsyncClickUpClient.invalidate_cache`` to drop hierarchy data for every
+    session; without it only the given client's cache is invalidated.
+    """
+
+    def __init__(self, mirror: ClickUpMirror, search_index: TaskSearchIndex,
+                 invalidate_cache: Optional[Callable[..., Awaitable[None]]] = None):
+        self.mirror = mirror
+        self.search_index = search_index
+        self.invalidate_cache = invalidate_cache
+        self.stats: Dict[str, int] = {}
+
+    async def _invalidate(self, client: Optional[AsyncClickUpClient], **ids) -> None:
+        if self.invalidate_cache is not None:
+            await self.invalidate_cache(**ids)
+        elif client is not None:
+            await client.invalidate_cache(**ids)
+
+    async def apply(self, event: Dict[str, Any], client: Optional[AsyncClickUpClient]) -> None:
+        name = event.get("event", "")
+        self.stats[name] = self.stats.get(name, 0) + 1
+        task_id = event.get("task_id")
+        list_id = event.get("list_id")
+
+        if name in ("taskCreated", "taskUpdated") and task_id:
+            if client is None:
+                # No service token to re-fetch with: mark the task's list stale instead
+                stale_list_id = await asyncio.to_thread(self.mirror.invalidate_task, task_id, list_id)
+                if stale_list_id:
+                    await self._invalidate(None, list_id=stale_list_id)
+                else:
+                    logger.debug("Ignoring %s for unmirrored task %s", name, task_id)
+                return
+            # get_task also feeds the search index through the task listener
+            task = await client.get_task(task_id)
+            await asyncio.to_thread(self.mirror.upsert_tasks, [task])
+            task_list_id = (task.get("list") or {}).get("id")
+            if task_list_id:
+                await self._invalidate(client, list_id=task_list_id)
+
+        elif name == "taskDeleted" and task_id:
+            await asyncio.to_thread(self.mirror.delete_task, task_id)
+            await asyncio.to_thread(self.search_index.delete_task, task_id)
+
+        elif name in ("listCreated", "listUpdated", "listDeleted") and list_id:
+            await asyncio.to_thread(self.mirror.invalidate_list, list_id)
+            # A new list has no cached entry yet, so drop the whole hierarchy
+            if name == "listCreated":
+                await self._invalidate(client)
+            else:
+                await self._invalidate(client, list_id=list_id)
+
+        else:
+            logger.debug("Ignoring webhook event %s", name)